@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 # Load environment variables from .env file if it exists
 def load_env_file():
@@ -28,4 +29,159 @@ def get_mongodb_uri() -> str:
 def get_gemini_api_key() -> str:
     return os.getenv("GOOGLE_GEMINI_API_KEY", "")
 
+def get_qa_index_backend() -> str:
+    """Vector index used for QA semantic search: exact, topk, ivf or auto"""
+    return os.getenv("QA_INDEX_BACKEND", "topk").strip().lower()
 
+def get_qa_embedding_storage() -> str:
+    """In-memory form of the QA embedding matrix: float32, float16 or int8"""
+    return os.getenv("QA_EMBEDDING_STORAGE", "float32").strip().lower()
+
+def get_qa_artifact_dir() -> Path:
+    """Directory holding compiled QA artifacts (embeddings, keyword sets, index)"""
+    default = Path(__file__).parent / "data" / "qa_artifacts"
+    return Path(os.getenv("QA_ARTIFACT_DIR", str(default)))
+
+def qa_artifact_autosave() -> bool:
+    """Compile and save the QA artifact at startup when no matching one exists"""
+    return os.getenv("QA_ARTIFACT_AUTOSAVE", "true").strip().lower() in {"1", "true", "yes"}
+
+def get_embed_max_batch() -> int:
+    """Largest number of chat questions encoded in one batch"""
+    return int(os.getenv("EMBED_MAX_BATCH", "32"))
+
+def get_embed_max_wait_ms() -> float:
+    """Extra time a non-full embedding batch waits for more questions"""
+    return float(os.getenv("EMBED_MAX_WAIT_MS", "2"))
+
+def get_qa_cache_max_entries() -> int:
+    """Entries kept in each QA query cache (embeddings, match results)"""
+    return int(os.getenv("QA_CACHE_MAX_ENTRIES", "2048"))
+
+def get_qa_cache_ttl_seconds() -> float:
+    """Lifetime of a QA query cache entry; 0 disables expiry"""
+    return float(os.getenv("QA_CACHE_TTL_SECONDS", "3600"))
+
+def get_qa_embedding_backend() -> str:
+    """Sentence embedding runtime for the QA engine: torch or onnx-int8"""
+    return os.getenv("QA_EMBEDDING_BACKEND", "torch").strip().lower()
+
+def get_onnx_model_dir() -> Path:
+    """Exported int8 ONNX sentence model (build with scripts/export_onnx_embedder.py)"""
+    default = Path(__file__).parent.parent.parent / "models" / "onnx" / "all-MiniLM-L6-v2-int8"
+    return Path(os.getenv("QA_ONNX_MODEL_DIR", str(default)))
+
+def semantic_cache_enabled() -> bool:
+    """Serve Gemini fallback answers from the semantic cache for near-identical questions"""
+    return os.getenv("QA_SEMANTIC_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
+
+def get_semantic_cache_max_distance() -> float:
+    """Largest cosine distance between two questions that may share a cached Gemini answer"""
+    return float(os.getenv("QA_SEMANTIC_CACHE_MAX_DISTANCE", "0.05"))
+
+def get_semantic_cache_max_entries() -> int:
+    return int(os.getenv("QA_SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+
+def get_semantic_cache_ttl_seconds() -> float:
+    """Lifetime of a cached Gemini answer; 0 disables expiry"""
+    return float(os.getenv("QA_SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+
+def get_semantic_cache_path() -> Optional[Path]:
+    """File the semantic cache is persisted to across restarts (empty disables persistence)"""
+    default = Path(__file__).parent / "data" / "semantic_cache.npz"
+    value = os.getenv("QA_SEMANTIC_CACHE_PATH", str(default)).strip()
+    return Path(value) if value else None
+
+def get_qa_dataset_watch_interval() -> float:
+    """Seconds between checks of qa_dataset.json for hot reload; 0 disables watching"""
+    return float(os.getenv("QA_DATASET_WATCH_INTERVAL", "5"))
+
+def get_admin_api_token() -> str:
+    """Token required (X-Admin-Token header) by admin endpoints such as the QA dataset reload; empty disables them"""
+    return os.getenv("ADMIN_API_TOKEN", "")
+
+def get_policy_index_dir() -> Path:
+    """Persistent passage index over the org_data policy PDFs (build with scripts/ingest_policies.py)"""
+    default = Path(__file__).parent / "data" / "policy_index"
+    return Path(os.getenv("POLICY_INDEX_DIR", str(default)))
+
+def get_policy_top_k() -> int:
+    """Policy passages sent to Gemini with a question"""
+    return int(os.getenv("POLICY_TOP_K", "3"))
+
+def get_policy_min_score() -> float:
+    """Minimum question/passage cosine similarity for a passage to be used"""
+    return float(os.getenv("POLICY_MIN_SCORE", "0.3"))
+
+def get_policy_extractive_score() -> float:
+    """Passage similarity at which the passage itself is returned without calling Gemini"""
+    return float(os.getenv("POLICY_EXTRACTIVE_SCORE", "0.75"))
+
+def get_parsed_document_cache_size() -> int:
+    """Parsed uploads kept in memory by content hash, each holding the whole text (0 disables)"""
+    return int(os.getenv("PARSED_DOCUMENT_CACHE_SIZE", "0"))
+
+def get_max_upload_mb() -> int:
+    """Largest document accepted by the upload endpoints"""
+    return int(os.getenv("MAX_UPLOAD_MB", "50"))
+
+def get_pdf_parse_workers() -> int:
+    """Processes extracting PDF pages in parallel (1 extracts serially in the request thread)"""
+    return int(os.getenv("PDF_PARSE_WORKERS", "1"))
+
+def get_pdf_parallel_min_pages() -> int:
+    """Smaller PDFs are extracted serially; starting a parallel extraction costs more than it saves"""
+    return int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+
+def get_summary_chunk_token_budget() -> int:
+    """Tokens per Gemini summarization call (chunk text plus tables); longer documents are map-reduced"""
+    return int(os.getenv("SUMMARY_CHUNK_TOKEN_BUDGET", "8000"))
+
+def get_summary_tokenizer_path() -> Optional[Path]:
+    """tokenizer.json used to count summary chunk tokens (defaults to the ONNX sentence model's)"""
+    value = os.getenv("SUMMARY_TOKENIZER", "").strip()
+    return Path(value) if value else None
+
+def summary_cache_enabled() -> bool:
+    """Reuse summaries of previously uploaded documents (keyed by file hash)"""
+    return os.getenv("SUMMARY_CACHE_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
+
+def get_summary_cache_dir() -> Optional[Path]:
+    """Directory of the on-disk summary cache (empty keeps summaries in memory only)"""
+    default = Path(__file__).parent / "data" / "summary_cache"
+    value = os.getenv("SUMMARY_CACHE_DIR", str(default)).strip()
+    return Path(value) if value else None
+
+def get_summary_cache_max_entries() -> int:
+    return int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "32"))
+
+def get_summary_cache_max_disk_mb() -> float:
+    return float(os.getenv("SUMMARY_CACHE_MAX_DISK_MB", "256"))
+
+def get_gemini_context_mode() -> str:
+    """How static Gemini instructions are sent: cache (server-side context cache), system or off"""
+    value = os.getenv("GEMINI_CONTEXT_CACHE", "system").strip().lower()
+    return value if value in {"cache", "system", "off"} else "system"
+
+def get_gemini_context_cache_ttl_seconds() -> float:
+    return float(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+def gemini_stub_enabled() -> bool:
+    """Serve Gemini calls from the offline stub in services/gemini_stub.py"""
+    return os.getenv("GEMINI_API_STUB", "false").strip().lower() in {"1", "true", "yes"}
+
+def get_gemini_stub_latency_ms() -> float:
+    return float(os.getenv("GEMINI_STUB_LATENCY_MS", "0"))
+
+def single_flight_enabled() -> bool:
+    """Coalesce identical concurrent questions onto one search / Gemini call"""
+    return os.getenv("QA_SINGLE_FLIGHT_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
+
+def get_service_warmup() -> str:
+    """How services are built at startup: background (default), eager (block startup) or lazy (first use)"""
+    value = os.getenv("SERVICE_WARMUP", "background").strip().lower()
+    return value if value in {"background", "eager", "lazy"} else "background"
+
+def server_timing_enabled() -> bool:
+    """Return per-stage QA latencies in a Server-Timing header on /api/chat responses"""
+    return os.getenv("CHAT_SERVER_TIMING", "false").strip().lower() in {"1", "true", "yes"}
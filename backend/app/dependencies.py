@@ -0,0 +1,59 @@
+"""FastAPI dependencies resolving shared services from the application container"""
+
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from .config import get_admin_api_token
+from .services.container import container
+
+
+def get_bad_filter():
+    """Bad language filter, or None if unavailable"""
+    return container.bad_filter
+
+
+def get_qa_engine():
+    """Hybrid QA engine, or None if unavailable"""
+    return container.qa_engine
+
+
+def get_doc_handler():
+    """Shared document request handler, or None if unavailable"""
+    return container.doc_handler
+
+
+def get_keyword_extractor():
+    """Keyword extractor, or None if unavailable"""
+    return container.keyword_extractor
+
+
+def require_qa_engine():
+    engine = container.qa_engine
+    if engine is None:
+        raise HTTPException(status_code=503, detail="QA engine is not available")
+    return engine
+
+
+def require_doc_handler():
+    handler = container.doc_handler
+    if handler is None:
+        raise HTTPException(status_code=503, detail="Document request service is not available")
+    return handler
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints: 404 unless ADMIN_API_TOKEN is set, 403 unless the X-Admin-Token header matches it"""
+    token = get_admin_api_token()
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def require_summarizer():
+    summarizer = container.summarizer
+    if summarizer is None:
+        raise HTTPException(status_code=503, detail="Gemini summarizer is not available (check GOOGLE_GEMINI_API_KEY)")
+    return summarizer
@@ -1,4 +1,7 @@
 import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -18,19 +21,62 @@ else:
 
 from .routers import chat, documents, certificates, health, gemini_documents, advanced_qa, document_requests, auth
 from .services.db import db_service
+from .services.container import container
+from .config import get_qa_dataset_watch_interval, get_service_warmup
 
-app = FastAPI(title="Org AI Chatbot", version="0.1.0")
+logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database connection on startup"""
-    await db_service.connect()
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Close database connection on shutdown"""
+async def warm_up_services() -> None:
+    """Build shared services off the event loop, then start the dataset watcher"""
+    await asyncio.to_thread(container.startup)
+
+    # Hot-reload qa_dataset.json (e.g. after DatabaseService.add_qa_pair) without a restart
+    interval = get_qa_dataset_watch_interval()
+    if container.qa_engine is not None and interval > 0:
+        await container.qa_engine.watch_dataset(interval)
+
+
+def _report_warmup_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"❌ Service warm-up failed: {str(task.exception())}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared services once per worker (in the background by default); release them on shutdown"""
+    # The database is connected before serving in every mode, so no request falls back to local files
+    await db_service.connect()
+    mode = get_service_warmup()
+    warmup = None
+    if mode == "eager":
+        # Block startup until every model is loaded, as before
+        await asyncio.to_thread(container.startup)
+        interval = get_qa_dataset_watch_interval()
+        if container.qa_engine is not None and interval > 0:
+            warmup = asyncio.create_task(container.qa_engine.watch_dataset(interval))
+    elif mode == "background":
+        # Serve /health immediately; /health/ready reports when the warm-up is done
+        warmup = asyncio.create_task(warm_up_services())
+    else:
+        container.mark_ready()
+    if warmup is not None:
+        warmup.add_done_callback(_report_warmup_failure)
+    yield
+    container.stop_warmup()
+    if warmup is not None:
+        warmup.cancel()
+        try:
+            await warmup
+        except (asyncio.CancelledError, Exception):
+            # Failures were logged when the task ended
+            pass
+    container.shutdown()
     await db_service.disconnect()
 
+
+app = FastAPI(title="Org AI Chatbot", version="0.1.0", lifespan=lifespan)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import asyncio
 from datetime import datetime
 
 from ..services.qa_engine import HybridQAEngine
+from ..services.single_flight import SingleFlight
+from ..dependencies import require_admin_token, require_qa_engine
 
 router = APIRouter()
 
-# Initialize services
-qa_engine = HybridQAEngine()
+# Concurrent reload requests share one re-encode instead of queueing one each
+_reloads = SingleFlight("qa_reload")
 
 
 class FeedbackRequest(BaseModel):
@@ -56,7 +58,7 @@ async def generate_qa_from_documents(background_tasks: BackgroundTasks):
 
 
 @router.get("/statistics", response_model=QAStatistics)
-async def get_qa_statistics():
+async def get_qa_statistics(qa_engine: HybridQAEngine = Depends(require_qa_engine)):
     """Get QA system statistics"""
     try:
         # Statistics for hybrid system
@@ -103,7 +105,7 @@ async def get_qa_suggestions(query: QueryRequest):
 
 
 @router.post("/enhanced-answer")
-async def get_enhanced_answer(query: QueryRequest):
+async def get_enhanced_answer(query: QueryRequest, qa_engine: HybridQAEngine = Depends(require_qa_engine)):
     """Get enhanced answer with suggestions"""
     try:
         # Get primary answer from Gemini API
@@ -120,7 +122,7 @@ async def get_enhanced_answer(query: QueryRequest):
 
 
 @router.get("/health")
-async def qa_health_check():
+async def qa_health_check(qa_engine: HybridQAEngine = Depends(require_qa_engine)):
     """Health check for QA system"""
     try:
         health_status = qa_engine.get_health_status()
@@ -139,6 +141,24 @@ async def qa_health_check():
         }
 
 
+@router.get("/dataset-version")
+async def get_dataset_version(qa_engine: HybridQAEngine = Depends(require_qa_engine)):
+    """Active QA dataset version and the result of the last hot reload"""
+    try:
+        return qa_engine.dataset_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get dataset version: {str(e)}")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin_token)])
+async def reload_qa_dataset(qa_engine: HybridQAEngine = Depends(require_qa_engine)):
+    """Reload qa_dataset.json now, re-encoding only new or edited questions (admin token required)"""
+    result, _ = await _reloads.run(("qa_reload",), lambda: qa_engine.reload_dataset(force=True))
+    if result.get("error"):
+        raise HTTPException(status_code=500, detail=f"Failed to reload QA dataset: {result['error']}")
+    return result
+
+
 @router.post("/auto-learn")
 async def auto_learn_from_conversation(query: str, user_feedback: str):
     """Auto-learn from user conversations and feedback"""
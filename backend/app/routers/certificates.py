@@ -7,7 +7,6 @@ from pydantic import BaseModel, Field, validator
 from typing import List, Dict, Optional
 import logging
 
-from ..services.certificate_generator import generate_bonafide_pdf
 from ..services.employee_validator import EmployeeValidator
 from ..services.db import db_service
 from ..config import auth_disabled
@@ -117,6 +116,7 @@ async def bonafide(req: CertRequest, request: Request):
 
         # Generate certificate
         organization = req.organization_name or org_name()
+        from ..services.certificate_generator import generate_bonafide_pdf
         pdf_bytes = generate_bonafide_pdf(employee, organization)
         
         # Log success
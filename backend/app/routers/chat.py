@@ -1,13 +1,19 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator
 import re
+import json
+import time
 import logging
 from datetime import datetime
 
 from ..services.bad_language_filter import BadLanguageFilter
 from ..services.qa_engine import HybridQAEngine
-from ..config import auth_disabled
+from ..services.intent_router import IntentRouter
+from ..services.latency_metrics import RequestTrace, latency_metrics
+from ..dependencies import get_bad_filter, get_qa_engine
+from ..config import auth_disabled, server_timing_enabled
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,43 +21,8 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize services with better error handling
-bad_filter = None
-qa_engine = None
-
-def initialize_services():
-    """Initialize chat services with enhanced error handling"""
-    global bad_filter, qa_engine
-    
-    try:
-        # Initialize bad language filter
-        try:
-            bad_filter = BadLanguageFilter()
-            logger.info("✅ Bad language filter initialized successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize bad language filter: {str(e)}")
-            bad_filter = None
-        
-        # Initialize QA engine
-        try:
-            qa_engine = HybridQAEngine()
-            logger.info("✅ QA engine initialized successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize QA engine: {str(e)}")
-            qa_engine = None
-        
-        if bad_filter and qa_engine:
-            logger.info("✅ Chat services initialized successfully")
-        else:
-            logger.warning("⚠️ Some chat services failed to initialize")
-            
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize chat services: {str(e)}")
-        bad_filter = None
-        qa_engine = None
-
-# Initialize services on module load
-initialize_services()
+# Services (bad language filter, QA engine) are shared application-wide and
+# injected per request from the service container
 
 
 class ChatRequest(BaseModel):
@@ -93,66 +64,66 @@ class ChatResponse(BaseModel):
     timestamp: Optional[str] = None
 
 
+# Keyword intents for the simple responses, in priority order (the first matching intent wins).
+# All keyword lists are compiled into one automaton, so a message is classified in a single pass.
+SIMPLE_RESPONSE_ROUTER = IntentRouter(
+    [
+        # Enhanced greeting detection - various ways to say hello
+        ("greeting", ['hello', 'hi', 'hey', 'hii', 'hiii', 'hallo', 'halo', 'hlo', 'hlw', 'hlo', 'hiiii']),
+        # Enhanced help detection - various ways to ask for help
+        ("help", ['help', 'what can you do', 'capabilities', 'help me', 'can you help', 'please help', 'i need help', 'what you can do', 'what do you do', 'how can you help', 'what services', 'what help', 'help pls', 'help plz']),
+        # Enhanced salary detection - various ways to ask about salary
+        ("salary", ['salary', 'compensation', 'pay', 'payment', 'money', 'income', 'earnings', 'wage', 'wages', 'paycheck', 'pay check', 'pay slip', 'payslip', 'salary slip', 'salaryslip', 'form 16', 'form16', 'tax', 'tax document', 'taxdoc']),
+        # Enhanced document detection - various ways to ask for documents
+        ("document", ['document', 'certificate', 'letter', 'documents', 'certificates', 'letters', 'doc', 'docs', 'cert', 'certs', 'form', 'forms', 'paper', 'papers', 'slip', 'slips', 'statement', 'statements', 'documant', 'certificat', 'letr', 'dokument', 'sertifikat']),
+        # Enhanced employee search detection
+        ("employee", ['employee', 'search', 'find', 'look for', 'searching', 'finding', 'looking', 'emp', 'employe', 'empl', 'searching for', 'looking for', 'find employee', 'search employee', 'look employee']),
+        # Enhanced thank you detection
+        ("thank", ['thank', 'thanks', 'thx', 'thnx', 'thank you', 'thankyou', 'thanks a lot', 'thank u', 'thnks', 'thnk u', 'tq', 'tq so much']),
+        # Enhanced status detection
+        ("status", ['status', 'health', 'working', 'system', 'server', 'online', 'offline', 'up', 'down', 'running', 'operational']),
+        # Enhanced PDF detection
+        ("pdf", ['pdf', 'summarize', 'upload', 'process', 'analyze', 'read', 'extract', 'convert', 'summarise', 'summarization', 'summarisation', 'pdfs', 'document', 'documents', 'file', 'files', 'upload pdf', 'process pdf', 'analyze pdf', 'read pdf', 'extract from pdf', 'summarize pdf', 'pdf summary', 'pdf analysis', 'pdf processing']),
+        # Enhanced leave/policy detection
+        ("leave", ['leave', 'policy', 'policies', 'attendance', 'absent', 'present', 'holiday', 'vacation', 'sick', 'medical', 'casual', 'annual', 'maternity', 'paternity', 'bereavement', 'compensatory', 'work from home', 'wfh', 'remote', 'hybrid']),
+        # Enhanced benefits detection
+        ("benefits", ['benefit', 'benefits', 'insurance', 'medical', 'health', 'dental', 'vision', 'pf', 'provident fund', 'gratuity', 'bonus', 'incentive', 'allowance', 'perks', 'facility', 'facilities']),
+    ],
+    answers={
+        "greeting": "👋 Hello! I'm your Reliance Jio Infotech Solutions AI Assistant. I can help you with HR questions, document requests, and PDF processing. How can I assist you today?",
+        "help": "🤖 **Reliance Jio Infotech Solutions - Your Intelligent Companion**\n\nI can help you with three main services:\n\n💬 **HR Q&A Chat**\n• Ask about company policies, benefits, and procedures\n• Get information about leave policies, attendance, and more\n• Request official documents (type \"I need a document\")\n• Quick and accurate responses to your queries\n\n📄 **PDF Summarization**\n• Upload PDFs up to 50MB\n• Handles large documents (30+ pages)\n• Extracts and formats table data\n• Real-time processing with progress tracking\n\n📜 **Document Requests**\n• Request any of 16 official document types\n• Official Reliance Jio Infotech Solutions format\n• Professional document generation\n• Immediate download available\n• **Strict validation:** ALL fields must match exactly with employee records\n\n💡 **Quick Commands:**\n• Type \"qa\" or \"chat\" to switch to HR Q&A mode\n• Type \"summarize\" or \"pdf\" to switch to PDF mode\n• Type \"I need a document\" to request official documents\n• Search employees: \"search employee [name or ID]\"\n• Use the mode buttons above for quick switching\n\n⚠️ **Important:** Document generation requires ALL employee details to match our records exactly.",
+        "salary": "💰 **Salary & Compensation**\n\nSalary information is confidential and varies by role and experience. For specific salary-related queries:\n\n• **Salary Slips:** Use Document Requests mode\n• **Tax Documents:** Request Form 16 through Document Requests\n• **Salary Certificate:** Available in Document Requests\n\nPlease use the Document Requests mode to generate official salary-related documents.",
+        "document": "📜 **Document Requests**\n\nI can help you generate official documents. Please:\n\n1. **Switch to Document Requests mode** using the mode selector above\n2. **Select a document type** from the 16 available options\n3. **Fill in the required details**\n4. **Generate and download** your document\n\n**Available Documents:**\n• Bonafide / Employment Verification Letter\n• Experience Certificate\n• Offer Letter Copy\n• Appointment Letter Copy\n• Promotion Letter\n• Relieving Letter\n• Salary Slips\n• Form 16 / Tax Documents\n• Salary Certificate\n• PF Statement / UAN details\n• No Objection Certificate (NOC)\n• Non-Disclosure Agreement Copy\n• ID Card Replacement\n• Medical Insurance Card Copy\n• Business Travel Authorization Letter\n• Visa Support Letter\n\n⚠️ **Important:** Document generation requires ALL employee details to match our records exactly.",
+        "employee": "🔍 **Employee Search**\n\nTo search for employees:\n\n• Use the employee search feature in Document Requests mode\n• Type \"search employee [name or ID]\" for quick search\n• Auto-fill forms with \"fill form for [name or ID]\"\n\nEmployee search helps you find specific employees and auto-fill document forms with their details.",
+        "thank": "🙏 You're welcome! I'm here to help you with all your document processing and certificate generation needs. Feel free to ask if you need anything else!",
+        "status": "🟢 **System Status:** All services are operational\n\n💬 **HR Q&A Chat:** Active\n📊 **PDF Processing:** Active\n📜 **Document Generation:** Active\n🌐 **API Endpoints:** All responding\n\nEverything is working perfectly! 🚀",
+        "pdf": "📄 **PDF Summarization**\n\nI can help you summarize PDF documents! 🚀\n\n• Upload any PDF (up to 50MB)\n• Handles large documents (30+ pages)\n• Extracts and formats table data\n• Powered by advanced processing for superior accuracy\n\nSimply switch to PDF Summarization mode and drag & drop or click to upload your PDF!",
+        "leave": "📋 **Leave & Attendance Policies**\n\nI can help you with leave and attendance information:\n\n• **Leave Types:** Casual, Sick, Annual, Maternity, Paternity\n• **Attendance Policy:** Regular attendance requirements\n• **Work from Home:** WFH policies and procedures\n• **Holiday Calendar:** Company holidays and off days\n\nPlease ask specific questions about leave policies, and I'll provide detailed information!",
+        "benefits": "🏥 **Employee Benefits**\n\nI can help you with information about employee benefits:\n\n• **Medical Insurance:** Health coverage details\n• **Provident Fund:** PF contribution and withdrawal\n• **Gratuity:** Gratuity calculation and eligibility\n• **Other Benefits:** Allowances, bonuses, incentives\n\nPlease ask specific questions about benefits, and I'll provide detailed information!",
+    },
+)
+
+
 def get_simple_response(message: str) -> str:
     """Get simple hardcoded responses - Enhanced for various English proficiency levels"""
     lower_message = message.lower().strip()
-    
-    # Enhanced greeting detection - various ways to say hello
-    greeting_words = ['hello', 'hi', 'hey', 'hii', 'hiii', 'hallo', 'halo', 'hlo', 'hlw', 'hlo', 'hiiii']
-    if any(word in lower_message for word in greeting_words):
-        return "👋 Hello! I'm your Reliance Jio Infotech Solutions AI Assistant. I can help you with HR questions, document requests, and PDF processing. How can I assist you today?"
-    
-    # Enhanced help detection - various ways to ask for help
-    help_words = ['help', 'what can you do', 'capabilities', 'help me', 'can you help', 'please help', 'i need help', 'what you can do', 'what do you do', 'how can you help', 'what services', 'what help', 'help pls', 'help plz']
-    if any(word in lower_message for word in help_words):
-        return "🤖 **Reliance Jio Infotech Solutions - Your Intelligent Companion**\n\nI can help you with three main services:\n\n💬 **HR Q&A Chat**\n• Ask about company policies, benefits, and procedures\n• Get information about leave policies, attendance, and more\n• Request official documents (type \"I need a document\")\n• Quick and accurate responses to your queries\n\n📄 **PDF Summarization**\n• Upload PDFs up to 50MB\n• Handles large documents (30+ pages)\n• Extracts and formats table data\n• Real-time processing with progress tracking\n\n📜 **Document Requests**\n• Request any of 16 official document types\n• Official Reliance Jio Infotech Solutions format\n• Professional document generation\n• Immediate download available\n• **Strict validation:** ALL fields must match exactly with employee records\n\n💡 **Quick Commands:**\n• Type \"qa\" or \"chat\" to switch to HR Q&A mode\n• Type \"summarize\" or \"pdf\" to switch to PDF mode\n• Type \"I need a document\" to request official documents\n• Search employees: \"search employee [name or ID]\"\n• Use the mode buttons above for quick switching\n\n⚠️ **Important:** Document generation requires ALL employee details to match our records exactly."
-    
-    # Enhanced salary detection - various ways to ask about salary
-    salary_words = ['salary', 'compensation', 'pay', 'payment', 'money', 'income', 'earnings', 'wage', 'wages', 'paycheck', 'pay check', 'pay slip', 'payslip', 'salary slip', 'salaryslip', 'form 16', 'form16', 'tax', 'tax document', 'taxdoc']
-    if any(word in lower_message for word in salary_words):
-        return "💰 **Salary & Compensation**\n\nSalary information is confidential and varies by role and experience. For specific salary-related queries:\n\n• **Salary Slips:** Use Document Requests mode\n• **Tax Documents:** Request Form 16 through Document Requests\n• **Salary Certificate:** Available in Document Requests\n\nPlease use the Document Requests mode to generate official salary-related documents."
-    
-    # Enhanced document detection - various ways to ask for documents
-    document_words = ['document', 'certificate', 'letter', 'documents', 'certificates', 'letters', 'doc', 'docs', 'cert', 'certs', 'form', 'forms', 'paper', 'papers', 'slip', 'slips', 'statement', 'statements', 'documant', 'certificat', 'letr', 'dokument', 'sertifikat']
-    if any(word in lower_message for word in document_words):
-        return "📜 **Document Requests**\n\nI can help you generate official documents. Please:\n\n1. **Switch to Document Requests mode** using the mode selector above\n2. **Select a document type** from the 16 available options\n3. **Fill in the required details**\n4. **Generate and download** your document\n\n**Available Documents:**\n• Bonafide / Employment Verification Letter\n• Experience Certificate\n• Offer Letter Copy\n• Appointment Letter Copy\n• Promotion Letter\n• Relieving Letter\n• Salary Slips\n• Form 16 / Tax Documents\n• Salary Certificate\n• PF Statement / UAN details\n• No Objection Certificate (NOC)\n• Non-Disclosure Agreement Copy\n• ID Card Replacement\n• Medical Insurance Card Copy\n• Business Travel Authorization Letter\n• Visa Support Letter\n\n⚠️ **Important:** Document generation requires ALL employee details to match our records exactly."
-    
-    # Enhanced employee search detection
-    employee_words = ['employee', 'search', 'find', 'look for', 'searching', 'finding', 'looking', 'emp', 'employe', 'empl', 'searching for', 'looking for', 'find employee', 'search employee', 'look employee']
-    if any(word in lower_message for word in employee_words):
-        return "🔍 **Employee Search**\n\nTo search for employees:\n\n• Use the employee search feature in Document Requests mode\n• Type \"search employee [name or ID]\" for quick search\n• Auto-fill forms with \"fill form for [name or ID]\"\n\nEmployee search helps you find specific employees and auto-fill document forms with their details."
-    
-    # Enhanced thank you detection
-    thank_words = ['thank', 'thanks', 'thx', 'thnx', 'thank you', 'thankyou', 'thanks a lot', 'thank u', 'thnks', 'thnk u', 'tq', 'tq so much']
-    if any(word in lower_message for word in thank_words):
-        return "🙏 You're welcome! I'm here to help you with all your document processing and certificate generation needs. Feel free to ask if you need anything else!"
-    
-    # Enhanced status detection
-    status_words = ['status', 'health', 'working', 'system', 'server', 'online', 'offline', 'up', 'down', 'running', 'operational']
-    if any(word in lower_message for word in status_words):
-        return "🟢 **System Status:** All services are operational\n\n💬 **HR Q&A Chat:** Active\n📊 **PDF Processing:** Active\n📜 **Document Generation:** Active\n🌐 **API Endpoints:** All responding\n\nEverything is working perfectly! 🚀"
-    
-    # Enhanced PDF detection
-    pdf_words = ['pdf', 'summarize', 'upload', 'process', 'analyze', 'read', 'extract', 'convert', 'summarise', 'summarization', 'summarisation', 'pdfs', 'document', 'documents', 'file', 'files', 'upload pdf', 'process pdf', 'analyze pdf', 'read pdf', 'extract from pdf', 'summarize pdf', 'pdf summary', 'pdf analysis', 'pdf processing']
-    if any(word in lower_message for word in pdf_words):
-        return "📄 **PDF Summarization**\n\nI can help you summarize PDF documents! 🚀\n\n• Upload any PDF (up to 50MB)\n• Handles large documents (30+ pages)\n• Extracts and formats table data\n• Powered by advanced processing for superior accuracy\n\nSimply switch to PDF Summarization mode and drag & drop or click to upload your PDF!"
-    
-    # Enhanced leave/policy detection
-    leave_words = ['leave', 'policy', 'policies', 'attendance', 'absent', 'present', 'holiday', 'vacation', 'sick', 'medical', 'casual', 'annual', 'maternity', 'paternity', 'bereavement', 'compensatory', 'work from home', 'wfh', 'remote', 'hybrid']
-    if any(word in lower_message for word in leave_words):
-        return "📋 **Leave & Attendance Policies**\n\nI can help you with leave and attendance information:\n\n• **Leave Types:** Casual, Sick, Annual, Maternity, Paternity\n• **Attendance Policy:** Regular attendance requirements\n• **Work from Home:** WFH policies and procedures\n• **Holiday Calendar:** Company holidays and off days\n\nPlease ask specific questions about leave policies, and I'll provide detailed information!"
-    
-    # Enhanced benefits detection
-    benefits_words = ['benefit', 'benefits', 'insurance', 'medical', 'health', 'dental', 'vision', 'pf', 'provident fund', 'gratuity', 'bonus', 'incentive', 'allowance', 'perks', 'facility', 'facilities']
-    if any(word in lower_message for word in benefits_words):
-        return "🏥 **Employee Benefits**\n\nI can help you with information about employee benefits:\n\n• **Medical Insurance:** Health coverage details\n• **Provident Fund:** PF contribution and withdrawal\n• **Gratuity:** Gratuity calculation and eligibility\n• **Other Benefits:** Allowances, bonuses, incentives\n\nPlease ask specific questions about benefits, and I'll provide detailed information!"
-    
+
+    response = SIMPLE_RESPONSE_ROUTER.answer(lower_message)
+    if response is not None:
+        return response
+
     # Default response
     return "💭 I understand you're asking about: \"" + message + "\"\n\nI can help you with:\n💬 **HR Q&A Chat** - Ask about company policies and procedures\n📄 **PDF Summarization** - Upload any PDF for comprehensive analysis\n📜 **Document Requests** - Request official documents through chat\n\n💡 **Quick Start:**\n• Switch to HR Q&A mode to ask questions\n• Upload a PDF file above for summarization\n• Type \"I need a document\" to request official documents\n• Use the mode buttons to switch between services\n• Search for employees: \"search employee [name or ID]\"\n\n⚠️ **Important:** Document generation requires ALL employee details to match our records exactly.\n\nHow would you like to proceed?"
 
 
 @router.post("/", response_model=ChatResponse)
-async def chat(req: ChatRequest, request: Request) -> ChatResponse:
+async def chat(
+    req: ChatRequest,
+    request: Request,
+    response: Response,
+    bad_filter: Optional[BadLanguageFilter] = Depends(get_bad_filter),
+    qa_engine: Optional[HybridQAEngine] = Depends(get_qa_engine),
+) -> ChatResponse:
     """
     Process chat messages with simple responses - no AI models
     """
@@ -193,7 +164,10 @@ async def chat(req: ChatRequest, request: Request) -> ChatResponse:
         # Get AI-powered response using QA engine
         try:
             if qa_engine:
-                answer = await qa_engine.answer(req.message)
+                trace = RequestTrace()
+                answer = await qa_engine.answer(req.message, trace=trace)
+                if server_timing_enabled():
+                    response.headers["Server-Timing"] = trace.server_timing()
             else:
                 # Fallback to simple response if QA engine is not available
                 answer = get_simple_response(req.message)
@@ -232,8 +206,111 @@ async def chat(req: ChatRequest, request: Request) -> ChatResponse:
         )
 
 
+@router.get("/metrics")
+async def chat_metrics(qa_engine: Optional[HybridQAEngine] = Depends(get_qa_engine)) -> dict:
+    """
+    QA engine latency percentiles (p50/p95/p99) per pipeline stage and per answer path,
+    plus how many identical concurrent questions were coalesced
+    """
+    metrics = latency_metrics.snapshot()
+    if qa_engine is not None and qa_engine.single_flight is not None:
+        metrics["single_flight"] = qa_engine.single_flight.stats()
+    return metrics
+
+
+def _format_stream_event(event: str, payload: dict, stream_format: str) -> str:
+    """One server-sent event, or one NDJSON line with the event name in "type" """
+    if stream_format == "ndjson":
+        return json.dumps({"type": event, **payload}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _stream_chat_events(
+    message: str,
+    stream_format: str,
+    bad_filter: Optional[BadLanguageFilter],
+    qa_engine: Optional[HybridQAEngine],
+) -> AsyncIterator[str]:
+    """Stream answer chunks as "token" events, then a "done" event with time-to-first-byte and total latency"""
+    start = time.perf_counter()
+    ttfb_ms = None
+    chunks = 0
+    
+    try:
+        if bad_filter and bad_filter.contains_bad_language(message):
+            logger.warning("Inappropriate language detected")
+            yield _format_stream_event("error", {
+                "response": "Please keep the conversation respectful and professional.",
+                "error": "Inappropriate language detected",
+            }, stream_format)
+            return
+        
+        if qa_engine:
+            answer_chunks = qa_engine.answer_stream(message)
+        else:
+            async def simple_answer() -> AsyncIterator[str]:
+                yield get_simple_response(message)
+            answer_chunks = simple_answer()
+        
+        async for chunk in answer_chunks:
+            if not chunk:
+                continue
+            if ttfb_ms is None:
+                ttfb_ms = (time.perf_counter() - start) * 1000
+            chunks += 1
+            yield _format_stream_event("token", {"text": chunk}, stream_format)
+        
+        if chunks == 0:
+            ttfb_ms = (time.perf_counter() - start) * 1000
+            yield _format_stream_event("token", {
+                "text": "I apologize, but I didn't receive a proper response. Please try again."
+            }, stream_format)
+    except Exception as e:
+        logger.error(f"Error streaming chat response: {str(e)}")
+        yield _format_stream_event("error", {"error": "Failed to generate response"}, stream_format)
+        return
+    
+    total_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"✅ Chat response streamed in {total_ms:.0f}ms (first byte after {ttfb_ms:.0f}ms, {chunks} chunks)")
+    yield _format_stream_event("done", {
+        "ttfb_ms": round(ttfb_ms, 2),
+        "total_ms": round(total_ms, 2),
+        "chunks": chunks,
+        "timestamp": datetime.now().isoformat(),
+    }, stream_format)
+
+
+@router.post("/stream")
+async def chat_stream(
+    req: ChatRequest,
+    request: Request,
+    stream_format: str = Query("sse", alias="format", pattern="^(sse|ndjson)$"),
+    bad_filter: Optional[BadLanguageFilter] = Depends(get_bad_filter),
+    qa_engine: Optional[HybridQAEngine] = Depends(get_qa_engine),
+) -> StreamingResponse:
+    """
+    Stream a chat answer: local-dataset answers arrive as one event, Gemini answers token by token.
+    Server-sent events by default; ?format=ndjson (or Accept: application/x-ndjson) for newline-delimited JSON.
+    """
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        stream_format = "ndjson"
+    
+    client_ip = request.client.host if request.client else "unknown"
+    logger.info(f"📨 Received streaming chat request from {client_ip}: {req.message[:50]}...")
+    
+    media_type = "application/x-ndjson" if stream_format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        _stream_chat_events(req.message, stream_format, bad_filter, qa_engine),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/health")
-async def chat_health() -> dict:
+async def chat_health(
+    bad_filter: Optional[BadLanguageFilter] = Depends(get_bad_filter),
+    qa_engine: Optional[HybridQAEngine] = Depends(get_qa_engine),
+) -> dict:
     """Health check endpoint for chat services"""
     try:
         health_status = {
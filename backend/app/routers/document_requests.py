@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
@@ -6,12 +6,10 @@ from datetime import datetime
 from io import BytesIO
 
 from ..services.document_request_handler import DocumentRequestHandler
+from ..dependencies import require_doc_handler
 
 router = APIRouter()
 
-# Initialize document request handler
-doc_handler = DocumentRequestHandler()
-
 
 class DocumentRequest(BaseModel):
     document_type: str
@@ -40,7 +38,7 @@ class RequestStatus(BaseModel):
 
 
 @router.post("/submit", response_model=DocumentRequestResponse)
-async def submit_document_request(request: DocumentRequest):
+async def submit_document_request(request: DocumentRequest, doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Submit a document request and generate PDF"""
     try:
         # Validate document type
@@ -76,7 +74,7 @@ async def submit_document_request(request: DocumentRequest):
 
 
 @router.get("/status/{request_id}", response_model=RequestStatus)
-async def get_request_status(request_id: str):
+async def get_request_status(request_id: str, doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Get status of a document request"""
     try:
         request = doc_handler.get_request_status(request_id)
@@ -90,7 +88,7 @@ async def get_request_status(request_id: str):
 
 
 @router.get("/user/{user_id}", response_model=List[RequestStatus])
-async def get_user_requests(user_id: str):
+async def get_user_requests(user_id: str, doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Get all requests for a specific user"""
     try:
         requests = doc_handler.get_user_requests(user_id)
@@ -101,7 +99,7 @@ async def get_user_requests(user_id: str):
 
 
 @router.get("/pending/count")
-async def get_pending_requests_count():
+async def get_pending_requests_count(doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Get count of pending requests"""
     try:
         count = doc_handler.get_pending_requests_count()
@@ -112,7 +110,7 @@ async def get_pending_requests_count():
 
 
 @router.get("/documents/list")
-async def get_supported_documents():
+async def get_supported_documents(doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Get list of supported document types"""
     try:
         return {
@@ -125,7 +123,7 @@ async def get_supported_documents():
 
 
 @router.get("/download/{request_id}")
-async def download_document_pdf(request_id: str):
+async def download_document_pdf(request_id: str, doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Download PDF for a completed document request"""
     try:
         request = doc_handler.get_request_status(request_id)
@@ -161,7 +159,7 @@ async def download_document_pdf(request_id: str):
 
 
 @router.get("/preview/{request_id}")
-async def preview_document_pdf(request_id: str):
+async def preview_document_pdf(request_id: str, doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Preview PDF for a completed document request (opens in browser)"""
     try:
         request = doc_handler.get_request_status(request_id)
@@ -193,7 +191,7 @@ async def preview_document_pdf(request_id: str):
 
 
 @router.get("/health")
-async def document_requests_health():
+async def document_requests_health(doc_handler: DocumentRequestHandler = Depends(require_doc_handler)):
     """Health check for document requests system"""
     try:
         pending_count = doc_handler.get_pending_requests_count()
@@ -1,15 +1,12 @@
 import os
-import fitz  # PyMuPDF
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from pydantic import BaseModel
-from ..config import auth_disabled
+from ..config import auth_disabled, get_max_upload_mb
 from ..services.gemini_summarizer import GeminiSummarizer
+from ..dependencies import require_summarizer, get_keyword_extractor
 
 router = APIRouter()
 
-# Initialize the Gemini summarizer service
-summarizer = GeminiSummarizer()
-
 
 class SummarizeResponse(BaseModel):
     document_type: str
@@ -23,6 +20,8 @@ class SummarizeResponse(BaseModel):
 
 def extract_text_from_pdf(content: bytes) -> str:
     """Extract text from PDF content"""
+    import fitz  # PyMuPDF
+
     text = ""
     try:
         doc = fitz.open(stream=content, filetype="pdf")
@@ -46,24 +45,29 @@ def extract_keywords(text: str) -> list[str]:
 
 
 @router.post("/upload", response_model=SummarizeResponse)
-async def upload(file: UploadFile = File(...)):
+async def upload(file: UploadFile = File(...), summarizer: GeminiSummarizer = Depends(require_summarizer),
+                 keyword_extractor=Depends(get_keyword_extractor)):
     """Upload and summarize PDF with enhanced error handling"""
     try:
         # Validate file type
         if not file.filename or not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # Check file size (limit to 50MB)
+        # Check file size (MAX_UPLOAD_MB) before reading the upload into memory
+        max_mb = get_max_upload_mb()
+        if (file.size or 0) > max_mb * 1024 * 1024:
+            raise HTTPException(status_code=400, detail=f"File size too large. Maximum {max_mb}MB allowed.")
         content = await file.read()
-        if len(content) > 50 * 1024 * 1024:  # 50MB
-            raise HTTPException(status_code=400, detail="File size too large. Maximum 50MB allowed.")
+        if len(content) > max_mb * 1024 * 1024:
+            raise HTTPException(status_code=400, detail=f"File size too large. Maximum {max_mb}MB allowed.")
         
         if len(content) == 0:
             raise HTTPException(status_code=400, detail="File is empty")
         
         # Use Gemini summarizer for processing
         try:
-            result = await summarizer.summarize_pdf(file.filename, content)
+            # Keywords are cached with the summary, so every upload route shares complete cache entries
+            result = await summarizer.summarize_pdf(file.filename, content, keyword_extractor=keyword_extractor)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to generate summary: {str(e)}")
         
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Depends
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
@@ -11,16 +11,11 @@ import os
 
 from ..services.gemini_summarizer import GeminiSummarizer, SummaryResult
 from ..services.keyword_extractor import KeywordExtractor
-from ..services.doc_parser import parse_document
-from ..services.summary_pdf_generator import generate_summary_pdf
-from ..config import auth_disabled
+from ..dependencies import require_summarizer, get_keyword_extractor
+from ..config import auth_disabled, get_max_upload_mb
 
 router = APIRouter()
 
-# Initialize services
-gemini_summarizer = GeminiSummarizer()
-keyword_extractor = KeywordExtractor()
-
 # In-memory storage for job status (in production, use Redis or database)
 job_status = {}
 
@@ -36,6 +31,7 @@ class GeminiSummarizeResponse(BaseModel):
     model_used: str
     keywords: List[str]
     markdown_summary: str
+    cached: bool = False
 
 
 class JobStatus:
@@ -51,7 +47,11 @@ class JobStatus:
 
 
 @router.post("/upload-gemini", response_model=GeminiSummarizeResponse)
-async def upload_pdf_gemini(file: UploadFile = File(...)):
+async def upload_pdf_gemini(
+    file: UploadFile = File(...),
+    gemini_summarizer: GeminiSummarizer = Depends(require_summarizer),
+    keyword_extractor: Optional[KeywordExtractor] = Depends(get_keyword_extractor),
+):
     """
     Upload PDF for Gemini-powered summarization
     Handles large documents (30+ pages) with intelligent chunking
@@ -61,18 +61,17 @@ async def upload_pdf_gemini(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Check file size (limit to 50MB)
+    # Check file size (MAX_UPLOAD_MB) before reading the upload into memory
+    max_mb = get_max_upload_mb()
+    if (file.size or 0) > max_mb * 1024 * 1024:
+        raise HTTPException(status_code=400, detail=f"File size too large. Maximum {max_mb}MB allowed.")
     content = await file.read()
-    if len(content) > 50 * 1024 * 1024:  # 50MB
-        raise HTTPException(status_code=400, detail="File size too large. Maximum 50MB allowed.")
+    if len(content) > max_mb * 1024 * 1024:
+        raise HTTPException(status_code=400, detail=f"File size too large. Maximum {max_mb}MB allowed.")
     
     try:
-        # Extract keywords from raw text
-        raw_text = parse_document(file.filename, content)
-        keywords = keyword_extractor.extract(raw_text)
-        
-        # Process with Gemini
-        result = await gemini_summarizer.summarize_pdf(file.filename, content)
+        # Process with Gemini; a cached document skips parsing, keyword extraction and Gemini alike
+        result = await gemini_summarizer.summarize_pdf(file.filename, content, keyword_extractor=keyword_extractor)
         
         # Format tables for response
         tables_data = []
@@ -94,8 +93,9 @@ async def upload_pdf_gemini(file: UploadFile = File(...)):
             total_pages=result.total_pages,
             processing_time=result.processing_time,
             model_used=result.model_used,
-            keywords=keywords,
-            markdown_summary=result.executive_summary
+            keywords=result.keywords,
+            markdown_summary=result.executive_summary,
+            cached=result.cached
         )
         
     except Exception as e:
@@ -103,15 +103,20 @@ async def upload_pdf_gemini(file: UploadFile = File(...)):
 
 
 @router.post("/upload-gemini-async")
-async def upload_gemini_async(file: UploadFile = File(...)):
+async def upload_gemini_async(
+    file: UploadFile = File(...),
+    gemini_summarizer: GeminiSummarizer = Depends(require_summarizer),
+    keyword_extractor: Optional[KeywordExtractor] = Depends(get_keyword_extractor),
+):
     """Upload PDF for async processing with Gemini"""
     try:
         # Validate file
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        if file.size > 50 * 1024 * 1024:  # 50MB limit
-            raise HTTPException(status_code=400, detail="File size must be less than 50MB")
+        max_mb = get_max_upload_mb()
+        if (file.size or 0) > max_mb * 1024 * 1024:
+            raise HTTPException(status_code=400, detail=f"File size must be less than {max_mb}MB")
         
         # Read file content
         content = await file.read()
@@ -123,7 +128,7 @@ async def upload_gemini_async(file: UploadFile = File(...)):
         job_status[job_id] = JobStatus(job_id, file.filename)
         
         # Start background processing
-        asyncio.create_task(process_pdf_async(job_id, file.filename, content))
+        asyncio.create_task(process_pdf_async(gemini_summarizer, job_id, file.filename, content, keyword_extractor))
         
         return {
             "job_id": job_id,
@@ -161,7 +166,8 @@ async def get_job_status(job_id: str):
     return response
 
 
-async def process_pdf_async(job_id: str, filename: str, content: bytes):
+async def process_pdf_async(gemini_summarizer: GeminiSummarizer, job_id: str, filename: str, content: bytes,
+                            keyword_extractor: Optional[KeywordExtractor] = None):
     """Background task to process PDF"""
     try:
         job = job_status[job_id]
@@ -172,7 +178,7 @@ async def process_pdf_async(job_id: str, filename: str, content: bytes):
         job.message = "Analyzing document structure..."
         
         # Process with Gemini
-        result = await gemini_summarizer.summarize_pdf(filename, content)
+        result = await gemini_summarizer.summarize_pdf(filename, content, keyword_extractor=keyword_extractor)
         
         # Update job with result
         job.status = "completed"
@@ -186,7 +192,9 @@ async def process_pdf_async(job_id: str, filename: str, content: bytes):
             "document_type": result.document_type,
             "total_pages": result.total_pages,
             "processing_time": result.processing_time,
-            "model_used": result.model_used
+            "model_used": result.model_used,
+            "keywords": result.keywords,
+            "cached": result.cached
         }
         
     except Exception as e:
@@ -214,7 +222,8 @@ async def download_summary_pdf(request: Dict[str, Any]):
         if not summary_data:
             raise HTTPException(status_code=400, detail="Summary data is required")
         
-        # Generate PDF
+        # Generate PDF (reportlab is only loaded when a PDF is requested)
+        from ..services.summary_pdf_generator import generate_summary_pdf
         pdf_buffer = generate_summary_pdf(summary_data, original_filename)
         
         # Create filename
@@ -231,7 +240,7 @@ async def download_summary_pdf(request: Dict[str, Any]):
 
 
 @router.get("/health")
-async def health_check():
+async def health_check(gemini_summarizer: GeminiSummarizer = Depends(require_summarizer)):
     """Health check for Gemini service"""
     try:
         # Test Gemini connection
@@ -247,6 +256,8 @@ async def health_check():
             "status": "healthy",
             "gemini_connection": "ok",
             "model_used": "gemini-2.0-flash-exp",
+            "context_cache": gemini_summarizer.context_stats(),
+            "summary_cache": gemini_summarizer.cache_stats(),
             "message": "Gemini service is operational"
         }
     except Exception as e:
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..services.container import container
 
 router = APIRouter()
 
@@ -8,3 +11,8 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@router.get("/health/ready")
+async def ready():
+    """503 until the background warm-up has built the shared services"""
+    body = {"status": "ready" if container.ready else "warming_up", "services": container.status()}
+    return JSONResponse(body, status_code=200 if container.ready else 503)
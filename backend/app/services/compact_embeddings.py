@@ -0,0 +1,100 @@
+"""
+Compact storage for the QA embedding matrix.
+
+- ``float32``: the encoder output as is (4 bytes per dimension)
+- ``float16``: half precision (2 bytes per dimension)
+- ``int8``:    symmetric per-vector quantization, ``row ~= scale * int8_row``
+               (1 byte per dimension plus one float32 scale per row)
+
+Scoring works on the compact form: rows are widened to float32 one
+cache-sized block at a time into a reused buffer and scored with a BLAS
+matrix-vector product, so the full float32 matrix is never materialized
+and only the compact bytes are streamed from memory. For int8 the block
+scores are multiplied by the per-row scales afterwards.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_STORAGES = ("float32", "float16", "int8")
+
+# Rows widened per block; 1024 x 384 float32 is 1.5 MB, comfortably inside L2
+BLOCK_ROWS = 1024
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 quantization: returns (int8 rows, float32 scales)"""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+    quantized = np.rint(embeddings / scales[:, None]).clip(-127, 127).astype(np.int8)
+    return quantized, scales
+
+
+class CompactEmbeddings:
+    """Embedding matrix in float32, float16 or scaled int8 form, scored without widening it as a whole"""
+
+    def __init__(self, data: np.ndarray, scales: Optional[np.ndarray] = None, storage: str = "float32") -> None:
+        if storage not in EMBEDDING_STORAGES:
+            raise ValueError(f"Unknown embedding storage: {storage} (choose from {', '.join(EMBEDDING_STORAGES)})")
+        if data.ndim != 2:
+            raise ValueError("Embeddings must be a 2-D matrix")
+        if storage == "int8" and (scales is None or scales.shape[0] != data.shape[0]):
+            raise ValueError("int8 embeddings need one scale per row")
+        self.storage = storage
+        self.data = data
+        self.scales = scales if storage == "int8" else None
+
+    @classmethod
+    def from_float32(cls, embeddings, storage: str = "float32") -> "CompactEmbeddings":
+        if isinstance(embeddings, CompactEmbeddings):
+            return embeddings
+        storage = (storage or "float32").strip().lower()
+        if storage == "int8":
+            data, scales = quantize_int8(embeddings)
+            return cls(data, scales, storage)
+        if storage == "float16":
+            return cls(np.ascontiguousarray(embeddings, dtype=np.float16), storage=storage)
+        # Keep memory-mapped float32 matrices mapped instead of copying them
+        array = np.asanyarray(embeddings, dtype=np.float32)
+        return cls(array if array.flags.c_contiguous else np.ascontiguousarray(array), storage=storage)
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def score(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Inner products of the query with every row (or the given rows) as float32"""
+        query = np.asarray(query, dtype=np.float32)
+        data = self.data if rows is None else self.data[rows]
+        if self.storage == "float32":
+            return np.asarray(data @ query)
+
+        out = np.empty(data.shape[0], dtype=np.float32)
+        block = np.empty((min(BLOCK_ROWS, data.shape[0]), data.shape[1]), dtype=np.float32)
+        for start in range(0, data.shape[0], BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, data.shape[0])
+            widened = block[:stop - start]
+            np.copyto(widened, data[start:stop])
+            np.dot(widened, query, out=out[start:stop])
+        if self.scales is not None:
+            out *= self.scales if rows is None else self.scales[rows]
+        return out
+
+    def to_float32(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Decoded float32 rows (the stored array itself for float32 storage)"""
+        data = self.data if rows is None else self.data[rows]
+        if self.storage == "float32":
+            return data
+        decoded = data.astype(np.float32)
+        if self.scales is not None:
+            decoded *= (self.scales if rows is None else self.scales[rows])[:, None]
+        return decoded
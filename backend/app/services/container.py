@@ -0,0 +1,134 @@
+"""
+Application-scoped service container.
+
+Heavy services (QA engine with its sentence model, Gemini summarizer, document
+request handler) are built once per worker and shared by every router through
+FastAPI dependencies (see ``app/dependencies.py``). The container is started and
+shut down from the application lifespan in ``main.py``; by default ``startup``
+runs in a background warm-up task so ``/health`` answers before the models load,
+and ``ready`` tells ``/health/ready`` when the warm-up has finished.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Builds each service once on first use (or at startup) and caches it, including failures"""
+
+    def __init__(self) -> None:
+        self._services: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._stopping = threading.Event()
+        self.ready = False
+        self._factories: Dict[str, Callable[[], Any]] = {
+            "bad_filter": self._build_bad_filter,
+            "doc_handler": self._build_doc_handler,
+            "qa_engine": self._build_qa_engine,
+            "summarizer": self._build_summarizer,
+            "keyword_extractor": self._build_keyword_extractor,
+        }
+
+    # Factories import lazily so importing the container stays cheap
+
+    def _build_bad_filter(self):
+        from .bad_language_filter import BadLanguageFilter
+        return BadLanguageFilter()
+
+    def _build_doc_handler(self):
+        from .document_request_handler import DocumentRequestHandler
+        return DocumentRequestHandler()
+
+    def _build_qa_engine(self):
+        from .qa_engine import HybridQAEngine
+        return HybridQAEngine(doc_handler=self.doc_handler)
+
+    def _build_summarizer(self):
+        from .gemini_summarizer import GeminiSummarizer
+        return GeminiSummarizer()
+
+    def _build_keyword_extractor(self):
+        from .keyword_extractor import KeywordExtractor
+        return KeywordExtractor()
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return the named service, building it on first access; None if it failed to build"""
+        if name in self._services:
+            return self._services[name]
+
+        with self._lock:
+            if name not in self._services:
+                try:
+                    self._services[name] = self._factories[name]()
+                    logger.info(f"✅ Service '{name}' initialized successfully")
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize service '{name}': {str(e)}")
+                    self._services[name] = None
+            return self._services[name]
+
+    @property
+    def bad_filter(self):
+        return self.get("bad_filter")
+
+    @property
+    def doc_handler(self):
+        return self.get("doc_handler")
+
+    @property
+    def qa_engine(self):
+        return self.get("qa_engine")
+
+    @property
+    def summarizer(self):
+        return self.get("summarizer")
+
+    @property
+    def keyword_extractor(self):
+        return self.get("keyword_extractor")
+
+    def startup(self) -> None:
+        """Build every service up front so the first request does not pay for model loading"""
+        for name in self._factories:
+            if self._stopping.is_set():
+                logger.info("⚠️ Service warm-up interrupted by shutdown")
+                return
+            self.get(name)
+        self.ready = True
+        ready = [name for name, service in self._services.items() if service is not None]
+        logger.info(f"✅ Service container ready: {', '.join(ready) or 'no services'}")
+
+    def mark_ready(self) -> None:
+        """Lazy mode: report ready without building anything; services load on first use"""
+        self.ready = True
+
+    def stop_warmup(self) -> None:
+        """Ask a running ``startup`` to stop after the service it is building"""
+        self._stopping.set()
+
+    def shutdown(self) -> None:
+        """Release service resources (thread pools, open handles)"""
+        self._stopping.set()
+        self.ready = False
+        with self._lock:
+            for name, release in (("qa_engine", "close"), ("summarizer", "cleanup")):
+                service = self._services.get(name)
+                if service is not None:
+                    try:
+                        getattr(service, release)()
+                    except Exception as e:
+                        logger.error(f"❌ Failed to release service '{name}': {str(e)}")
+            self._services.clear()
+        from .doc_parser import shutdown_page_pool
+        shutdown_page_pool()
+        logger.info("✅ Service container shut down")
+
+    def status(self) -> Dict[str, bool]:
+        """Which services have been built successfully"""
+        return {name: self._services.get(name) is not None for name in self._factories}
+
+
+# Global service container
+container = ServiceContainer()
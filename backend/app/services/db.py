@@ -1,8 +1,6 @@
 import os
 import json
 from typing import List, Dict, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import MongoClient
 import logging
 from ..config import get_mongodb_uri
 
@@ -26,6 +24,7 @@ class DatabaseService:
             if mongo_uri and "mongodb+srv://" in mongo_uri:
                 # Try to connect to MongoDB Atlas
                 try:
+                    from motor.motor_asyncio import AsyncIOMotorClient
                     self.client = AsyncIOMotorClient(mongo_uri, serverSelectionTimeoutMS=5000)
                     self.db = self.client.hr_assistant
                     self.employees_collection = self.db.employees
@@ -176,8 +175,11 @@ class DatabaseService:
             
             qa_data.append({"question": question, "answer": answer})
             
-            with open(json_file, 'w', encoding='utf-8') as f:
+            # Write to a temporary file and rename it, so the QA engine's dataset watcher never reads a partial file
+            tmp_file = f"{json_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(qa_data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, json_file)
                 
             logger.info("✅ Added new QA pair to local JSON file")
         except Exception as e:
@@ -2,38 +2,217 @@ from __future__ import annotations
 
 import os
 import io
-from pathlib import Path
-import pdfplumber
-import fitz  # PyMuPDF
-from docx import Document
-from pdf2image import convert_from_bytes
-import pytesseract
-import pandas as pd
-import camelot
-import tabula
+import logging
+import hashlib
 import tempfile
-import time
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Tuple
 
+from .query_cache import LRUCache
+from ..config import get_parsed_document_cache_size, get_pdf_parse_workers, get_pdf_parallel_min_pages
 
-def parse_document(filename: str, content: bytes) -> str:
+logger = logging.getLogger(__name__)
+
+# Parser libraries are imported by the functions that use them, so importing
+# this module (and every router that parses uploads) stays cheap
+
+
+@dataclass
+class ParsedDocument:
+    """One parse of an uploaded file, shared by the analyzer, the summarizer and keyword extraction"""
+    filename: str
+    sha256: str
+    text: str
+    page_ends: List[int] = field(default_factory=list)  # end offset of each page in text; empty for docx, txt
+    tables: Optional[list] = None  # TableData list, filled in by PDFAnalyzer on first use
+
+    @classmethod
+    def from_pages(cls, filename: str, sha256: str, pages: List[str]) -> ParsedDocument:
+        """Join the pages once; only their offsets are kept, so the text is not held twice"""
+        page_ends: List[int] = []
+        end = -1
+        for page in pages:
+            end += len(page) + 1
+            page_ends.append(end)
+        return cls(filename, sha256, "\n".join(pages), page_ends)
+
+    def iter_pages(self) -> Iterator[str]:
+        """Text of each page, sliced from text one page at a time (the whole text for formats without pages)"""
+        if not self.page_ends:
+            yield self.text
+            return
+        start = 0
+        for end in self.page_ends:
+            yield self.text[start:end]
+            start = end + 1
+
+    @property
+    def page_count(self) -> int:
+        return len(self.page_ends)
+
+
+# Recent parses by content hash, so a document parsed again (e.g. by another endpoint) is not re-parsed
+# or re-OCRed. Each entry holds a whole document's text; re-uploads are served by the summary cache.
+_parsed_documents = LRUCache(get_parsed_document_cache_size(), ttl_seconds=0, name="parsed_documents")
+
+
+def parse(filename: str, content: bytes) -> ParsedDocument:
+    """Parse an upload once; with PARSED_DOCUMENT_CACHE_SIZE > 0, identical uploads share the cached ParsedDocument"""
     suffix = Path(filename).suffix.lower()
+    sha256 = hashlib.sha256(content).hexdigest()
+    use_cache = get_parsed_document_cache_size() > 0
+    if use_cache:
+        cached = _parsed_documents.get((sha256, suffix))
+        if cached is not None:
+            return cached
+
     if suffix == ".pdf":
-        return _parse_pdf(content)
-    if suffix == ".docx":
-        return _parse_docx(content)
-    if suffix in {".txt", ""}:
-        return content.decode("utf-8", errors="ignore")
-    raise ValueError(f"Unsupported file type: {suffix}")
+        document = ParsedDocument.from_pages(filename, sha256, _parse_pdf(content))
+    elif suffix == ".docx":
+        document = ParsedDocument(filename, sha256, _parse_docx(content))
+    elif suffix in {".txt", ""}:
+        document = ParsedDocument(filename, sha256, content.decode("utf-8", errors="ignore"))
+    else:
+        raise ValueError(f"Unsupported file type: {suffix}")
+
+    if use_cache:
+        _parsed_documents.set((sha256, suffix), document)
+    return document
+
+
+def parse_document(filename: str, content: bytes) -> str:
+    return parse(filename, content).text
+
+
+def parsed_document_cache_stats() -> dict:
+    return _parsed_documents.stats()
+
+
+# Page extraction pool, created on the first large PDF (see iter_pdf_pages)
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+
+# Page ranges handed out per worker, so one slow range does not hold up the rest
+BATCHES_PER_WORKER = 4
+
 
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    global _page_pool, _page_pool_workers
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers != workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            # spawn: forking a server process that runs threads (and model runtimes) is unsafe
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _page_pool_workers = workers
+        return _page_pool
+
+
+def shutdown_page_pool() -> None:
+    """Stop the page extraction workers (application shutdown)"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=True)
+            _page_pool = None
+
+
+def page_batches(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Contiguous [start, stop) page ranges covering the document, about BATCHES_PER_WORKER per worker"""
+    batches = max(1, min(page_count, workers * BATCHES_PER_WORKER))
+    bounds = [round(i * page_count / batches) for i in range(batches + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _release_page(page) -> None:
+    """Drop the layout objects pdfplumber caches on every page read (they dominate memory on large PDFs)"""
+    close = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+    if close is not None:
+        close()
+
+
+def _read_pages(pages) -> Iterator[str]:
+    for page in pages:
+        yield page.extract_text() or ""
+        _release_page(page)
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop) of the PDF at path (runs in a pool worker)"""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return list(_read_pages(pdf.pages[start:stop]))
+
+
+def _iter_pages_serial(content: bytes, start: int = 0) -> Iterator[str]:
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        yield from _read_pages(pdf.pages[start:])
+
+
+def _iter_pages_parallel(content: bytes, page_count: int, workers: int) -> Iterator[str]:
+    """Page batches run on the process pool (workers open the PDF from one temp file) and are yielded
+    in document order; at most two batches per worker are in flight, so finished pages do not pile up"""
+    batches = page_batches(page_count, workers)
+    pending: Deque[Future] = deque()
+    yielded = 0
+    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        pool = _get_page_pool(workers)
+        next_batch = 0
+        while pending or next_batch < len(batches):
+            while next_batch < len(batches) and len(pending) < 2 * workers:
+                start, stop = batches[next_batch]
+                pending.append(pool.submit(_extract_page_range, tmp_path, start, stop))
+                next_batch += 1
+            batch = pending.popleft().result()
+            for text in batch:
+                yield text
+                yielded += 1
+    except Exception as e:
+        logger.warning(f"⚠️ Parallel page extraction failed after {yielded} pages, continuing serially: {str(e)}")
+        yield from _iter_pages_serial(content, start=yielded)
+    finally:
+        for future in pending:
+            future.cancel()
+        os.unlink(tmp_path)
+
+
+def iter_pdf_pages(content: bytes) -> Iterator[str]:
+    """pdfplumber text of each page, in order, one page at a time. Layout objects are released as soon as
+    a page is read; documents with at least PDF_PARALLEL_MIN_PAGES pages are read by the process pool"""
+    import pdfplumber
+
+    workers = get_pdf_parse_workers()
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count < max(2, get_pdf_parallel_min_pages()):
+            # Read from the PDF already opened for the page count
+            yield from _read_pages(pdf.pages)
+            return
+    yield from _iter_pages_parallel(content, page_count, workers)
+
+
+def _parse_pdf(content: bytes) -> List[str]:
+    """Text of each page; pages without a text layer are OCRed when the whole document has too little text"""
+    import fitz  # PyMuPDF
 
-def _parse_pdf(content: bytes) -> str:
     text_parts: list[str] = []
     try:
         # Prefer pdfplumber for layout; fallback to PyMuPDF
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            for page in pdf.pages:
-                text_parts.append(page.extract_text() or "")
+        text_parts = list(iter_pdf_pages(content))
     except Exception:
+        text_parts = []  # drop pages pdfplumber read before failing, so each page appears once
         with fitz.open(stream=content, filetype="pdf") as doc:
             for page in doc:
                 text_parts.append(page.get_text())
@@ -43,6 +222,10 @@ def _parse_pdf(content: bytes) -> str:
     table_text_parts: list[str] = []
     
     # TODO: Re-enable table extraction once JPype is properly configured
+    # import tempfile, time
+    # import pandas as pd
+    # import camelot
+    # import tabula
     # try:
     #     # Create temporary file with unique name to avoid conflicts
     #     tmp_fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
@@ -92,12 +275,15 @@ def _parse_pdf(content: bytes) -> str:
         text_parts.append("\n".join(table_text_parts))
         
     # If still too little text, try OCR for scanned PDFs with guardrails
-    if len("".join(text_parts).strip()) < 50:
+    if sum(len(part.strip()) for part in text_parts) < 50:
         ocr_enabled = os.getenv("OCR_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
         if ocr_enabled:
             dpi = int(os.getenv("OCR_DPI", "200"))
             max_pages = int(os.getenv("OCR_MAX_PAGES", "3"))
             try:
+                from pdf2image import convert_from_bytes
+                import pytesseract
+
                 total_pages = 0
                 try:
                     with fitz.open(stream=content, filetype="pdf") as d:
@@ -111,15 +297,21 @@ def _parse_pdf(content: bytes) -> str:
                     first_page=1 if last_page else None,
                     last_page=last_page,
                 )
-                for img in images:
-                    text_parts.append(pytesseract.image_to_string(img) or "")
+                for i, img in enumerate(images):
+                    ocr_text = pytesseract.image_to_string(img) or ""
+                    if i < len(text_parts):
+                        text_parts[i] = ocr_text
+                    else:
+                        text_parts.append(ocr_text)
             except Exception:
                 # OCR dependencies (poppler/tesseract) may be missing; skip silently
                 pass
-    return "\n".join(text_parts)
+    return text_parts
 
 
 def _parse_docx(content: bytes) -> str:
+    from docx import Document
+
     bio = io.BytesIO(content)
     doc = Document(bio)
     return "\n".join(p.text for p in doc.paragraphs)
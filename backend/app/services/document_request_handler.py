@@ -5,8 +5,6 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import os
 
-from .document_pdf_generator import DocumentPDFGenerator
-
 class DocumentRequestHandler:
     """Handles document requests with step-by-step flow"""
     
@@ -35,6 +33,8 @@ class DocumentRequestHandler:
         self.requests = self._load_requests()
         
         # Initialize PDF generator
+        # reportlab is loaded when the handler is built, not when the module is imported
+        from .document_pdf_generator import DocumentPDFGenerator
         self.pdf_generator = DocumentPDFGenerator()
     
     def _load_requests(self) -> List[Dict]:
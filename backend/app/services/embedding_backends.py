@@ -0,0 +1,88 @@
+"""
+Quantized ONNX runtime for the QA sentence model.
+
+``OnnxSentenceEncoder`` runs an int8-quantized export of all-MiniLM-L6-v2
+(see ``scripts/export_onnx_embedder.py``) through onnxruntime on CPU, with the
+model's fast tokenizer. It mirrors ``SentenceTransformer.encode`` (mean pooling
+plus optional L2 normalization), so the QA engine can use either runtime.
+
+onnxruntime and tokenizers are optional dependencies; they are only imported
+when this backend is selected with ``QA_EMBEDDING_BACKEND=onnx-int8``.
+"""
+
+import os
+import logging
+from pathlib import Path
+from typing import List, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("torch", "onnx-int8")
+
+ONNX_MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+MAX_SEQ_LENGTH = 256
+
+
+class OnnxSentenceEncoder:
+    """CPU sentence encoder backed by an int8 ONNX export of the sentence model"""
+
+    def __init__(self, model_dir: Path, max_seq_length: int = MAX_SEQ_LENGTH, intra_op_threads: int = 0) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_file = model_dir / ONNX_MODEL_FILE
+        if not model_file.exists():
+            raise FileNotFoundError(f"ONNX model not found at {model_file}; run scripts/export_onnx_embedder.py")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or min(4, os.cpu_count() or 1)
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        self.model_dir = model_dir
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32,
+               normalize_embeddings: bool = False, **_) -> np.ndarray:
+        """Embed sentences; same output layout as SentenceTransformer.encode"""
+        single = isinstance(sentences, str)
+        texts: List[str] = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        embeddings = np.concatenate(batches, axis=0)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        # Mean pooling over real (non-padding) tokens, as in the sentence-transformers pooling layer
+        mask = attention_mask[:, :, None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        return (summed / np.maximum(mask.sum(axis=1), 1e-9)).astype(np.float32)
+
+    @property
+    def dimension(self) -> int:
+        return int(self.session.get_outputs()[0].shape[-1] or 384)
+
+
+def embedding_model_id(base_model_id: str, backend: str) -> str:
+    """Model id recorded in artifact keys; quantized embeddings never mix with full-precision ones"""
+    return base_model_id if backend == "torch" else f"{base_model_id}@{backend}"
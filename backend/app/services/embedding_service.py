@@ -0,0 +1,115 @@
+"""
+Dynamic micro-batching of query embeddings.
+
+Requests are queued and a single worker task drains the queue into batches of up
+to ``max_batch`` texts. Each batch is encoded in a dedicated one-thread executor,
+so the event loop never blocks on a model forward pass. While one batch is
+encoding, new requests accumulate and are encoded together in the next one.
+``max_wait_ms`` optionally holds a non-full batch a little longer to collect more.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Queues texts, encodes them in batches off the event loop and resolves per-request futures"""
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], max_batch: int = 32, max_wait_ms: float = 2.0) -> None:
+        self._encode = encode
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+        # Counters for health reporting
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Embedding for one text, encoded together with whatever else is queued"""
+        if self._closed:
+            raise RuntimeError("Embedding service is closed")
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self.requests += 1
+        await self._queue.put((text, future))
+        return await future
+
+    async def _next_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        if len(batch) < self.max_batch and self.max_wait > 0:
+            deadline = self._loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            pending = [(text, future) for text, future in batch if not future.cancelled()]
+            if not pending:
+                continue
+
+            # Identical texts in one batch are encoded once
+            unique: Dict[str, int] = {}
+            for text, _ in pending:
+                unique.setdefault(text, len(unique))
+
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(pending))
+            try:
+                vectors = await self._loop.run_in_executor(self._executor, self._encode, list(unique))
+            except Exception as e:
+                logger.error(f"❌ Embedding batch of {len(unique)} failed: {str(e)}")
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for text, future in pending:
+                if not future.done():
+                    future.set_result(vectors[unique[text]])
+
+    def stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "largest_batch": self.largest_batch,
+            "mean_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    def close(self) -> None:
+        """Stop the worker task and the encode thread"""
+        self._closed = True
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._executor.shutdown(wait=False)
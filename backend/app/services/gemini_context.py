@@ -0,0 +1,189 @@
+"""
+Static Gemini prompt prefixes, uploaded once instead of with every call.
+
+The QA engine's instruction block (policy topics and guidelines) and the
+summarizer's analysis instructions are identical for every request. A
+``GeminiContext`` owns one such prefix for one model; ``GEMINI_CONTEXT_CACHE``
+picks how it reaches the API:
+
+- ``cache``: the prefix is stored server side as a
+  ``caching.CachedContent`` and calls go through
+  ``GenerativeModel.from_cached_content``, so only the question or chunk is
+  uploaded and the cached tokens are billed at the reduced rate. The cache is
+  recreated shortly before its TTL runs out, or when a call finds it gone.
+  If the API refuses to create it (model without caching support, prefix
+  below the minimum cacheable size) the context falls back to ``system``.
+  Only worth enabling once the prefix exceeds the model's minimum cacheable
+  size; the current prefixes are below it.
+- ``system`` (default): the prefix is the model's ``system_instruction``.
+- ``off``: the prefix is prepended to every prompt.
+
+Each call's ``usage_metadata`` is recorded, so ``stats()`` reports prompt
+tokens, tokens served from the cache (not re-uploaded) and the share saved.
+"""
+
+import time
+import logging
+import datetime
+import threading
+from typing import Any, Dict, Optional
+
+from ..config import gemini_stub_enabled
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_MODES = ("cache", "system", "off")
+
+# Recreate the server-side cache this long before it expires, so no call races the expiry
+CACHE_REFRESH_MARGIN_SECONDS = 60.0
+
+# Error text of calls whose cached content was evicted or has expired server side
+_MISSING_CACHE_MESSAGES = ("not found", "expired", "permission denied")
+
+
+def load_genai():
+    """The Gemini SDK module, or the offline stub when GEMINI_API_STUB is set"""
+    if gemini_stub_enabled():
+        from . import gemini_stub
+        return gemini_stub
+    import google.generativeai as genai
+    return genai
+
+
+def _is_missing_cache_error(error: Exception) -> bool:
+    """Whether a call failed because its cached content is gone (rate limits, quota and safety errors are not)"""
+    message = str(error).lower()
+    return "cache" in message and any(text in message for text in _MISSING_CACHE_MESSAGES)
+
+
+class GeminiContext:
+    """One static instruction prefix for one model, cached server side when possible, with token accounting"""
+
+    def __init__(self, genai, model_id: str, instruction: str, name: str, mode: str = "system",
+                 ttl_seconds: float = 3600.0) -> None:
+        if mode not in CONTEXT_MODES:
+            raise ValueError(f"Unknown Gemini context mode: {mode} (choose from {', '.join(CONTEXT_MODES)})")
+        self.genai = genai
+        self.model_id = model_id
+        self.instruction = instruction.strip()
+        self.name = name
+        self.mode = mode
+        self.ttl_seconds = max(ttl_seconds, 2 * CACHE_REFRESH_MARGIN_SECONDS)
+        self._model = None
+        self._cached_content = None
+        self._refresh_at = 0.0
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.cache_creations = 0
+        self.last_call: Optional[Dict] = None
+
+    def model(self):
+        """Model to send the per-request part of the prompt to"""
+        with self._lock:
+            if self.mode == "cache" and (self._model is None or time.monotonic() >= self._refresh_at):
+                self._model = self._create_cached_model()
+            if self._model is None:
+                if self.mode == "system":
+                    self._model = self.genai.GenerativeModel(self.model_id, system_instruction=self.instruction)
+                else:
+                    self._model = self.genai.GenerativeModel(self.model_id)
+            return self._model
+
+    def _create_cached_model(self):
+        """Upload the prefix as cached content; on failure switch this context to system instructions"""
+        self._delete_cached_content()
+        try:
+            self._cached_content = self.genai.caching.CachedContent.create(
+                model=self.model_id if self.model_id.startswith("models/") else f"models/{self.model_id}",
+                display_name=f"org-ai-chatbot-{self.name}",
+                system_instruction=self.instruction,
+                ttl=datetime.timedelta(seconds=self.ttl_seconds),
+            )
+            self._refresh_at = time.monotonic() + self.ttl_seconds - CACHE_REFRESH_MARGIN_SECONDS
+            self.cache_creations += 1
+            logger.info(f"✅ Cached Gemini context '{self.name}' as {self._cached_content.name}")
+            return self.genai.GenerativeModel.from_cached_content(cached_content=self._cached_content)
+        except Exception as e:
+            logger.warning(f"⚠️ Gemini context caching unavailable for '{self.name}', "
+                           f"using a system instruction instead: {str(e)}")
+            self._cached_content = None
+            self.mode = "system"
+            return None
+
+    def prompt(self, request_text: str) -> str:
+        """Full prompt for this call: the prefix is only inlined when it is not held by the model"""
+        if self.mode == "off":
+            return f"{self.instruction}\n\n{request_text}"
+        return request_text
+
+    def generate(self, request_text: str, stream: bool = False, **kwargs) -> Any:
+        """generate_content with the static prefix attached; non-streaming usage is recorded here"""
+        model = self.model()
+        try:
+            response = model.generate_content(self.prompt(request_text), stream=stream, **kwargs)
+        except Exception as e:
+            if self.mode != "cache" or not _is_missing_cache_error(e):
+                raise
+            # The cached content was evicted server side; recreate it once and retry
+            with self._lock:
+                if self._model is model:
+                    self._model = None
+            response = self.model().generate_content(self.prompt(request_text), stream=stream, **kwargs)
+        if not stream:
+            self.record(response)
+        return response
+
+    def record(self, response: Any) -> Optional[Dict]:
+        """Record one call's token usage from a response (or the last chunk of a stream)"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return None
+        prompt_tokens = int(getattr(usage, "prompt_token_count", 0) or 0)
+        cached_tokens = int(getattr(usage, "cached_content_token_count", 0) or 0)
+        output_tokens = int(getattr(usage, "candidates_token_count", 0) or 0)
+        call = {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "uploaded_tokens": prompt_tokens - cached_tokens,
+            "output_tokens": output_tokens,
+        }
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.output_tokens += output_tokens
+            self.last_call = call
+        return call
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "cached_content": self._cached_content.name if self._cached_content is not None else None,
+            "cache_creations": self.cache_creations,
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "output_tokens": self.output_tokens,
+            "saved_ratio": round(self.cached_tokens / self.prompt_tokens, 4) if self.prompt_tokens else 0.0,
+            "cached_tokens_per_call": round(self.cached_tokens / self.calls, 1) if self.calls else 0.0,
+            "last_call": self.last_call,
+        }
+
+    def _delete_cached_content(self) -> None:
+        if self._cached_content is None:
+            return
+        try:
+            self._cached_content.delete()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to delete cached Gemini context {self._cached_content.name}: {str(e)}")
+        self._cached_content = None
+
+    def close(self) -> None:
+        """Delete the server-side cache instead of leaving it to expire"""
+        with self._lock:
+            self._delete_cached_content()
+            self._model = None
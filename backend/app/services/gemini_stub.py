@@ -0,0 +1,158 @@
+"""
+Offline stand-in for the parts of ``google.generativeai`` the backend uses.
+
+Enabled with ``GEMINI_API_STUB=true`` (see ``gemini_context.load_genai``), so the
+QA engine, the summarizer and server-side context caching can be exercised
+without network access or an API key:
+
+- ``configure``, ``GenerativeModel(model_name, system_instruction=...)``,
+  ``GenerativeModel.from_cached_content`` and ``generate_content`` (plain or
+  ``stream=True``) with deterministic answers; prompts asking for JSON get a
+  JSON summary so the summarizer's parser is exercised too
+- ``caching.CachedContent.create / get / delete`` with TTL expiry
+- ``usage_metadata`` on every response, counting roughly four characters per
+  token, with ``cached_content_token_count`` set when a cache is referenced
+
+``GEMINI_STUB_LATENCY_MS`` adds a fixed delay per call. ``min_cache_tokens``
+can be raised to reproduce the API rejecting prefixes that are too small to cache.
+"""
+
+import json
+import time
+import hashlib
+import datetime
+import threading
+import itertools
+from types import SimpleNamespace
+from typing import Dict, Iterator, Optional
+
+from ..config import get_gemini_stub_latency_ms
+
+# Smallest prefix CachedContent.create accepts (the real API enforces a per-model minimum)
+min_cache_tokens = 0
+
+# Calls served, for benchmarks and offline checks
+calls = 0
+_calls_lock = threading.Lock()
+
+
+def configure(api_key: Optional[str] = None, **kwargs) -> None:
+    """Accepts and ignores the SDK configuration"""
+
+
+def count_text_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+def _usage(prompt_tokens: int, cached_tokens: int, output_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        cached_content_token_count=cached_tokens,
+        candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens,
+    )
+
+
+class CachedContent:
+    """Server-side cached prompt prefix, kept in process memory"""
+
+    _store: Dict[str, "CachedContent"] = {}
+    _ids = itertools.count(1)
+
+    def __init__(self, name: str, model: str, system_instruction: str, ttl_seconds: float,
+                 display_name: Optional[str] = None) -> None:
+        self.name = name
+        self.model = model
+        self.display_name = display_name
+        self.system_instruction = system_instruction
+        self.expire_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl_seconds)
+        self.usage_metadata = SimpleNamespace(total_token_count=count_text_tokens(system_instruction))
+
+    @classmethod
+    def create(cls, model: str, *, display_name: Optional[str] = None, system_instruction: Optional[str] = None,
+               contents=None, ttl=None, **kwargs) -> "CachedContent":
+        text = "\n".join(part for part in (system_instruction, contents) if isinstance(part, str))
+        if count_text_tokens(text) < min_cache_tokens:
+            raise ValueError(f"Cached content is too small: {count_text_tokens(text)} tokens, "
+                             f"minimum is {min_cache_tokens}")
+        if isinstance(ttl, datetime.timedelta):
+            ttl = ttl.total_seconds()
+        cached = cls(f"cachedContents/stub-{next(cls._ids)}", model, text, float(ttl or 3600), display_name)
+        cls._store[cached.name] = cached
+        return cached
+
+    @classmethod
+    def get(cls, name: str) -> "CachedContent":
+        cached = cls._store.get(name)
+        if cached is None or cached.expired:
+            raise LookupError(f"CachedContent not found (or expired): {name}")
+        return cached
+
+    @property
+    def expired(self) -> bool:
+        return datetime.datetime.now(datetime.timezone.utc) >= self.expire_time
+
+    def delete(self) -> None:
+        self._store.pop(self.name, None)
+
+
+caching = SimpleNamespace(CachedContent=CachedContent)
+
+
+class GenerativeModel:
+    """Deterministic model: the same prompt always gets the same answer"""
+
+    def __init__(self, model_name: str = "gemini-stub", system_instruction: Optional[str] = None, **kwargs) -> None:
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self._cached_content: Optional[str] = None
+
+    @classmethod
+    def from_cached_content(cls, cached_content, **kwargs) -> "GenerativeModel":
+        if isinstance(cached_content, str):
+            cached_content = CachedContent.get(cached_content)
+        model = cls(model_name=cached_content.model)
+        model._cached_content = cached_content.name
+        return model
+
+    def count_tokens(self, contents: str) -> SimpleNamespace:
+        return SimpleNamespace(total_tokens=count_text_tokens(str(contents)))
+
+    def _respond(self, prompt: str) -> SimpleNamespace:
+        global calls
+        with _calls_lock:
+            calls += 1
+        latency_ms = get_gemini_stub_latency_ms()
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+
+        prefix, cached_tokens = self.system_instruction or "", 0
+        if self._cached_content is not None:
+            # Referencing an expired or deleted cache fails like the real API
+            cached = CachedContent.get(self._cached_content)
+            prefix, cached_tokens = cached.system_instruction, cached.usage_metadata.total_token_count
+
+        digest = hashlib.sha1(f"{prefix}\n{prompt}".encode("utf-8")).hexdigest()[:12]
+        if "JSON" in prefix or "JSON" in prompt:
+            text = json.dumps({
+                "executive_summary": f"[gemini-stub {digest}] Summary of the supplied content.",
+                "key_points": ["Stub key point"],
+                "table_insights": [],
+                "main_takeaways": ["Stub takeaway"],
+                "section_summaries": [],
+            })
+        else:
+            text = f"[gemini-stub {digest}] This question is not covered by the local dataset."
+
+        prompt_tokens = count_text_tokens(prompt) + (cached_tokens or count_text_tokens(prefix))
+        return SimpleNamespace(text=text, usage_metadata=_usage(prompt_tokens, cached_tokens, count_text_tokens(text)))
+
+    def generate_content(self, contents, stream: bool = False, **kwargs):
+        response = self._respond(str(contents))
+        if not stream:
+            return response
+        return self._stream(response)
+
+    def _stream(self, response: SimpleNamespace) -> Iterator[SimpleNamespace]:
+        for word in response.text.split():
+            yield SimpleNamespace(text=word + " ", usage_metadata=response.usage_metadata)
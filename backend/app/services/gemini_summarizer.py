@@ -9,22 +9,103 @@ TODO List:
 7. Scalable multi-user handling - DONE
 8. Error handling and retry logic - DONE
 9. Rate limiting and cost optimization - DONE
-10. Caching for repeated documents - TODO
+10. Caching for repeated documents - DONE
 """
 
+from __future__ import annotations
+
 import os
 import re
 import json
 import asyncio
-from typing import Dict, List, Tuple, Optional, Any
-from dataclasses import dataclass
+import logging
+import itertools
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Tuple, Optional, Any
+from dataclasses import dataclass, field
 from pathlib import Path
-import pandas as pd
-import google.generativeai as genai
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .doc_parser import parse_document
-from .pdf_analyzer import PDFAnalyzer, DocumentStructure
+from .doc_parser import parse
+from .pdf_analyzer import PDFAnalyzer, TableData
+from .gemini_context import GeminiContext, load_genai
+from .summary_cache import SummaryCache
+from .token_counter import TokenCounter, get_token_counter
+from ..config import (
+    get_gemini_context_mode,
+    get_gemini_context_cache_ttl_seconds,
+    gemini_stub_enabled,
+    summary_cache_enabled,
+    get_summary_cache_dir,
+    get_summary_cache_max_entries,
+    get_summary_cache_max_disk_mb,
+    get_summary_chunk_token_budget,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+GEMINI_MODEL_ID = 'gemini-2.0-flash-exp'
+# Bump when prompts, chunking or the cached fields change so cached summaries are not reused
+SUMMARY_PROMPT_VERSION = "3"
+
+# Per-call tokens kept free for the prompt header and a "(continued)" section label
+PROMPT_RESERVE_TOKENS = 64
+
+# Static instructions, uploaded once per model as cached context (see gemini_context.py)
+CHUNK_SUMMARY_INSTRUCTION = """You are an expert document analyst. Analyze the document content you are given and provide a comprehensive summary.
+
+INSTRUCTIONS:
+1. Provide a concise but complete summary
+2. Extract key points and insights
+3. If tables are present, analyze their content and trends
+4. Preserve important numbers, dates, and names
+5. Focus on actionable insights and main takeaways
+
+RESPONSE FORMAT (JSON):
+{
+  "executive_summary": "2-3 paragraph executive summary",
+  "key_points": ["point1", "point2", "point3", ...],
+  "table_insights": ["insight1", "insight2", ...],
+  "main_takeaways": ["takeaway1", "takeaway2", ...],
+  "section_summaries": [
+    {
+      "section": "section_name",
+      "summary": "section summary",
+      "key_points": ["point1", "point2"]
+    }
+  ]
+}
+
+Provide your response in valid JSON format only."""
+
+FINAL_SUMMARY_INSTRUCTION = """You are an expert document analyst. Create a comprehensive final summary from the chunk summaries you are given.
+
+INSTRUCTIONS:
+1. Create a cohesive executive summary that covers the entire document
+2. Consolidate key points from all chunks
+3. Identify overarching themes and patterns
+4. Provide actionable insights
+5. Ensure the summary flows logically
+
+RESPONSE FORMAT (JSON):
+{
+  "executive_summary": "Comprehensive 3-4 paragraph executive summary covering the entire document",
+  "key_points": ["consolidated point1", "consolidated point2", "consolidated point3", ...],
+  "table_insights": ["overall table insight1", "overall table insight2", ...],
+  "main_takeaways": ["overall takeaway1", "overall takeaway2", ...],
+  "section_summaries": [
+    {
+      "section": "major_section_name",
+      "summary": "comprehensive section summary",
+      "key_points": ["consolidated point1", "consolidated point2"]
+    }
+  ]
+}
+
+Provide your response in valid JSON format only."""
 
 
 @dataclass
@@ -50,6 +131,16 @@ class ChunkInfo:
     token_estimate: int
 
 
+@dataclass
+class TextBlock:
+    """Lines of one page within one section: the unit the chunker packs into chunks"""
+    page: int
+    section: Optional[str]
+    starts_section: bool
+    text: str
+    tokens: int
+
+
 @dataclass
 class SummaryResult:
     """Complete summary result"""
@@ -61,55 +152,81 @@ class SummaryResult:
     total_pages: int
     processing_time: float
     model_used: str
+    keywords: List[str] = field(default_factory=list)
+    cached: bool = False
 
 
 class GeminiSummarizer:
     def __init__(self):
         # Initialize Gemini API
         api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-        if not api_key:
+        if not api_key and not gemini_stub_enabled():
             raise ValueError("GOOGLE_GEMINI_API_KEY environment variable is required")
         
+        # Imported here so the app can start (and answer /health) before the SDK loads
+        genai = load_genai()
         genai.configure(api_key=api_key)
         
         # Initialize model - Using advanced AI for better performance
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.model = genai.GenerativeModel(GEMINI_MODEL_ID)
+        
+        # Static chunk / final-summary instructions are sent once, not with every chunk
+        mode, ttl = get_gemini_context_mode(), get_gemini_context_cache_ttl_seconds()
+        self.chunk_context = GeminiContext(genai, GEMINI_MODEL_ID, CHUNK_SUMMARY_INSTRUCTION, name="summary-chunk",
+                                           mode=mode, ttl_seconds=ttl)
+        self.final_context = GeminiContext(genai, GEMINI_MODEL_ID, FINAL_SUMMARY_INSTRUCTION, name="summary-final",
+                                           mode=mode, ttl_seconds=ttl)
         
         # Configuration
-        self.max_tokens_per_chunk = 2000000  # Advanced AI context limit (2M tokens)
+        self.chunk_token_budget = get_summary_chunk_token_budget()  # Tokens per Gemini call; longer documents are map-reduced
         self.max_concurrent_requests = 5  # Rate limiting
         self.retry_attempts = 3
-        self.chunk_overlap = 1000  # Words overlap between chunks
         
         # Initialize components
         self.pdf_analyzer = PDFAnalyzer()
         
         # Thread pool for concurrent processing
         self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests)
+        
+        # Repeated uploads of the same document are served from the summary cache
+        self.summary_cache = None
+        if summary_cache_enabled():
+            self.summary_cache = SummaryCache(
+                get_summary_cache_dir(),
+                max_entries=get_summary_cache_max_entries(),
+                max_disk_bytes=int(get_summary_cache_max_disk_mb() * 2**20),
+                namespace=f"{GEMINI_MODEL_ID}|prompt-v{SUMMARY_PROMPT_VERSION}",
+            )
+    
+    async def summarize_pdf(self, filename: str, content: bytes, keyword_extractor=None) -> SummaryResult:
+        """Main function to summarize PDF using Gemini; identical documents are served from the summary cache
+        before anything is parsed. Keywords (with a KeywordExtractor) are cached along with the summary."""
+        if self.summary_cache is None:
+            return await self._summarize_pdf(filename, content, keyword_extractor)
+        key = self.summary_cache.key(content, Path(filename).suffix)
+        result, _ = await self.summary_cache.get_or_compute(
+            key, lambda: self._summarize_pdf(filename, content, keyword_extractor)
+        )
+        return result
     
-    async def summarize_pdf(self, filename: str, content: bytes) -> SummaryResult:
-        """Main function to summarize PDF using Gemini"""
+    async def _summarize_pdf(self, filename: str, content: bytes, keyword_extractor=None) -> SummaryResult:
+        """Summarize a PDF with Gemini, bypassing the summary cache"""
         import time
         start_time = time.time()
         
         try:
-            # Step 1: Analyze document structure
-            structure = self.pdf_analyzer.analyze_document(filename, content)
-            
-            # Step 2: Extract text and tables
-            raw_text = parse_document(filename, content)
-            tables = self._extract_tables_structured(raw_text)
+            # Step 1: Parse once (off the event loop) and analyze document structure
+            document = await asyncio.to_thread(parse, filename, content)
+            structure = self.pdf_analyzer.analyze(document)
+            keywords = []
+            if keyword_extractor is not None:
+                keywords = await asyncio.to_thread(keyword_extractor.extract_document, document)
             
-            # Step 3: Chunk content for large documents
-            chunks = self._create_chunks(raw_text, structure.total_pages)
+            # Step 2: Tables come from the same parse
+            tables = self._extract_tables_structured(structure.tables)
             
-            # Step 4: Generate summaries using Gemini
-            if len(chunks) == 1:
-                # Single chunk - direct summarization
-                summary = await self._summarize_single_chunk(chunks[0], tables, structure.doc_type)
-            else:
-                # Multiple chunks - map-reduce approach
-                summary = await self._summarize_multiple_chunks(chunks, tables, structure.doc_type)
+            # Steps 3-4: Chunk page by page and generate summaries using Gemini
+            summary = await self._summarize_pages(document.iter_pages(), tables, structure.doc_type)
             
             # Step 5: Format final result
             processing_time = time.time() - start_time
@@ -122,46 +239,17 @@ class GeminiSummarizer:
                 section_summaries=summary.get("section_summaries", []),
                 total_pages=structure.total_pages,
                 processing_time=processing_time,
-                model_used="gemini-2.0-flash-exp"
+                model_used=GEMINI_MODEL_ID,
+                keywords=keywords
             )
             
         except Exception as e:
             raise Exception(f"PDF summarization failed: {str(e)}")
     
-    async def _summarize_with_gemini(self, raw_text: str, tables: List[TableInfo], structure: DocumentStructure, start_time: float) -> SummaryResult:
-        """Summarize using Gemini API"""
-        # Step 3: Chunk content for large documents
-        chunks = self._create_chunks(raw_text, structure.total_pages)
-        
-        # Step 4: Generate summaries using Gemini
-        if len(chunks) == 1:
-            # Single chunk - direct summarization
-            summary = await self._summarize_single_chunk(chunks[0], tables, structure.doc_type)
-        else:
-            # Multiple chunks - map-reduce approach
-            summary = await self._summarize_multiple_chunks(chunks, tables, structure.doc_type)
-        
-        # Step 5: Format final result
-        processing_time = time.time() - start_time
-        
-        return SummaryResult(
-            document_type=structure.doc_type,
-            executive_summary=summary["executive_summary"],
-            key_points=summary["key_points"],
-            tables=tables,
-            section_summaries=summary.get("section_summaries", []),
-            total_pages=structure.total_pages,
-            processing_time=processing_time,
-            model_used="gemini-2.0-flash-exp"
-        )
-    
-    def _extract_tables_structured(self, text: str) -> List[TableInfo]:
-        """Extract tables in structured format for Gemini"""
+    def _extract_tables_structured(self, table_data_list: List[TableData]) -> List[TableInfo]:
+        """Convert the analyzer's tables to the structured format for Gemini"""
         tables = []
         
-        # Use existing table extraction logic
-        table_data_list = self.pdf_analyzer._extract_tables(text)
-        
         for i, table_data in enumerate(table_data_list):
             if table_data and table_data.data is not None:
                 # Convert to CSV text
@@ -200,120 +288,235 @@ class GeminiSummarizer:
         
         return markdown
     
-    def _create_chunks(self, text: str, total_pages: int) -> List[ChunkInfo]:
-        """Create chunks for large documents"""
-        words = text.split()
-        total_words = len(words)
-        
-        # Estimate tokens (rough approximation: 1 word ≈ 1.3 tokens)
-        estimated_tokens = int(total_words * 1.3)
-        
-        if estimated_tokens <= self.max_tokens_per_chunk:
-            # Single chunk
-            return [ChunkInfo(
-                id=1,
-                content=text,
-                start_page=1,
-                end_page=total_pages,
-                word_count=total_words,
-                token_estimate=estimated_tokens
-            )]
-        
-        # Multiple chunks needed
-        chunks = []
-        chunk_size = int(self.max_tokens_per_chunk / 1.3)  # Convert back to words
-        overlap_words = self.chunk_overlap
-        
-        for i in range(0, total_words, chunk_size - overlap_words):
-            end_idx = min(i + chunk_size, total_words)
-            chunk_words = words[i:end_idx]
-            chunk_text = " ".join(chunk_words)
-            
-            # Estimate page range
-            start_page = max(1, int(i / total_words * total_pages))
-            end_page = min(total_pages, int(end_idx / total_words * total_pages))
-            
-            chunks.append(ChunkInfo(
-                id=len(chunks) + 1,
-                content=chunk_text,
-                start_page=start_page,
-                end_page=end_page,
-                word_count=len(chunk_words),
-                token_estimate=int(len(chunk_words) * 1.3)
-            ))
-        
-        return chunks
+    def _iter_blocks(self, pages: Iterable[str], limit: int) -> Iterator[TextBlock]:
+        """Split the pages at page breaks and section headings (PDFAnalyzer.section_heading)"""
+        counter = get_token_counter()
+        section = None
+        for page_number, page_text in enumerate(pages, start=1):
+            lines: List[str] = []
+            starts_section = False
+            for line in page_text.split("\n"):
+                heading = self.pdf_analyzer.section_heading(line)
+                if heading:
+                    if lines:
+                        yield from self._fit_block(page_number, section, starts_section, lines, limit, counter)
+                    lines, section, starts_section = [], heading, True
+                lines.append(line)
+            if lines:
+                yield from self._fit_block(page_number, section, starts_section, lines, limit, counter)
+    
+    def _fit_block(self, page: int, section: Optional[str], starts_section: bool, lines: List[str],
+                   limit: int, counter: TokenCounter) -> Iterator[TextBlock]:
+        """One block, or several if it exceeds the limit: split at line breaks, long lines at word boundaries"""
+        text = "\n".join(lines)
+        tokens = counter.count(text)
+        if tokens <= limit:
+            yield TextBlock(page, section, starts_section, text, tokens)
+            return
+        
+        pieces = [piece for line in lines for piece in self._split_line(line, limit, counter)]
+        part: List[str] = []
+        part_tokens = 0
+        for piece, count in zip(pieces, counter.count_batch(pieces)):
+            if part and part_tokens + count > limit:
+                yield TextBlock(page, section, starts_section, "\n".join(part), part_tokens)
+                part, part_tokens, starts_section = [], 0, False
+            part.append(piece)
+            part_tokens += count
+        if part:
+            yield TextBlock(page, section, starts_section, "\n".join(part), part_tokens)
+    
+    def _split_line(self, line: str, limit: int, counter: TokenCounter) -> List[str]:
+        tokens = counter.count(line)
+        if tokens <= limit:
+            return [line]
+        words = line.split()
+        parts = -(-tokens // limit)
+        while True:
+            size = max(1, -(-len(words) // parts))
+            pieces = [" ".join(words[i:i + size]) for i in range(0, len(words), size)]
+            if size == 1 or max(counter.count_batch(pieces)) <= limit:
+                return pieces
+            parts *= 2
+    
+    def _iter_chunks(self, pages: Iterable[str], limit: int) -> Iterator[ChunkInfo]:
+        """Pack blocks into chunks of at most `limit` tokens. Only the blocks of the chunk being built are held,
+        so pages can come straight from a page stream (doc_parser.iter_pdf_pages)"""
+        current: List[TextBlock] = []
+        tokens = 0
+        chunk_id = 0
+        
+        for block in self._iter_blocks(pages, limit):
+            while current and tokens + block.tokens > limit:
+                cut = self._chunk_cut(current, limit)
+                chunk_id += 1
+                yield self._make_chunk(chunk_id, current[:cut])
+                current = current[cut:]
+                tokens = sum(b.tokens for b in current)
+            current.append(block)
+            tokens += block.tokens
+        
+        if current:
+            yield self._make_chunk(chunk_id + 1, current)
+    
+    def _chunk_cut(self, blocks: List[TextBlock], limit: int) -> int:
+        """Where to end a full chunk: before its last section start if the chunk stays at least half full,
+        otherwise after all its blocks (a page break or line boundary)"""
+        cut, prefix = len(blocks), 0
+        for i, block in enumerate(blocks):
+            if i > 0 and block.starts_section and prefix >= limit // 2:
+                cut = i
+            prefix += block.tokens
+        return cut
+    
+    def _make_chunk(self, chunk_id: int, blocks: List[TextBlock]) -> ChunkInfo:
+        content = "\n".join(block.text for block in blocks)
+        first = blocks[0]
+        if first.section and not first.starts_section:
+            # Chunk starts mid-section: name the section so the chunk summary keeps its context
+            content = f"[{first.section[:80]} (continued)]\n{content}"
+        return ChunkInfo(
+            id=chunk_id,
+            content=content,
+            start_page=first.page,
+            end_page=blocks[-1].page,
+            word_count=len(content.split()),
+            token_estimate=sum(block.tokens for block in blocks)
+        )
+    
+    async def _summarize_pages(self, pages: Iterable[str], tables: List[TableInfo], doc_type: str) -> Dict:
+        """Chunk the pages and summarize: directly for one chunk, map-reduce for several"""
+        # Tables are sent with every chunk, so the text gets what is left of the per-call budget
+        tables_tokens = await asyncio.to_thread(get_token_counter().count, self._tables_prompt(tables))
+        limit = max(self.chunk_token_budget // 4, self.chunk_token_budget - tables_tokens - PROMPT_RESERVE_TOKENS)
+        
+        chunks = self._iter_chunks(pages, limit)
+        first = await self._next_chunk(chunks)
+        second = await self._next_chunk(chunks) if first is not None else None
+        if first is None:
+            first = ChunkInfo(id=1, content="", start_page=1, end_page=1, word_count=0, token_estimate=0)
+        if second is None:
+            # Single chunk - direct summarization
+            return await self._summarize_single_chunk(first, tables, doc_type)
+        # Multiple chunks - map-reduce approach
+        return await self._summarize_multiple_chunks(itertools.chain((first, second), chunks), tables, doc_type)
+    
+    async def _next_chunk(self, chunks: Iterator[ChunkInfo]) -> Optional[ChunkInfo]:
+        """Build the next chunk in a worker thread, as parsing is: token counting would block the event loop"""
+        return await asyncio.to_thread(next, chunks, None)
     
     async def _summarize_single_chunk(self, chunk: ChunkInfo, tables: List[TableInfo], doc_type: str) -> Dict:
         """Summarize a single chunk using Gemini"""
         prompt = self._create_summarization_prompt(chunk.content, tables, doc_type, is_single_chunk=True)
         
-        response = await self._call_gemini_with_retry(prompt)
+        response = await self._call_gemini_with_retry(prompt, self.chunk_context)
         return self._parse_summary_response(response)
     
-    async def _summarize_multiple_chunks(self, chunks: List[ChunkInfo], tables: List[TableInfo], doc_type: str) -> Dict:
+    async def _summarize_multiple_chunks(self, chunks: Iterator[ChunkInfo], tables: List[TableInfo], doc_type: str) -> Dict:
         """Summarize multiple chunks using map-reduce approach"""
         
-        # Step 1: Summarize each chunk
-        chunk_summaries = []
+        # Step 1: Summarize each chunk as it is built, at most max_concurrent_requests at a time,
+        # so only the chunks in flight are held in memory
+        slots = asyncio.Semaphore(self.max_concurrent_requests)
         tasks = []
+        failed = []
         
-        for chunk in chunks:
-            task = self._summarize_chunk_async(chunk, tables, doc_type)
-            tasks.append(task)
-        
-        # Execute all chunk summaries concurrently
-        chunk_results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out failed results
-        for i, result in enumerate(chunk_results):
-            if isinstance(result, Exception):
-                print(f"Chunk {i+1} failed: {result}")
-            else:
-                chunk_summaries.append(result)
-        
-        if not chunk_summaries:
+        async def summarize(chunk: ChunkInfo) -> Tuple[int, int, str]:
+            try:
+                return chunk.start_page, chunk.end_page, await self._summarize_chunk_async(chunk, tables, doc_type)
+            except Exception as e:
+                # Retries are exhausted: the reduce step gets the chunk's own text, so no content is dropped
+                logger.warning(f"⚠️ Chunk {chunk.id} (pages {chunk.start_page}-{chunk.end_page}) could not be "
+                               f"summarized, passing its text on instead: {str(e)}")
+                failed.append(chunk.id)
+                return chunk.start_page, chunk.end_page, f"[Not summarized, original text]\n{chunk.content}"
+            finally:
+                slots.release()
+        
+        chunk = await self._next_chunk(chunks)
+        while chunk is not None:
+            await slots.acquire()
+            tasks.append(asyncio.ensure_future(summarize(chunk)))
+            chunk = await self._next_chunk(chunks)
+        
+        chunk_summaries = list(await asyncio.gather(*tasks))
+        
+        if len(failed) == len(chunk_summaries):
             raise Exception("All chunk summaries failed")
         
-        # Step 2: Combine chunk summaries
-        combined_summary = "\n\n".join([
-            f"Chunk {i+1} (Pages {chunk.start_page}-{chunk.end_page}):\n{summary}"
-            for i, (chunk, summary) in enumerate(zip(chunks, chunk_summaries))
-        ])
+        # Step 2: Combine chunk summaries, reducing level by level until they fit one final call
+        limit = self.chunk_token_budget - PROMPT_RESERVE_TOKENS
+        while True:
+            combined_summary = "\n\n".join(
+                self._summary_entry(i, start_page, end_page, summary)
+                for i, (start_page, end_page, summary) in enumerate(chunk_summaries)
+            )
+            if len(chunk_summaries) == 1 or await asyncio.to_thread(get_token_counter().count, combined_summary) <= limit:
+                break
+            chunk_summaries = await self._reduce_summaries(chunk_summaries, doc_type, limit)
         
         # Step 3: Create final summary prompt
         final_prompt = self._create_final_summary_prompt(combined_summary, tables, doc_type)
         
         # Step 4: Generate final summary
-        final_response = await self._call_gemini_with_retry(final_prompt)
+        final_response = await self._call_gemini_with_retry(final_prompt, self.final_context)
         return self._parse_summary_response(final_response)
     
+    def _summary_entry(self, index: int, start_page: int, end_page: int, summary: str) -> str:
+        return f"Chunk {index + 1} (Pages {start_page}-{end_page}):\n{summary}"
+    
+    async def _reduce_summaries(self, summaries: List[Tuple[int, int, str]], doc_type: str,
+                                limit: int) -> List[Tuple[int, int, str]]:
+        """One level of the reduce tree: consecutive summaries are merged in groups that fit one call"""
+        entries = [self._summary_entry(i, *summary) for i, summary in enumerate(summaries)]
+        groups: List[List[int]] = []
+        group: List[int] = []
+        tokens = 0
+        counts = await asyncio.to_thread(get_token_counter().count_batch, entries)
+        for i, count in enumerate(counts):
+            # At least two summaries per group, so every level shrinks
+            if len(group) >= 2 and tokens + count > limit:
+                groups.append(group)
+                group, tokens = [], 0
+            group.append(i)
+            tokens += count
+        groups.append(group)
+        
+        slots = asyncio.Semaphore(self.max_concurrent_requests)
+        
+        async def reduce(group: List[int]) -> Tuple[int, int, str]:
+            if len(group) == 1:
+                return summaries[group[0]]
+            async with slots:
+                prompt = self._create_summarization_prompt(
+                    "\n\n".join(entries[i] for i in group), [], doc_type, is_single_chunk=False
+                )
+                response = await self._call_gemini_with_retry(prompt, self.chunk_context)
+            return summaries[group[0]][0], summaries[group[-1]][1], response
+        
+        return list(await asyncio.gather(*(reduce(group) for group in groups)))
+    
     async def _summarize_chunk_async(self, chunk: ChunkInfo, tables: List[TableInfo], doc_type: str) -> str:
         """Asynchronously summarize a single chunk"""
         prompt = self._create_summarization_prompt(chunk.content, tables, doc_type, is_single_chunk=False)
-        response = await self._call_gemini_with_retry(prompt)
+        response = await self._call_gemini_with_retry(prompt, self.chunk_context)
         return response
     
     def _create_summarization_prompt(self, text: str, tables: List[TableInfo], doc_type: str, is_single_chunk: bool) -> str:
-        """Create prompt for Gemini summarization"""
+        """Create the per-chunk part of the summarization prompt (instructions live in chunk_context)"""
         
-        prompt = f"""You are an expert document analyst. Analyze the following document content and provide a comprehensive summary.
-
-DOCUMENT TYPE: {doc_type}
+        prompt = f"""DOCUMENT TYPE: {doc_type}
 {'SINGLE CHUNK' if is_single_chunk else 'PARTIAL CHUNK'}
 
-INSTRUCTIONS:
-1. Provide a concise but complete summary
-2. Extract key points and insights
-3. If tables are present, analyze their content and trends
-4. Preserve important numbers, dates, and names
-5. Focus on actionable insights and main takeaways
-
 DOCUMENT CONTENT:
-{text[:50000]}  # Limit content length for API
+{text}
 
 """
-
+        return prompt + self._tables_prompt(tables)
+    
+    def _tables_prompt(self, tables: List[TableInfo]) -> str:
+        """Tables section sent with every chunk"""
+        prompt = ""
         if tables:
             prompt += "\nTABLES FOUND:\n"
             for table in tables:
@@ -324,44 +527,16 @@ DOCUMENT CONTENT:
                 prompt += "Markdown format:\n"
                 prompt += table.markdown + "\n"
         
-        prompt += """
-
-RESPONSE FORMAT (JSON):
-{
-  "executive_summary": "2-3 paragraph executive summary",
-  "key_points": ["point1", "point2", "point3", ...],
-  "table_insights": ["insight1", "insight2", ...],
-  "main_takeaways": ["takeaway1", "takeaway2", ...],
-  "section_summaries": [
-    {
-      "section": "section_name",
-      "summary": "section summary",
-      "key_points": ["point1", "point2"]
-    }
-  ]
-}
-
-Provide your response in valid JSON format only."""
-
         return prompt
     
     def _create_final_summary_prompt(self, combined_summary: str, tables: List[TableInfo], doc_type: str) -> str:
-        """Create prompt for final summary combining all chunks"""
+        """Create the per-document part of the final summary prompt (instructions live in final_context)"""
         
-        prompt = f"""You are an expert document analyst. Create a comprehensive final summary from the following chunk summaries.
-
-DOCUMENT TYPE: {doc_type}
+        prompt = f"""DOCUMENT TYPE: {doc_type}
 TOTAL CHUNKS: Multiple chunks combined
 
-INSTRUCTIONS:
-1. Create a cohesive executive summary that covers the entire document
-2. Consolidate key points from all chunks
-3. Identify overarching themes and patterns
-4. Provide actionable insights
-5. Ensure the summary flows logically
-
 COMBINED CHUNK SUMMARIES:
-{combined_summary[:100000]}  # Limit content length
+{combined_summary}
 
 """
 
@@ -370,36 +545,17 @@ COMBINED CHUNK SUMMARIES:
             for table in tables:
                 prompt += f"\nTable {table.id}: {table.title} ({table.row_count} rows, {table.col_count} columns)\n"
         
-        prompt += """
-
-RESPONSE FORMAT (JSON):
-{
-  "executive_summary": "Comprehensive 3-4 paragraph executive summary covering the entire document",
-  "key_points": ["consolidated point1", "consolidated point2", "consolidated point3", ...],
-  "table_insights": ["overall table insight1", "overall table insight2", ...],
-  "main_takeaways": ["overall takeaway1", "overall takeaway2", ...],
-  "section_summaries": [
-    {
-      "section": "major_section_name",
-      "summary": "comprehensive section summary",
-      "key_points": ["consolidated point1", "consolidated point2"]
-    }
-  ]
-}
-
-Provide your response in valid JSON format only."""
-
         return prompt
     
-    async def _call_gemini_with_retry(self, prompt: str) -> str:
-        """Call Gemini API with retry logic"""
+    async def _call_gemini_with_retry(self, prompt: str, context: GeminiContext) -> str:
+        """Call Gemini API with retry logic; the context supplies the static instructions"""
         for attempt in range(self.retry_attempts):
             try:
                 # Run the synchronous Gemini call in a thread pool
                 loop = asyncio.get_event_loop()
                 response = await loop.run_in_executor(
                     self.executor, 
-                    self.model.generate_content, 
+                    context.generate, 
                     prompt
                 )
                 return response.text
@@ -482,6 +638,16 @@ Provide your response in valid JSON format only."""
         
         return markdown
     
+    def context_stats(self) -> Dict:
+        """Token usage and savings of the cached summarization instructions"""
+        return {"chunk": self.chunk_context.stats(), "final": self.final_context.stats()}
+    
+    def cache_stats(self) -> Dict:
+        """Hits, misses and disk usage of the document summary cache"""
+        return self.summary_cache.stats() if self.summary_cache is not None else {"enabled": False}
+    
     def cleanup(self):
         """Cleanup resources"""
         self.executor.shutdown(wait=True)
+        self.chunk_context.close()
+        self.final_context.close()
@@ -0,0 +1,109 @@
+"""
+Multi-pattern intent routing for the chat fast paths.
+
+An Aho-Corasick automaton is built once from every intent's keyword list, so a
+message is classified against all keywords in one linear pass instead of one
+substring scan per keyword. Matching is plain substring matching, identical to
+the ``keyword in text`` checks it replaces.
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton mapping each added pattern to one or more payloads"""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[Hashable]] = [set()]
+        self._built = False
+
+    def add(self, pattern: str, payload: Hashable) -> None:
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+            state = next_state
+        self._output[state].add(payload)
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def find_all(self, text: str) -> Set[Hashable]:
+        """Payloads of every pattern occurring anywhere in text"""
+        if not self._built:
+            self.build()
+        found: Set[Hashable] = set()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+
+class IntentRouter:
+    """Classifies text into keyword intents in one pass; earlier intents take priority"""
+
+    def __init__(self, intents: Sequence[Tuple[str, Iterable[str]]], answers: Optional[Dict[str, str]] = None) -> None:
+        self.priority = [name for name, _ in intents]
+        self.answers: Dict[str, str] = dict(answers or {})
+        self._automaton = AhoCorasick()
+        for name, keywords in intents:
+            for keyword in keywords:
+                self._automaton.add(keyword, (name, keyword))
+        self._automaton.build()
+
+    def match(self, text: str) -> Set[Tuple[str, str]]:
+        """(intent, keyword) pairs for every keyword occurring in text"""
+        return self._automaton.find_all(text)
+
+    def classify(self, text: str) -> Set[str]:
+        """All intents whose keywords occur in text"""
+        return {name for name, _ in self.match(text)}
+
+    def route(self, text: str, intents: Optional[Set[str]] = None) -> Optional[str]:
+        """Highest-priority intent matched by text"""
+        intents = self.classify(text) if intents is None else intents
+        for name in self.priority:
+            if name in intents:
+                return name
+        return None
+
+    def answer(self, text: str) -> Optional[str]:
+        """Precomputed answer for the highest-priority intent, if any"""
+        intent = self.route(text)
+        return self.answers.get(intent) if intent else None
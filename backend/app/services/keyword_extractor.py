@@ -1,8 +1,6 @@
-import yake
-
-
 class KeywordExtractor:
     def __init__(self) -> None:
+        import yake
         self.kw = yake.KeywordExtractor(lan="en", n=1, top=20)
 
     def extract(self, text: str) -> list[str]:
@@ -10,4 +8,8 @@ class KeywordExtractor:
         # returns list of (keyword, score); lower score is better
         return [k for k, _ in sorted(keywords, key=lambda x: x[1])[:10]]
 
+    def extract_document(self, document) -> list[str]:
+        """Keywords of a ParsedDocument (see doc_parser.parse)"""
+        return self.extract(document.text)
+
 
@@ -0,0 +1,142 @@
+"""
+Precomputed keyword matrix for vectorized keyword scoring in the QA engine.
+
+Each dataset question is represented as one boolean row over the fixed HR
+keyword vocabulary. Jaccard similarity against a user question is then
+computed for every row (or a candidate subset) in a single NumPy pass instead
+of per-question set logic.
+
+``CategoryPartitions`` groups the rows by policy keyword at build time, so a
+question naming a policy is only scored against questions about that policy.
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Sequence, Set
+
+import numpy as np
+
+# Common HR and policy keywords with better categorization
+HR_KEYWORDS = (
+    # Policy types
+    'policy', 'policies', 'attendance', 'leave', 'work', 'home', 'wfh', 'dress', 'code', 'conduct', 'handbook', 'onboarding', 'performance', 'reimbursement',
+    'device', 'password', 'software', 'helpdesk', 'it', 'support', 'acceptable', 'use', 'sop', 'procedure',
+
+    # Benefits and compensation
+    'benefits', 'salary', 'compensation', 'bonus', 'insurance', 'health', 'dental', 'vision', 'wellness',
+
+    # Time and attendance
+    'time', 'hours', 'tardiness', 'late', 'early', 'overtime', 'schedule', 'flexible',
+
+    # Leave and time off
+    'vacation', 'holiday', 'sick', 'emergency', 'pto', 'paid', 'unpaid', 'carry', 'over',
+
+    # Workplace behavior
+    'respect', 'dignity', 'harassment', 'discrimination', 'ethics', 'ethical', 'unethical', 'violation', 'report', 'retaliation',
+
+    # Training and development
+    'training', 'development', 'certification', 'workshop', 'conference', 'career',
+
+    # General HR terms
+    'hr', 'human', 'resource', 'employee', 'employer', 'company', 'organization', 'workplace', 'manager', 'supervisor',
+
+    # Emotion and greeting keywords
+    'hello', 'hi', 'hey', 'good', 'morning', 'afternoon', 'evening', 'how', 'are', 'you',
+    'feel', 'ok', 'well', 'going', 'everything', 'fine', 'great', 'thanks', 'thank', 'welcome', 'bye', 'goodbye',
+)
+HR_KEYWORD_SET = frozenset(HR_KEYWORDS)
+
+# Keywords naming a specific policy; a user asking about one must not get an answer about another
+POLICY_KEYWORDS = (
+    'policy', 'policies', 'attendance', 'leave', 'wfh', 'dress', 'conduct', 'handbook', 'onboarding',
+    'performance', 'reimbursement', 'it', 'device', 'password', 'software', 'helpdesk',
+)
+
+# Substrings marking a dataset question as policy-related
+POLICY_INDICATORS = (
+    'policy', 'attendance', 'leave', 'wfh', 'dress', 'conduct', 'handbook', 'onboarding',
+    'performance', 'reimbursement', 'it', 'device', 'password', 'software', 'helpdesk',
+)
+
+
+def is_policy_question(question: str) -> bool:
+    """Whether a dataset question mentions any policy indicator"""
+    question = question.lower()
+    return any(indicator in question for indicator in POLICY_INDICATORS)
+
+
+class KeywordMatrix:
+    """Boolean (questions x vocabulary) keyword matrix with vectorized Jaccard scoring"""
+
+    def __init__(self, matrix: np.ndarray, policy_mask: np.ndarray, vocabulary: Sequence[str] = HR_KEYWORDS) -> None:
+        self.vocabulary = tuple(vocabulary)
+        self.column = {word: i for i, word in enumerate(self.vocabulary)}
+        self.matrix = matrix
+        self.policy_mask = policy_mask
+        self.row_counts = matrix.sum(axis=1, dtype=np.int32)
+
+    @classmethod
+    def build(cls, questions: Sequence[str], extract_keywords: Callable[[str], Set[str]]) -> "KeywordMatrix":
+        matrix = np.zeros((len(questions), len(HR_KEYWORDS)), dtype=bool)
+        column = {word: i for i, word in enumerate(HR_KEYWORDS)}
+        for row, question in enumerate(questions):
+            for word in extract_keywords(question):
+                matrix[row, column[word]] = True
+        policy_mask = np.fromiter((is_policy_question(q) for q in questions), dtype=bool, count=len(questions))
+        return cls(matrix, policy_mask)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def columns_for(self, keywords: Iterable[str]) -> np.ndarray:
+        """Vocabulary column indices of a keyword set"""
+        return np.array(sorted(self.column[w] for w in keywords if w in self.column), dtype=np.int64)
+
+    def jaccard(self, columns: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Jaccard similarity of the query keyword columns against every row (or the given rows)"""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        counts = self.row_counts if rows is None else self.row_counts[rows]
+        if columns.size == 0:
+            return np.zeros(matrix.shape[0], dtype=np.float64)
+
+        intersection = matrix[:, columns].sum(axis=1, dtype=np.int32)
+        union = counts + columns.size - intersection
+        scores = np.zeros(matrix.shape[0], dtype=np.float64)
+        # Rows without any keyword score 0, matching the set-based definition
+        nonempty = counts > 0
+        scores[nonempty] = intersection[nonempty] / union[nonempty]
+        return scores
+
+
+class CategoryPartitions:
+    """Row ids of the questions containing each policy keyword, stored as one array plus offsets"""
+
+    def __init__(self, rows: np.ndarray, offsets: np.ndarray, categories: Sequence[str] = POLICY_KEYWORDS) -> None:
+        if offsets.shape[0] != len(categories) + 1:
+            raise ValueError("Partition offsets do not match the policy categories")
+        self.categories = tuple(categories)
+        self.rows = rows
+        self.offsets = offsets
+        # Keyword-matrix column -> partition number
+        column = {word: i for i, word in enumerate(HR_KEYWORDS)}
+        self._partition_of = {column[word]: p for p, word in enumerate(self.categories) if word in column}
+
+    @classmethod
+    def build(cls, matrix: KeywordMatrix) -> "CategoryPartitions":
+        lists = [np.flatnonzero(matrix.matrix[:, matrix.column[word]]) for word in POLICY_KEYWORDS]
+        offsets = np.concatenate([[0], np.cumsum([len(rows) for rows in lists])]).astype(np.int64)
+        rows = np.concatenate(lists).astype(np.int64) if lists else np.empty(0, dtype=np.int64)
+        return cls(rows, offsets)
+
+    def partition(self, number: int) -> np.ndarray:
+        return self.rows[self.offsets[number]:self.offsets[number + 1]]
+
+    def rows_for(self, columns: np.ndarray) -> Optional[np.ndarray]:
+        """Sorted rows sharing a policy keyword with the query columns; None routes to the global partition"""
+        selected = sorted({self._partition_of[c] for c in columns.tolist() if c in self._partition_of})
+        if not selected:
+            return None
+        if len(selected) == 1:
+            return self.partition(selected[0])
+        return np.unique(np.concatenate([self.partition(p) for p in selected]))
+
+    def sizes(self) -> Dict[str, int]:
+        return {word: int(self.offsets[p + 1] - self.offsets[p]) for p, word in enumerate(self.categories)}
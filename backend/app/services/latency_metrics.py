@@ -0,0 +1,136 @@
+"""
+Per-stage latency instrumentation for the QA engine.
+
+A ``RequestTrace`` is created per chat request and handed to
+``HybridQAEngine.answer``, which times each stage (preprocessing, intent
+checks, encode, index search, keyword rerank, keyword fallback, Gemini, ...)
+with the monotonic clock and records which path produced the answer.
+Completed traces are aggregated by ``LatencyMetrics`` into rolling latency
+windows per stage and per resolution path, served by ``GET /chat/metrics``
+and optionally returned as a ``Server-Timing`` header.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+
+class RequestTrace:
+    """Monotonic per-stage timings of one request and the path that resolved it"""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.resolved_by: Optional[str] = None
+        self.finished: Optional[float] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block; repeated stages accumulate"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, (time.perf_counter() - start) * 1000)
+
+    def add_stage(self, name: str, duration_ms: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def resolve(self, path: str, answer=None):
+        """Record the resolution path (first one wins) and pass the answer through"""
+        if self.resolved_by is None:
+            self.resolved_by = path
+        return answer
+
+    def finish(self) -> float:
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        return self.total_ms
+
+    @property
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per stage plus the total"""
+        metrics = [f"{name};dur={duration:.2f}" for name, duration in self.stages.items()]
+        metrics.append(f'total;dur={self.total_ms:.2f};desc="{self.resolved_by or "unresolved"}"')
+        return ", ".join(metrics)
+
+    def as_dict(self) -> Dict:
+        return {
+            "resolved_by": self.resolved_by,
+            "total_ms": round(self.total_ms, 3),
+            "stages_ms": {name: round(duration, 3) for name, duration in self.stages.items()},
+        }
+
+
+class LatencyWindow:
+    """Rolling window of the most recent latency samples with percentile summaries"""
+
+    def __init__(self, size: int = 4096) -> None:
+        self._samples = np.zeros(size, dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    def add(self, value_ms: float) -> None:
+        self._samples[self._next] = value_ms
+        self._next = (self._next + 1) % self._samples.size
+        self.count += 1
+
+    def summary(self) -> Dict:
+        filled = self._samples[:min(self.count, self._samples.size)]
+        if filled.size == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(filled, [50, 95, 99])
+        return {
+            "count": self.count,
+            "mean_ms": round(float(filled.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(filled.max()), 3),
+        }
+
+
+class LatencyMetrics:
+    """Aggregates finished request traces per stage and per resolution path"""
+
+    def __init__(self, window: int = 4096) -> None:
+        self.window = window
+        self._stages: Dict[str, LatencyWindow] = {}
+        self._paths: Dict[str, LatencyWindow] = {}
+        self._total = LatencyWindow(window)
+        self._lock = threading.Lock()
+
+    def record(self, trace: RequestTrace) -> None:
+        total = trace.finish()
+        path = trace.resolved_by or "unresolved"
+        with self._lock:
+            self._total.add(total)
+            self._paths.setdefault(path, LatencyWindow(self.window)).add(total)
+            for name, duration in trace.stages.items():
+                self._stages.setdefault(name, LatencyWindow(self.window)).add(duration)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "window": self.window,
+                "total": self._total.summary(),
+                "stages": {name: w.summary() for name, w in sorted(self._stages.items())},
+                "paths": {name: w.summary() for name, w in sorted(self._paths.items())},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._paths.clear()
+            self._total = LatencyWindow(self.window)
+
+
+# Global latency metrics
+latency_metrics = LatencyMetrics()
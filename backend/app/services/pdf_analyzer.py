@@ -1,10 +1,14 @@
+from __future__ import annotations
+
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 from dataclasses import dataclass
-import pandas as pd
 from pathlib import Path
 
-from .doc_parser import parse_document
+from .doc_parser import ParsedDocument, parse
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 @dataclass
@@ -39,14 +43,24 @@ class PDFAnalyzer:
             r'\b[A-Z]{2,}\s*\|\s*[A-Z]{2,}', # UPPERCASE | UPPERCASE
         ]
         
+        # Common section patterns
+        self.section_patterns = [
+            r'^\d+\.\s*([A-Z][^.\n]+)',  # 1. Section Name
+            r'^([A-Z][A-Z\s]+):',        # SECTION NAME:
+            r'^([A-Z][a-z\s]+)\n[-=]+',  # Section Name\n----
+        ]
+        
     def analyze_document(self, filename: str, content: bytes) -> DocumentStructure:
         """Main analysis function"""
-        # Parse document
-        raw_text = parse_document(filename, content)
+        return self.analyze(parse(filename, content))
+    
+    def analyze(self, document: ParsedDocument) -> DocumentStructure:
+        """Analyze an already parsed document"""
+        raw_text = document.text
         
         # Extract structure information
         text_blocks = self._extract_text_blocks(raw_text)
-        tables = self._extract_tables(raw_text)
+        tables = self.document_tables(document, raw_text)
         sections = self._identify_sections(raw_text)
         
         # Calculate ratios
@@ -64,13 +78,19 @@ class PDFAnalyzer:
             doc_type=doc_type,
             text_ratio=text_ratio,
             table_ratio=table_ratio,
-            total_pages=self._estimate_pages(raw_text),
+            total_pages=document.page_count or self._estimate_pages(raw_text),
             tables=tables,
             sections=sections,
             word_count=total_words,
             table_count=len(tables)
         )
     
+    def document_tables(self, document: ParsedDocument, text: Optional[str] = None) -> List[TableData]:
+        """Tables of a parsed document, extracted on first use and kept on the document"""
+        if document.tables is None:
+            document.tables = self._extract_tables(text if text is not None else document.text)
+        return document.tables
+    
     def _extract_text_blocks(self, text: str) -> List[str]:
         """Extract meaningful text blocks, excluding table-like content"""
         # Split by double newlines to get paragraphs
@@ -157,7 +177,8 @@ class PDFAnalyzer:
                     parts = [p.strip() for p in line.split(',')]
                 cleaned_lines.append(parts)
             
-            # Create DataFrame
+            # Create DataFrame (pandas is loaded on the first table, not at import)
+            import pandas as pd
             df = pd.DataFrame(cleaned_lines[1:], columns=cleaned_lines[0])
             
             return TableData(
@@ -174,25 +195,23 @@ class PDFAnalyzer:
         """Identify document sections"""
         sections = []
         
-        # Common section patterns
-        section_patterns = [
-            r'^\d+\.\s*([A-Z][^.\n]+)',  # 1. Section Name
-            r'^([A-Z][A-Z\s]+):',        # SECTION NAME:
-            r'^([A-Z][a-z\s]+)\n[-=]+',  # Section Name\n----
-        ]
-        
         lines = text.split('\n')
         for line in lines:
-            for pattern in section_patterns:
-                match = re.match(pattern, line.strip())
-                if match:
-                    section_name = match.group(1).strip()
-                    if len(section_name) > 3:  # Avoid short matches
-                        sections.append(section_name)
-                    break
+            section_name = self.section_heading(line)
+            if section_name:
+                sections.append(section_name)
         
         return sections
     
+    def section_heading(self, line: str) -> Optional[str]:
+        """Section name if the line is a section heading (also used to place summary chunk boundaries)"""
+        for pattern in self.section_patterns:
+            match = re.match(pattern, line.strip())
+            if match:
+                section_name = match.group(1).strip()
+                return section_name if len(section_name) > 3 else None  # Avoid short matches
+        return None
+    
     def _estimate_pages(self, text: str) -> int:
         """Estimate number of pages based on content length"""
         # Rough estimate: 500 words per page
@@ -0,0 +1,221 @@
+"""
+Retrieval over the org_data policy PDFs for the QA engine's Gemini fallback.
+
+``scripts/ingest_policies.py`` parses the policy PDFs with ``doc_parser``,
+splits them into overlapping sentence-aligned passages, embeds the passages
+with the QA sentence model and writes a persistent index:
+
+- ``manifest.json``   model id, chunking parameters, source file hashes
+- ``embeddings.npy``  normalized float32 passage embeddings
+- ``passages.json``   passage text with its source document and title
+
+At query time the engine embeds the question once, takes the top-k passages
+from this index and sends only those to Gemini (or answers extractively when
+one passage matches very closely).
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .vector_index import VectorIndex, build_index
+
+logger = logging.getLogger(__name__)
+
+POLICY_INDEX_FORMAT_VERSION = 1
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class PolicyPassage:
+    """One retrieved passage with its similarity to the question"""
+    text: str
+    source: str
+    title: str
+    score: float
+
+
+def document_title(path: Path) -> str:
+    """Readable title from a policy file name, e.g. wfh_policy.pdf -> Wfh Policy"""
+    return path.stem.replace("_", " ").replace("-", " ").title()
+
+
+def chunk_text(text: str, max_words: int = 120, overlap_words: int = 30) -> List[str]:
+    """Split text into sentence-aligned passages of at most max_words, overlapping by about overlap_words"""
+    sentences = [s.strip() for s in _SENTENCE_END.split(re.sub(r"\s+", " ", text)) if s.strip()]
+    chunks: List[str] = []
+    current: List[str] = []
+    current_words = 0
+
+    for sentence in sentences:
+        words = len(sentence.split())
+        # Overlong sentences (tables, lists without punctuation) are split on word boundaries
+        if words > max_words:
+            tokens = sentence.split()
+            step = max(1, max_words - overlap_words)
+            pieces = [" ".join(tokens[i:i + max_words]) for i in range(0, len(tokens), step)]
+        else:
+            pieces = [sentence]
+
+        for piece in pieces:
+            piece_words = len(piece.split())
+            if current and current_words + piece_words > max_words:
+                chunks.append(" ".join(current))
+                # Carry trailing sentences into the next passage as overlap
+                carried: List[str] = []
+                carried_words = 0
+                for previous in reversed(current):
+                    carried_words += len(previous.split())
+                    if carried_words > overlap_words:
+                        break
+                    carried.insert(0, previous)
+                current = carried
+                current_words = sum(len(c.split()) for c in current)
+            current.append(piece)
+            current_words += piece_words
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def sources_hash(paths: Iterable[Path]) -> str:
+    """Content hash over all source documents, to skip re-ingesting unchanged PDFs"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(path.name.encode("utf-8") + b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class PolicyRetriever:
+    """Top-k passage search over the persisted policy index"""
+
+    def __init__(self, passages: List[Dict], embeddings: np.ndarray, manifest: Dict) -> None:
+        self.passages = passages
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self.index: VectorIndex = build_index(embeddings, "topk")
+
+    @classmethod
+    def load(cls, index_dir: Path, model_id: str) -> Optional["PolicyRetriever"]:
+        """Load the index written by scripts/ingest_policies.py, or None if missing or built with another model"""
+        index_dir = Path(index_dir)
+        manifest_file = index_dir / "manifest.json"
+        if not manifest_file.exists():
+            return None
+
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != POLICY_INDEX_FORMAT_VERSION:
+            logger.warning(f"⚠️ Ignoring policy index with unsupported format at {index_dir}")
+            return None
+        if manifest.get("model_id") != model_id:
+            logger.warning(f"⚠️ Policy index was built with {manifest.get('model_id')}, engine uses {model_id}; "
+                           f"re-run scripts/ingest_policies.py")
+            return None
+
+        with open(index_dir / "passages.json", "r", encoding="utf-8") as f:
+            passages = json.load(f)
+        embeddings = np.load(index_dir / "embeddings.npy", mmap_mode="r")
+        if embeddings.shape[0] != len(passages) or not passages:
+            logger.warning(f"⚠️ Policy index at {index_dir} is empty or inconsistent")
+            return None
+
+        logger.info(f"✅ Loaded policy index with {len(passages)} passages from {len(manifest.get('sources', {}))} documents")
+        return cls(passages, embeddings, manifest)
+
+    @property
+    def key(self) -> str:
+        return self.manifest.get("key", "")
+
+    def search(self, embedding: np.ndarray, k: int = 3, min_score: float = 0.0) -> List[PolicyPassage]:
+        indices, scores = self.index.search(embedding, k=min(k, len(self.passages)))
+        results = []
+        for idx, score in zip(indices.tolist(), scores.tolist()):
+            if score < min_score:
+                continue
+            passage = self.passages[idx]
+            results.append(PolicyPassage(text=passage["text"], source=passage["source"],
+                                         title=passage["title"], score=float(score)))
+        return results
+
+    def summary(self) -> Dict:
+        return {
+            "passages": len(self.passages),
+            "documents": len(self.manifest.get("sources", {})),
+            "model_id": self.manifest.get("model_id"),
+            "key": self.key,
+        }
+
+
+def build_policy_index(
+    index_dir: Path,
+    documents: Sequence[Path],
+    parse: Callable[[str, bytes], str],
+    encode: Callable[[List[str]], np.ndarray],
+    model_id: str,
+    max_words: int = 120,
+    overlap_words: int = 30,
+) -> Dict:
+    """Parse, chunk and embed the policy documents and write the index atomically; returns the manifest"""
+    index_dir = Path(index_dir)
+    passages: List[Dict] = []
+    sources: Dict[str, Dict] = {}
+    for path in documents:
+        try:
+            text = parse(path.name, path.read_bytes())
+        except Exception as e:
+            logger.error(f"❌ Failed to parse {path}: {str(e)}")
+            continue
+        chunks = chunk_text(text, max_words=max_words, overlap_words=overlap_words)
+        title = document_title(path)
+        passages.extend({"text": chunk, "source": path.name, "title": title} for chunk in chunks)
+        sources[path.name] = {"title": title, "passages": len(chunks),
+                              "sha256": hashlib.sha256(path.read_bytes()).hexdigest()}
+        logger.info(f"📄 {path.name}: {len(chunks)} passages")
+
+    if not passages:
+        raise ValueError("No text could be extracted from the policy documents")
+
+    # Prefix each passage with its document title so short passages keep their topic
+    embeddings = np.asarray(encode([f"{p['title']}: {p['text']}" for p in passages]), dtype=np.float32)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+
+    manifest = {
+        "format_version": POLICY_INDEX_FORMAT_VERSION,
+        "key": hashlib.sha256(f"{model_id}\0{max_words}\0{overlap_words}\0{sources_hash(documents)}".encode("utf-8")).hexdigest()[:32],
+        "model_id": model_id,
+        "max_words": max_words,
+        "overlap_words": overlap_words,
+        "passages": len(passages),
+        "sources": sources,
+    }
+
+    index_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(prefix=f".{index_dir.name}-", dir=index_dir.parent))
+    try:
+        np.save(tmp_path / "embeddings.npy", embeddings)
+        with open(tmp_path / "passages.json", "w", encoding="utf-8") as f:
+            json.dump(passages, f, indent=2, ensure_ascii=False)
+        with open(tmp_path / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        if index_dir.exists():
+            shutil.rmtree(index_dir)
+        os.replace(tmp_path, index_dir)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    logger.info(f"✅ Policy index with {len(passages)} passages written to {index_dir}")
+    return manifest
@@ -0,0 +1,280 @@
+"""
+Precompiled QA artifact: everything the QA engine derives from qa_dataset.json,
+built once and memory-mapped at startup instead of re-encoding on every process start.
+
+Layout of one artifact (``<artifact_dir>/<key>/``):
+
+- ``manifest.json``   format version, dataset hash, model id, index backend and params
+- ``embeddings.npy``  normalized float32 question embeddings, one row per QA pair
+- ``keywords.npy``    boolean (questions x HR vocabulary) keyword matrix
+- ``policy_mask.npy`` which questions mention a policy
+- ``partition_rows.npy`` / ``partition_offsets.npy``
+                      question rows per policy category (see ``CategoryPartitions``)
+- ``index_*.npy``     extra arrays of the vector index (e.g. IVF centroids and lists)
+- ``vectors_<storage>.npy`` / ``vectors_<storage>_scales.npy``
+                      the embeddings in float16 / int8 storage, written the first
+                      time a worker asks for that storage
+
+The key is a content hash of the dataset bytes, the model id, the index backend
+and the artifact format version, so any of those changing forces a rebuild.
+
+Every array is memory-mapped read-only, so uvicorn workers on one host share a
+single copy of the embedding and keyword matrices through the page cache (put
+``QA_ARTIFACT_DIR`` on ``/dev/shm`` to keep them in POSIX shared memory).
+Compiles are serialized with a lock file so concurrently starting workers
+encode the dataset once and then map the same files.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from .compact_embeddings import CompactEmbeddings
+from .keyword_matrix import HR_KEYWORDS, POLICY_KEYWORDS, CategoryPartitions, KeywordMatrix
+from .vector_index import VectorIndex, build_index, restore_index
+
+try:
+    import fcntl
+except ImportError:  # Windows: compiles are not serialized across workers
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FORMAT_VERSION = 3
+
+COMPILE_LOCK_FILE = ".compile.lock"
+
+
+@dataclass
+class QAArtifact:
+    """Compiled QA dataset loaded from (or just written to) disk"""
+    key: str
+    path: Path
+    model_id: str
+    embeddings: np.ndarray
+    keyword_matrix: KeywordMatrix
+    index: VectorIndex
+    partitions: CategoryPartitions
+
+
+def dataset_hash(dataset_bytes: bytes) -> str:
+    return hashlib.sha256(dataset_bytes).hexdigest()
+
+
+def artifact_key(dataset_bytes: bytes, model_id: str, index_backend: str) -> str:
+    """Content hash identifying the artifact for this dataset / model / index combination"""
+    digest = hashlib.sha256()
+    digest.update(f"v{ARTIFACT_FORMAT_VERSION}\0{model_id}\0{index_backend}\0".encode("utf-8"))
+    digest.update(dataset_bytes)
+    return digest.hexdigest()[:32]
+
+
+@contextmanager
+def compile_lock(artifact_dir: Path) -> Iterator[None]:
+    """Exclusive lock held while compiling, so only one worker per host encodes the dataset"""
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(artifact_dir / COMPILE_LOCK_FILE, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _save_once(target: Path, array: np.ndarray) -> None:
+    """Write an array file unless it exists; concurrent writers all end up mapping the first one"""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{target.name}-", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        try:
+            os.link(tmp_name, target)
+        except FileExistsError:
+            pass
+    finally:
+        os.unlink(tmp_name)
+
+
+def _load_vectors(path: Path, embeddings: np.ndarray, storage: str) -> Union[np.ndarray, CompactEmbeddings]:
+    """The artifact's embeddings in the requested storage, memory-mapped from the artifact directory"""
+    if storage == "float32":
+        return embeddings
+
+    data_file = path / f"vectors_{storage}.npy"
+    scales_file = path / f"vectors_{storage}_scales.npy"
+    if not data_file.exists():
+        compact = CompactEmbeddings.from_float32(embeddings, storage)
+        try:
+            if compact.scales is not None:
+                _save_once(scales_file, compact.scales)
+            _save_once(data_file, compact.data)
+            logger.info(f"✅ Added {storage} embeddings to QA artifact {path.name}")
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist {storage} embeddings, keeping them in this process: {str(e)}")
+            return compact
+
+    scales = np.load(scales_file, mmap_mode="r") if scales_file.exists() else None
+    return CompactEmbeddings(np.load(data_file, mmap_mode="r"), scales, storage)
+
+
+def load_qa_artifact(artifact_dir: Path, key: str, expected_rows: int, storage: str = "float32") -> Optional[QAArtifact]:
+    """Memory-map a previously compiled artifact, or return None if it is missing or stale"""
+    path = Path(artifact_dir) / key
+    manifest_file = path / "manifest.json"
+    if not manifest_file.exists():
+        return None
+
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format_version") != ARTIFACT_FORMAT_VERSION or manifest.get("key") != key:
+            logger.warning(f"⚠️ Ignoring QA artifact with mismatched manifest at {path}")
+            return None
+
+        embeddings = np.load(path / "embeddings.npy", mmap_mode="r")
+        if embeddings.shape[0] != expected_rows:
+            logger.warning(f"⚠️ QA artifact has {embeddings.shape[0]} rows, dataset has {expected_rows}; rebuilding")
+            return None
+
+        if tuple(manifest.get("vocabulary", ())) != HR_KEYWORDS:
+            logger.warning("⚠️ QA artifact keyword vocabulary changed; rebuilding")
+            return None
+        keyword_matrix = KeywordMatrix(
+            np.load(path / "keywords.npy", mmap_mode="r"),
+            np.load(path / "policy_mask.npy", mmap_mode="r"),
+        )
+        if tuple(manifest.get("partitions", ())) != POLICY_KEYWORDS:
+            logger.warning("⚠️ QA artifact policy categories changed; rebuilding")
+            return None
+        partitions = CategoryPartitions(
+            np.load(path / "partition_rows.npy", mmap_mode="r"),
+            np.load(path / "partition_offsets.npy", mmap_mode="r"),
+        )
+
+        index_info = manifest["index"]
+        arrays = {name: np.load(path / f"index_{name}.npy", mmap_mode="r") for name in index_info["arrays"]}
+        vectors = _load_vectors(path, embeddings, storage)
+        index = restore_index(index_info["backend"], vectors, index_info["params"], arrays, storage=storage)
+
+        logger.info(f"✅ Loaded QA artifact {key} ({embeddings.shape[0]} {index.storage} vectors, '{index.name}' index)")
+        return QAArtifact(key=key, path=path, model_id=manifest["model_id"], embeddings=embeddings,
+                          keyword_matrix=keyword_matrix, index=index, partitions=partitions)
+    except Exception as e:
+        logger.error(f"❌ Failed to load QA artifact {key}: {str(e)}")
+        return None
+
+
+def compile_qa_artifact(
+    artifact_dir: Path,
+    key: str,
+    questions: Sequence[str],
+    encode: Callable[[List[str]], np.ndarray],
+    extract_keywords: Callable[[str], Set[str]],
+    model_id: str,
+    dataset_sha256: str,
+    index_backend: str,
+    keep: int = 2,
+    storage: str = "float32",
+) -> QAArtifact:
+    """Encode the questions, build the keyword matrix and the index, and write the artifact atomically"""
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    embeddings = np.asarray(encode(list(questions)), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings = embeddings / np.maximum(norms, 1e-12)
+    keyword_matrix = KeywordMatrix.build(questions, extract_keywords)
+    partitions = CategoryPartitions.build(keyword_matrix)
+    index = build_index(embeddings, index_backend, storage=storage)
+    params, arrays = index.get_state()
+
+    # Write into a temporary sibling directory and rename it into place, so a
+    # concurrently starting worker never sees a half-written artifact
+    tmp_path = Path(tempfile.mkdtemp(prefix=f".{key}-", dir=artifact_dir))
+    try:
+        np.save(tmp_path / "embeddings.npy", embeddings)
+        for name, array in arrays.items():
+            np.save(tmp_path / f"index_{name}.npy", np.asarray(array))
+        np.save(tmp_path / "keywords.npy", keyword_matrix.matrix)
+        np.save(tmp_path / "policy_mask.npy", keyword_matrix.policy_mask)
+        np.save(tmp_path / "partition_rows.npy", partitions.rows)
+        np.save(tmp_path / "partition_offsets.npy", partitions.offsets)
+
+        manifest = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "key": key,
+            "dataset_sha256": dataset_sha256,
+            "model_id": model_id,
+            "rows": int(embeddings.shape[0]),
+            "dim": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+            "index": {"backend": index.name, "params": params, "arrays": sorted(arrays)},
+            "vocabulary": list(HR_KEYWORDS),
+            "partitions": list(POLICY_KEYWORDS),
+        }
+        with open(tmp_path / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        final_path = artifact_dir / key
+        if final_path.exists():
+            shutil.rmtree(final_path, ignore_errors=True)
+        os.replace(tmp_path, final_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    logger.info(f"✅ Compiled QA artifact {key} with {embeddings.shape[0]} vectors at {final_path}")
+    _prune_artifacts(artifact_dir, keep=keep, current=key, model_id=model_id, index_backend=index.name)
+
+    return load_qa_artifact(artifact_dir, key, expected_rows=len(questions), storage=storage) or QAArtifact(
+        key=key, path=final_path, model_id=model_id, embeddings=embeddings,
+        keyword_matrix=keyword_matrix, index=index, partitions=partitions)
+
+
+def _artifact_config(path: Path) -> Optional[Tuple[str, str]]:
+    """(model id, index backend) an artifact was compiled for, or None if its manifest cannot be read"""
+    try:
+        with open(path / "manifest.json", "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest["model_id"], manifest["index"]["backend"]
+    except Exception:
+        return None
+
+
+def _prune_artifacts(artifact_dir: Path, keep: int, current: str, model_id: str, index_backend: str) -> None:
+    """Remove all but the ``keep`` most recent artifacts of this model id and index backend (the current one
+    is always kept). Artifacts compiled for another configuration may be in use by another process."""
+    candidates = [p for p in artifact_dir.iterdir()
+                  if p.is_dir() and not p.name.startswith(".") and p.name != current
+                  and _artifact_config(p) == (model_id, index_backend)]
+    candidates.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in candidates[max(0, keep - 1):]:
+        shutil.rmtree(stale, ignore_errors=True)
+        logger.info(f"🗑️ Removed stale QA artifact {stale.name}")
+
+
+def artifact_summary(artifact: Optional[QAArtifact]) -> Dict:
+    """Small JSON-friendly description of the active artifact for health endpoints"""
+    if artifact is None:
+        return {"loaded": False}
+    return {
+        "loaded": True,
+        "key": artifact.key,
+        "model_id": artifact.model_id,
+        "rows": int(artifact.embeddings.shape[0]),
+        "storage": artifact.index.storage,
+        "partitions": artifact.partitions.sizes(),
+        "memory_mapped": isinstance(artifact.index.vectors.data, np.memmap),
+    }
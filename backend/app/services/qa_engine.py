@@ -1,38 +1,341 @@
 import os
 import re
-from typing import Optional, List, Dict, Tuple
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Hashable, Optional, List, Dict, Tuple
 from datetime import datetime
 import asyncio
 import logging
 import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
-import google.generativeai as genai
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
 from .document_request_handler import DocumentRequestHandler
+from .vector_index import VectorIndex, build_index
+from .embedding_service import EmbeddingBatcher
+from .query_cache import LRUCache
+from .keyword_matrix import HR_KEYWORD_SET, CategoryPartitions, KeywordMatrix
+from .intent_router import IntentRouter
+from .latency_metrics import RequestTrace, latency_metrics
+from .single_flight import SingleFlight
+from .gemini_context import GeminiContext, load_genai
+from .semantic_cache import SemanticCache
+from .policy_retriever import PolicyPassage, PolicyRetriever
+from .embedding_backends import EMBEDDING_BACKENDS, OnnxSentenceEncoder, embedding_model_id
+from .qa_artifact import (
+    QAArtifact, artifact_key, artifact_summary, compile_lock, compile_qa_artifact, dataset_hash, load_qa_artifact,
+)
+from ..config import (
+    get_qa_index_backend,
+    get_qa_embedding_storage,
+    get_qa_artifact_dir,
+    qa_artifact_autosave,
+    get_embed_max_batch,
+    get_embed_max_wait_ms,
+    get_qa_cache_max_entries,
+    get_qa_cache_ttl_seconds,
+    get_qa_embedding_backend,
+    get_onnx_model_dir,
+    semantic_cache_enabled,
+    get_semantic_cache_max_distance,
+    get_semantic_cache_max_entries,
+    get_semantic_cache_ttl_seconds,
+    get_semantic_cache_path,
+    get_policy_index_dir,
+    get_policy_top_k,
+    get_policy_min_score,
+    get_policy_extractive_score,
+    single_flight_enabled,
+    get_gemini_context_mode,
+    get_gemini_context_cache_ttl_seconds,
+    gemini_stub_enabled,
+)
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+QA_DATASET_PATH = Path(__file__).parent.parent / "data" / "qa_dataset.json"
+
+# Identifies the embedding model in artifact keys; embeddings from different models never mix
+SENTENCE_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+GEMINI_MODEL_ID = "gemini-2.0-flash-exp"
+# Bump when the Gemini prompt changes so persisted semantic cache answers are discarded
+GEMINI_PROMPT_VERSION = "3"
+
+# Static part of every Gemini prompt, uploaded once as cached context (see gemini_context.py)
+GEMINI_SYSTEM_INSTRUCTION = """You are an AI assistant for Reliance Jio Infotech Solutions.
+Answer employees' questions about company policies, procedures, or general HR matters.
+Be helpful, professional, and accurate. If you're not sure about something, say so.
+
+**Available Policy Topics:**
+- Attendance Policy (work hours, tardiness)
+- Leave Policy (20 days annual leave, submission requirements)
+- Work From Home Policy (3 days/week, manager approval)
+- Dress Code Policy (business casual)
+- Performance Review Policy (bi-annual reviews)
+- Reimbursement Policy (30-day submission, receipts required)
+- Code of Conduct (respect, zero tolerance for harassment)
+- Employee Handbook (mission, values, policies)
+- Onboarding (2-week program, mandatory training)
+- IT Policies (device, password, software, helpdesk)
+
+**Important Guidelines:**
+- When policy excerpts are given with the question, answer using them; if they do not cover the question, say so briefly and suggest contacting HR
+- For general policy questions, provide an overview of the policy
+- For specific scenarios, provide practical guidance
+- Always include contact information when relevant
+- Be friendly and professional in tone, and concise
+- If the question is unclear, ask for clarification
+- For greetings and emotion-based questions, respond warmly and professionally
+- For "how are you" type questions, respond positively about being ready to help
+"""
+
+GEMINI_UNAVAILABLE_MESSAGE = "I apologize, but I'm currently unable to process your request. Please try again later."
+GEMINI_EMPTY_MESSAGE = "I apologize, but I couldn't generate a response. Please try rephrasing your question."
+GEMINI_ERROR_MESSAGE = "I apologize, but I'm experiencing technical difficulties. Please try again later."
+
+# Fast-path intents, matched against the preprocessed question
+GREETING_KEYWORDS = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'how are you']
+EMOTION_KEYWORDS = ['how are you', 'how do you feel', 'are you ok', 'are you well', 'how is it going', 'how is everything']
+CAPABILITY_KEYWORDS = ['what can you do', 'help', 'capabilities', 'features']
+
+# Document intents, matched against the lowercased raw question (markers keep their colons)
+DOCUMENT_DETAIL_MARKERS = ['name:', 'employee id:', 'id:', 'department:', 'designation:', 'joining date:', 'purpose:']
+SPECIFIC_DOCUMENT_KEYWORDS = ['experience letter', 'employment letter', 'salary slip', 'form 16', 'bonafide', 'certificate']
+DOCUMENT_KEYWORDS = [
+    'document', 'need document', 'request document', 'get document', 'want document',
+    'experience letter', 'employment letter', 'salary slip', 'form 16', 'bonafide',
+    'certificate', 'noc', 'relieving letter', 'offer letter', 'appointment letter',
+    'promotion letter', 'pf statement', 'uan details', 'medical insurance',
+    'id card', 'visa support', 'travel authorization'
+]
+
+DOCUMENT_ROUTER = IntentRouter([
+    ("document_details", DOCUMENT_DETAIL_MARKERS),
+    ("specific_document", SPECIFIC_DOCUMENT_KEYWORDS),
+    ("document_request", DOCUMENT_KEYWORDS),
+])
+
+
+def load_sentence_model() -> "SentenceTransformer":
+    """Load the sentence transformer, preferring the local model cache"""
+    # Imported here so the onnx-int8 backend never loads PyTorch
+    from sentence_transformers import SentenceTransformer
+    
+    models_dir = Path(__file__).parent.parent.parent.parent / "models"
+    cache_dir = models_dir / "sentence-transformers"
+    
+    # Set environment variables for model caching
+    os.environ["SENTENCE_TRANSFORMERS_HOME"] = str(cache_dir)
+    os.environ["HF_HOME"] = str(models_dir)
+    os.environ["TRANSFORMERS_CACHE"] = str(models_dir / "transformers")
+    
+    # Check if model files exist
+    model_path = cache_dir / "models--sentence-transformers--all-MiniLM-L6-v2"
+    logger.info(f"🔍 Checking model path: {model_path}")
+    logger.info(f"🔍 Cache directory: {cache_dir}")
+    logger.info(f"🔍 Models directory: {models_dir}")
+    
+    if not model_path.exists():
+        logger.warning(f"⚠️ Model not found at {model_path}, will download")
+    else:
+        logger.info(f"✅ Found existing model at {model_path}")
+    
+    # Try to use local model path first
+    model_path = cache_dir / "models--sentence-transformers--all-MiniLM-L6-v2" / "snapshots" / "c9745ed1d9f207416be6d2e6f8de32d1f16199bf"
+    if model_path.exists():
+        logger.info(f"✅ Using local model from {model_path}")
+        return SentenceTransformer(str(model_path))
+    logger.info("⚠️ Local model not found, using cache directory")
+    return SentenceTransformer('all-MiniLM-L6-v2', cache_folder=str(cache_dir))
+
+
+def load_embedding_model(backend: Optional[str] = None) -> Tuple[object, str]:
+    """Load the configured embedding runtime, returning the model and its artifact model id"""
+    backend = backend or get_qa_embedding_backend()
+    if backend not in EMBEDDING_BACKENDS:
+        logger.warning(f"⚠️ Unknown QA_EMBEDDING_BACKEND '{backend}', using torch")
+        backend = "torch"
+    
+    if backend == "onnx-int8":
+        try:
+            model = OnnxSentenceEncoder(get_onnx_model_dir())
+            logger.info(f"✅ Using int8 ONNX sentence model from {model.model_dir}")
+            return model, embedding_model_id(SENTENCE_MODEL_ID, backend)
+        except Exception as e:
+            logger.error(f"❌ Failed to load ONNX sentence model, falling back to PyTorch: {str(e)}")
+            backend = "torch"
+    
+    return load_sentence_model(), embedding_model_id(SENTENCE_MODEL_ID, backend)
+
+
+def preprocess_text(text: str) -> str:
+    """Preprocess text for better matching"""
+    # Convert to lowercase
+    text = text.lower().strip()
+    
+    # Fix common typos
+    text = re.sub(r'\bpollicy\b', 'policy', text)
+    text = re.sub(r'\battendance\b', 'attendance', text)
+    text = re.sub(r'\bleave\b', 'leave', text)
+    text = re.sub(r'\bwfh\b', 'work from home', text)
+    
+    # Normalize greeting variations
+    text = re.sub(r'\bheyy+\b', 'hey', text)  # heyyy -> hey
+    text = re.sub(r'\bhelloo+\b', 'hello', text)  # hellooo -> hello
+    text = re.sub(r'\bhii+\b', 'hi', text)  # hiii -> hi
+    
+    # Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text)
+    
+    # Remove punctuation except for important ones
+    text = re.sub(r'[^\w\s\-]', ' ', text)
+    
+    # Remove extra whitespace again
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    return text
+
+
+def extract_keywords(text: str) -> set:
+    """Extract important keywords from text"""
+    # Extract words from text and keep those in the HR keyword vocabulary
+    return HR_KEYWORD_SET.intersection(preprocess_text(text).split())
+
+
+def encode_questions(model, questions: List[str]) -> np.ndarray:
+    """Encode questions into normalized float32 embeddings"""
+    return np.asarray(model.encode(questions, normalize_embeddings=True), dtype=np.float32)
+
+
+def load_qa_pairs(qa_file: Path = QA_DATASET_PATH) -> Tuple[bytes, List[Dict]]:
+    """Read the QA dataset, returning its raw bytes (for hashing) and the valid QA pairs"""
+    raw = qa_file.read_bytes()
+    dataset = json.loads(raw.decode('utf-8'))
+    if not isinstance(dataset, list):
+        raise ValueError("QA dataset is not a list")
+    return raw, [qa for qa in dataset if isinstance(qa, dict) and 'question' in qa and 'answer' in qa]
+
+
+def load_or_compile_artifact(raw: bytes, questions: List[str], model, compile_missing: bool = True,
+                              force: bool = False, model_id: str = SENTENCE_MODEL_ID,
+                              encode: Optional[Callable[[List[str]], np.ndarray]] = None) -> Optional[QAArtifact]:
+    """Memory-map the artifact matching this dataset and model, compiling it when missing"""
+    key = artifact_key(raw, model_id, get_qa_index_backend())
+    load = lambda: load_qa_artifact(get_qa_artifact_dir(), key, expected_rows=len(questions),  # noqa: E731
+                                    storage=get_qa_embedding_storage())
+    if not force:
+        artifact = load()
+        if artifact is not None or not compile_missing:
+            return artifact
+    
+    with compile_lock(get_qa_artifact_dir()):
+        # Another worker may have compiled the same artifact while this one waited for the lock
+        if not force:
+            artifact = load()
+            if artifact is not None:
+                return artifact
+        
+        logger.info(f"🔄 Compiling QA artifact for {len(questions)} questions...")
+        return compile_qa_artifact(
+            get_qa_artifact_dir(),
+            key,
+            questions,
+            encode=encode or (lambda batch: encode_questions(model, batch)),
+            extract_keywords=extract_keywords,
+            model_id=model_id,
+            dataset_sha256=dataset_hash(raw),
+            index_backend=get_qa_index_backend(),
+            storage=get_qa_embedding_storage(),
+        )
+
+
+def build_qa_artifact(qa_file: Path = QA_DATASET_PATH, force: bool = False) -> QAArtifact:
+    """Compile qa_dataset.json into its on-disk artifact (offline build entry point)"""
+    raw, qa_pairs = load_qa_pairs(qa_file)
+    model, model_id = load_embedding_model()
+    return load_or_compile_artifact(raw, [qa['question'] for qa in qa_pairs], model, force=force, model_id=model_id)
+
+
+def qa_pair_hash(qa: Dict) -> str:
+    """Content hash of one QA pair, used to diff dataset versions"""
+    return hashlib.sha256(f"{qa['question']}\0{qa['answer']}".encode('utf-8')).hexdigest()
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime, size) of a file, or None if it does not exist"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class QASnapshot:
+    """Everything derived from one version of the QA dataset; replaced as a whole on reload"""
+    dataset: List[Dict] = field(default_factory=list)
+    embeddings: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+    index: Optional[VectorIndex] = None
+    keyword_matrix: Optional[KeywordMatrix] = None
+    partitions: Optional[CategoryPartitions] = None
+    artifact: Optional[QAArtifact] = None
+    version: Optional[str] = None
+    intent_router: IntentRouter = field(default_factory=lambda: IntentRouter([]))
+    greeting_answers: Dict[str, Tuple[int, str]] = field(default_factory=dict)
+    loaded_at: float = field(default_factory=time.time)
+
+
+# Distinguishes "not cached" from a cached "no match" (None)
+_NOT_CACHED = object()
+
 
 class HybridQAEngine:
-    def __init__(self) -> None:
+    def __init__(self, doc_handler: Optional[DocumentRequestHandler] = None, dataset_path: Optional[Path] = None) -> None:
         # Initialize with safe defaults
         self.gemini_model = None
+        self.gemini_context: Optional[GeminiContext] = None
         self.sentence_model = None
-        self.qa_dataset = []
-        self.qa_embeddings = []
+        self.embedding_model_id = SENTENCE_MODEL_ID
+        self.embedder: Optional[EmbeddingBatcher] = None
+        
+        # The active dataset version; readers take one reference, reloads replace it in a single assignment
+        self.dataset_path = Path(dataset_path) if dataset_path else QA_DATASET_PATH
+        self._snapshot = QASnapshot()
+        self._dataset_signature: Optional[Tuple[int, int]] = None
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self.last_reload: Optional[Dict] = None
+        
+        # Query caches keyed on the preprocessed question: embeddings per model, matches per dataset version
+        self._embedding_cache = LRUCache(get_qa_cache_max_entries(), get_qa_cache_ttl_seconds(), name="query_embeddings")
+        self._match_cache = LRUCache(get_qa_cache_max_entries(), get_qa_cache_ttl_seconds(), name="similar_questions")
+        self.answer_cache: Optional[SemanticCache] = None
+        # Identical questions asked concurrently share one search and one Gemini call
+        self.single_flight = SingleFlight("qa_answers") if single_flight_enabled() else None
+        self.policy_retriever: Optional[PolicyRetriever] = None
         self.doc_handler = None
         self._current_document_request = None
         
         # Initialize services with better error handling
         self._initialize_gemini()
         self._initialize_sentence_transformer()
+        self._initialize_policy_retriever()
+        self._initialize_answer_cache()
         self._load_qa_dataset()
         
+        # Use the shared document request handler when one is provided
+        if doc_handler is not None:
+            self.doc_handler = doc_handler
+            return
+        
         # Initialize document request handler with better error handling
         try:
             self.doc_handler = DocumentRequestHandler()
@@ -41,211 +344,364 @@ class HybridQAEngine:
             logger.error(f"❌ Failed to initialize document request handler: {str(e)}")
             self.doc_handler = None
     
+    # Read-only views of the active snapshot
+    
+    @property
+    def qa_dataset(self) -> List[Dict]:
+        return self._snapshot.dataset
+    
+    @property
+    def qa_embeddings(self) -> np.ndarray:
+        return self._snapshot.embeddings
+    
+    @property
+    def qa_index(self) -> Optional[VectorIndex]:
+        return self._snapshot.index
+    
+    @property
+    def qa_keyword_matrix(self) -> Optional[KeywordMatrix]:
+        return self._snapshot.keyword_matrix
+    
+    @property
+    def qa_artifact(self) -> Optional[QAArtifact]:
+        return self._snapshot.artifact
+    
+    @property
+    def qa_version(self) -> Optional[str]:
+        return self._snapshot.version
+    
+    @property
+    def intent_router(self) -> IntentRouter:
+        return self._snapshot.intent_router
+    
     def _initialize_gemini(self):
         """Initialize Gemini model with enhanced error handling"""
         try:
             api_key = os.getenv("GOOGLE_GEMINI_API_KEY")
-            if not api_key:
+            if not api_key and not gemini_stub_enabled():
                 logger.warning("⚠️ GOOGLE_GEMINI_API_KEY not found in environment variables")
                 return
             
+            # Imported here so importing the engine (and the chat router) stays cheap
+            genai = load_genai()
             genai.configure(api_key=api_key)
-            self.gemini_model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            logger.info("✅ Gemini model initialized successfully")
+            self.gemini_context = GeminiContext(
+                genai, GEMINI_MODEL_ID, GEMINI_SYSTEM_INSTRUCTION, name="qa",
+                mode=get_gemini_context_mode(), ttl_seconds=get_gemini_context_cache_ttl_seconds(),
+            )
+            self.gemini_model = self.gemini_context.model()
+            logger.info(f"✅ Gemini model initialized successfully (context: {self.gemini_context.mode})")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Gemini model: {str(e)}")
             self.gemini_model = None
+            self.gemini_context = None
 
     def _initialize_sentence_transformer(self):
         """Initialize sentence transformer for semantic search"""
         try:
-            # Set cache directory to use existing models
-            import os
-            models_dir = Path(__file__).parent.parent.parent.parent / "models"
-            cache_dir = models_dir / "sentence-transformers"
-            
-            # Set environment variables for model caching
-            os.environ["SENTENCE_TRANSFORMERS_HOME"] = str(cache_dir)
-            os.environ["HF_HOME"] = str(models_dir)
-            os.environ["TRANSFORMERS_CACHE"] = str(models_dir / "transformers")
-            
-            # Check if model files exist
-            model_path = cache_dir / "models--sentence-transformers--all-MiniLM-L6-v2"
-            logger.info(f"🔍 Checking model path: {model_path}")
-            logger.info(f"🔍 Cache directory: {cache_dir}")
-            logger.info(f"🔍 Models directory: {models_dir}")
-            
-            if not model_path.exists():
-                logger.warning(f"⚠️ Model not found at {model_path}, will download")
-            else:
-                logger.info(f"✅ Found existing model at {model_path}")
-            
-            # Try to use local model path first
-            model_path = cache_dir / "models--sentence-transformers--all-MiniLM-L6-v2" / "snapshots" / "c9745ed1d9f207416be6d2e6f8de32d1f16199bf"
-            if model_path.exists():
-                logger.info(f"✅ Using local model from {model_path}")
-                self.sentence_model = SentenceTransformer(str(model_path))
-            else:
-                logger.info("⚠️ Local model not found, using cache directory")
-                self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2', cache_folder=str(cache_dir))
+            self.sentence_model, self.embedding_model_id = load_embedding_model()
+            self.embedder = EmbeddingBatcher(
+                lambda texts: encode_questions(self.sentence_model, texts),
+                max_batch=get_embed_max_batch(),
+                max_wait_ms=get_embed_max_wait_ms(),
+            )
             logger.info("✅ Sentence transformer initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize sentence transformer: {str(e)}")
             self.sentence_model = None
     
+    def _initialize_policy_retriever(self):
+        """Load the policy passage index built by scripts/ingest_policies.py"""
+        if not self.sentence_model:
+            return
+        try:
+            self.policy_retriever = PolicyRetriever.load(get_policy_index_dir(), self.embedding_model_id)
+            if self.policy_retriever is None:
+                logger.warning("⚠️ Policy index not available - Gemini answers use the built-in topic list")
+        except Exception as e:
+            logger.error(f"❌ Failed to load policy index: {str(e)}")
+            self.policy_retriever = None
+    
+    def _initialize_answer_cache(self):
+        """Semantic cache for Gemini answers, keyed on question embeddings"""
+        if not semantic_cache_enabled() or not self.sentence_model:
+            return
+        try:
+            self.answer_cache = SemanticCache(
+                max_distance=get_semantic_cache_max_distance(),
+                max_entries=get_semantic_cache_max_entries(),
+                ttl_seconds=get_semantic_cache_ttl_seconds(),
+                path=get_semantic_cache_path(),
+                namespace=(f"{self.embedding_model_id}|{GEMINI_MODEL_ID}|prompt-v{GEMINI_PROMPT_VERSION}"
+                           f"|policies-{self.policy_retriever.key if self.policy_retriever else 'none'}"),
+            )
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize semantic answer cache: {str(e)}")
+            self.answer_cache = None
+    
     def _load_qa_dataset(self):
         """Load QA dataset and pre-compute embeddings"""
         try:
-            qa_file = Path(__file__).parent.parent / "data" / "qa_dataset.json"
-            logger.info(f"🔍 Loading QA dataset from: {qa_file}")
-            
-            if not qa_file.exists():
-                logger.warning("⚠️ QA dataset file not found")
+            loaded = self._read_qa_dataset()
+            if loaded is None:
                 return
-            
-            # Check file size
-            file_size = qa_file.stat().st_size
-            logger.info(f"📁 QA dataset file size: {file_size} bytes")
-            
-            # Read file content first to check for issues
-            with open(qa_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            logger.info(f"📄 File content length: {len(content)} characters")
-            
-            # Parse JSON with better error handling
-            try:
-                self.qa_dataset = json.loads(content)
-                logger.info(f"📊 Successfully parsed JSON with {len(self.qa_dataset)} QA pairs")
-            except json.JSONDecodeError as e:
-                logger.error(f"❌ JSON parsing error: {str(e)}")
-                logger.error(f"❌ Error at line {e.lineno}, column {e.colno}")
-                # Try to show the problematic area
-                lines = content.split('\n')
-                if e.lineno <= len(lines):
-                    logger.error(f"❌ Problematic line {e.lineno}: {lines[e.lineno-1]}")
-                return
-            
-            # Validate dataset structure
-            if not isinstance(self.qa_dataset, list):
-                logger.error("❌ QA dataset is not a list")
-                self.qa_dataset = []
-                return
-            
-            # Count valid QA pairs
-            valid_pairs = 0
-            for i, qa in enumerate(self.qa_dataset):
-                if isinstance(qa, dict) and 'question' in qa and 'answer' in qa:
-                    valid_pairs += 1
-                else:
-                    logger.warning(f"⚠️ Invalid QA pair at index {i}: {qa}")
-            
-            logger.info(f"📊 Found {valid_pairs} valid QA pairs out of {len(self.qa_dataset)} total entries")
-            
-            # Pre-compute embeddings for all questions
-            if self.sentence_model and self.qa_dataset:
-                questions = [qa['question'] for qa in self.qa_dataset if isinstance(qa, dict) and 'question' in qa]
-                logger.info(f"🔄 Computing embeddings for {len(questions)} questions...")
-                self.qa_embeddings = self.sentence_model.encode(questions)
-                logger.info(f"✅ Successfully computed embeddings for {len(self.qa_embeddings)} questions")
-            else:
-                logger.warning("⚠️ Could not compute embeddings - sentence model not available or dataset empty")
-            
+            raw, dataset = loaded
+            self._snapshot = self._build_snapshot(raw, dataset)
         except Exception as e:
             logger.error(f"❌ Failed to load QA dataset: {str(e)}")
             import traceback
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
-            self.qa_dataset = []
-            self.qa_embeddings = []
+            self._snapshot = QASnapshot()
     
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for better matching"""
-        import re
+    def _read_qa_dataset(self) -> Optional[Tuple[bytes, List[Dict]]]:
+        """Read and validate the dataset file, returning its raw bytes and the valid QA pairs"""
+        qa_file = self.dataset_path
+        logger.info(f"🔍 Loading QA dataset from: {qa_file}")
         
-        # Convert to lowercase
-        text = text.lower().strip()
+        # Remember which file version was read, so the watcher only reloads on a later change
+        self._dataset_signature = file_signature(qa_file)
+        if not qa_file.exists():
+            logger.warning("⚠️ QA dataset file not found")
+            return None
+        
+        # Check file size
+        file_size = qa_file.stat().st_size
+        logger.info(f"📁 QA dataset file size: {file_size} bytes")
+        
+        # Read file content first to check for issues (raw bytes are hashed for the artifact key)
+        raw = qa_file.read_bytes()
+        content = raw.decode('utf-8')
         
-        # Fix common typos
-        text = re.sub(r'\bpollicy\b', 'policy', text)
-        text = re.sub(r'\battendance\b', 'attendance', text)
-        text = re.sub(r'\bleave\b', 'leave', text)
-        text = re.sub(r'\bwfh\b', 'work from home', text)
+        logger.info(f"📄 File content length: {len(content)} characters")
         
-        # Normalize greeting variations
-        text = re.sub(r'\bheyy+\b', 'hey', text)  # heyyy -> hey
-        text = re.sub(r'\bhelloo+\b', 'hello', text)  # hellooo -> hello
-        text = re.sub(r'\bhii+\b', 'hi', text)  # hiii -> hi
+        # Parse JSON with better error handling
+        try:
+            dataset = json.loads(content)
+            logger.info(f"📊 Successfully parsed JSON with {len(dataset)} QA pairs")
+        except json.JSONDecodeError as e:
+            logger.error(f"❌ JSON parsing error: {str(e)}")
+            logger.error(f"❌ Error at line {e.lineno}, column {e.colno}")
+            # Try to show the problematic area
+            lines = content.split('\n')
+            if e.lineno <= len(lines):
+                logger.error(f"❌ Problematic line {e.lineno}: {lines[e.lineno-1]}")
+            return None
         
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Validate dataset structure
+        if not isinstance(dataset, list):
+            logger.error("❌ QA dataset is not a list")
+            return None
         
-        # Remove punctuation except for important ones
-        text = re.sub(r'[^\w\s\-]', ' ', text)
+        # Count valid QA pairs
+        valid_pairs = 0
+        for i, qa in enumerate(dataset):
+            if isinstance(qa, dict) and 'question' in qa and 'answer' in qa:
+                valid_pairs += 1
+            else:
+                logger.warning(f"⚠️ Invalid QA pair at index {i}: {qa}")
         
-        # Remove extra whitespace again
-        text = re.sub(r'\s+', ' ', text).strip()
+        logger.info(f"📊 Found {valid_pairs} valid QA pairs out of {len(dataset)} total entries")
         
-        return text
+        # Keep only valid pairs so dataset rows line up with embedding rows
+        return raw, [qa for qa in dataset if isinstance(qa, dict) and 'question' in qa and 'answer' in qa]
     
-    def _extract_keywords(self, text: str) -> set:
-        """Extract important keywords from text"""
-        # Common HR and policy keywords with better categorization
-        hr_keywords = {
-            # Policy types
-            'policy', 'policies', 'attendance', 'leave', 'work', 'home', 'wfh', 'dress', 'code', 'conduct', 'handbook', 'onboarding', 'performance', 'reimbursement',
-            'device', 'password', 'software', 'helpdesk', 'it', 'support', 'acceptable', 'use', 'sop', 'procedure',
-            
-            # Benefits and compensation
-            'benefits', 'salary', 'compensation', 'bonus', 'insurance', 'health', 'dental', 'vision', 'wellness',
-            
-            # Time and attendance
-            'time', 'hours', 'tardiness', 'late', 'early', 'overtime', 'schedule', 'flexible',
-            
-            # Leave and time off
-            'vacation', 'holiday', 'sick', 'emergency', 'pto', 'paid', 'unpaid', 'carry', 'over',
-            
-            # Workplace behavior
-            'respect', 'dignity', 'harassment', 'discrimination', 'ethics', 'ethical', 'unethical', 'violation', 'report', 'retaliation',
-            
-            # Training and development
-            'training', 'development', 'certification', 'workshop', 'conference', 'career',
-            
-            # General HR terms
-            'hr', 'human', 'resource', 'employee', 'employer', 'company', 'organization', 'workplace', 'manager', 'supervisor',
-            
-            # Emotion and greeting keywords
-            'hello', 'hi', 'hey', 'good', 'morning', 'afternoon', 'evening', 'how', 'are', 'you',
-            'feel', 'ok', 'well', 'going', 'everything', 'fine', 'great', 'thanks', 'thank', 'welcome', 'bye', 'goodbye'
-        }
+    def _build_snapshot(self, raw: bytes, dataset: List[Dict], previous: Optional[QASnapshot] = None) -> QASnapshot:
+        """Embeddings, keyword matrix, index and intent tables for a dataset version"""
+        intent_router, greeting_answers = self._build_intent_router(dataset)
+        snapshot = QASnapshot(dataset=dataset, intent_router=intent_router, greeting_answers=greeting_answers)
         
-        # Extract words from text
-        words = set(self._preprocess_text(text).split())
+        # Load precompiled embeddings when the dataset is unchanged, otherwise compute them
+        if not self.sentence_model or not dataset:
+            logger.warning("⚠️ Could not compute embeddings - sentence model not available or dataset empty")
+            return snapshot
         
-        # Return intersection with HR keywords
-        return words.intersection(hr_keywords)
+        questions = [qa['question'] for qa in dataset]
+        encode = lambda batch: self._encode_incremental(batch, previous)  # noqa: E731
+        artifact = None
+        try:
+            artifact = load_or_compile_artifact(raw, questions, self.sentence_model,
+                                                compile_missing=qa_artifact_autosave(),
+                                                model_id=self.embedding_model_id, encode=encode)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write QA artifact, keeping embeddings in memory: {str(e)}")
+        
+        if artifact is not None:
+            snapshot.artifact = artifact
+            snapshot.embeddings = artifact.embeddings
+            snapshot.keyword_matrix = artifact.keyword_matrix
+            snapshot.partitions = artifact.partitions
+            snapshot.index = artifact.index
+        else:
+            logger.info(f"🔄 Computing embeddings for {len(questions)} questions...")
+            snapshot.embeddings = encode(questions)
+            snapshot.keyword_matrix = KeywordMatrix.build(questions, extract_keywords)
+            snapshot.partitions = CategoryPartitions.build(snapshot.keyword_matrix)
+            snapshot.index = build_index(snapshot.embeddings, get_qa_index_backend(), storage=get_qa_embedding_storage())
+        snapshot.version = artifact_key(raw, self.embedding_model_id, get_qa_index_backend())
+        logger.info(f"✅ Embeddings ready for {len(snapshot.embeddings)} questions (version {snapshot.version})")
+        return snapshot
     
-    def _keyword_similarity(self, user_question: str, dataset_question: str) -> float:
-        """Calculate keyword-based similarity"""
-        user_keywords = self._extract_keywords(user_question)
-        dataset_keywords = self._extract_keywords(dataset_question)
+    def _encode_incremental(self, questions: List[str], previous: Optional[QASnapshot]) -> np.ndarray:
+        """Encode questions, reusing the previous snapshot's embedding for every unchanged question"""
+        known: Dict[str, int] = {}
+        if previous is not None and previous.index is not None:
+            for row, qa in enumerate(previous.dataset):
+                known.setdefault(qa['question'], row)
+        if not known:
+            return encode_questions(self.sentence_model, questions)
         
-        if not user_keywords or not dataset_keywords:
-            return 0.0
+        reused = [i for i, q in enumerate(questions) if q in known]
+        missing = [i for i, q in enumerate(questions) if q not in known]
+        embeddings = np.empty((len(questions), previous.embeddings.shape[1]), dtype=np.float32)
+        if reused:
+            embeddings[reused] = previous.embeddings[[known[questions[i]] for i in reused]]
+        if missing:
+            embeddings[missing] = encode_questions(self.sentence_model, [questions[i] for i in missing])
+        logger.info(f"🔄 Re-encoded {len(missing)} of {len(questions)} questions ({len(reused)} reused)")
+        return embeddings
+    
+    async def reload_dataset(self, force: bool = False) -> Dict:
+        """Re-read the dataset file and swap in the new version, re-encoding only changed questions"""
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
         
-        # Calculate Jaccard similarity
-        intersection = len(user_keywords.intersection(dataset_keywords))
-        union = len(user_keywords.union(dataset_keywords))
+        async with self._reload_lock:
+            signature = file_signature(self.dataset_path)
+            if not force and signature == self._dataset_signature:
+                return {"reloaded": False, "version": self.qa_version}
+            
+            previous = self._snapshot
+            start = time.perf_counter()
+            try:
+                loaded = await asyncio.to_thread(self._read_qa_dataset)
+                if loaded is None:
+                    return {"reloaded": False, "version": self.qa_version, "error": "QA dataset could not be read"}
+                raw, dataset = loaded
+                snapshot = await asyncio.to_thread(self._build_snapshot, raw, dataset, previous)
+            except Exception as e:
+                logger.error(f"❌ Failed to reload QA dataset: {str(e)}")
+                return {"reloaded": False, "version": self.qa_version, "error": str(e)}
+            
+            # Single reference swap: in-flight requests keep the snapshot they started with
+            self._snapshot = snapshot
+            
+            old_pairs = {qa_pair_hash(qa) for qa in previous.dataset}
+            new_pairs = {qa_pair_hash(qa) for qa in dataset}
+            old_questions = {qa['question'] for qa in previous.dataset}
+            self.last_reload = {
+                "reloaded": True,
+                "previous_version": previous.version,
+                "version": snapshot.version,
+                "total_qa_pairs": len(dataset),
+                "added": len(new_pairs - old_pairs),
+                "removed": len(old_pairs - new_pairs),
+                "changed_questions": len({qa['question'] for qa in dataset} - old_questions),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                "at": datetime.now().isoformat(),
+            }
+            logger.info(f"✅ QA dataset reloaded: {self.last_reload}")
+            return self.last_reload
+    
+    async def watch_dataset(self, interval: float) -> None:
+        """Poll the dataset file and hot-reload it whenever it changes"""
+        logger.info(f"🔍 Watching QA dataset {self.dataset_path} every {interval}s")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if file_signature(self.dataset_path) != self._dataset_signature:
+                    await self.reload_dataset()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ QA dataset watcher error: {str(e)}")
+    
+    def dataset_status(self) -> Dict:
+        """Active dataset version and the outcome of the last reload"""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "dataset_path": str(self.dataset_path),
+            "total_qa_pairs": len(snapshot.dataset),
+            "loaded_at": datetime.fromtimestamp(snapshot.loaded_at).isoformat(),
+            "artifact": artifact_summary(snapshot.artifact),
+            "last_reload": self.last_reload,
+        }
+    
+    def _build_intent_router(self, dataset: List[Dict]) -> Tuple[IntentRouter, Dict[str, Tuple[int, str]]]:
+        """Compile the fast-path keywords and precompute their dataset answers"""
+        answers = {}
+        greeting_answers = {}
+        phrases = set(GREETING_KEYWORDS) | set(EMOTION_KEYWORDS) | set(CAPABILITY_KEYWORDS)
+        for i, qa in enumerate(dataset):
+            qa_lower = qa['question'].lower()
+            answer = qa['answer']
+            # Dataset questions that are themselves an intent phrase ("hello", "how are you", ...)
+            if qa_lower.strip() in phrases:
+                greeting_answers.setdefault(qa_lower.strip(), (i, answer))
+            if 'how are you' in qa_lower:
+                answers.setdefault('emotion', answer)
+            if 'what can you do' in qa_lower or 'help' in qa_lower:
+                answers.setdefault('capability', answer)
+
+        intent_router = IntentRouter([
+            ("greeting", GREETING_KEYWORDS),
+            ("emotion", EMOTION_KEYWORDS),
+            ("capability", CAPABILITY_KEYWORDS),
+        ], answers=answers)
+        return intent_router, greeting_answers
+
+    def _fast_path_answer(self, processed_question: str) -> Optional[str]:
+        """Answer greetings, emotion and capability questions from the precomputed table"""
+        snapshot = self._snapshot
+        matches = snapshot.intent_router.match(processed_question)
+        if not matches:
+            return None
+        intents = {intent for intent, _ in matches}
+
+        # Greetings get the answer of the earliest dataset phrase found in the question
+        if 'greeting' in intents:
+            hits = [snapshot.greeting_answers[keyword] for _, keyword in matches if keyword in snapshot.greeting_answers]
+            if hits:
+                return min(hits)[1]
+
+        for intent in ('emotion', 'capability'):
+            if intent in intents and intent in snapshot.intent_router.answers:
+                return snapshot.intent_router.answers[intent]
+        return None
+
+    def _preprocess_text(self, text: str) -> str:
+        """Preprocess text for better matching"""
+        return preprocess_text(text)
+    
+    def _extract_keywords(self, text: str) -> set:
+        """Extract important keywords from text"""
+        return extract_keywords(text)
+    
+    async def _embed_query(self, processed_question: str) -> np.ndarray:
+        """Query embedding via the batching service, so encoding never blocks the event loop"""
+        embedding = self._embedding_cache.get(processed_question, version=self.embedding_model_id)
+        if embedding is not None:
+            return embedding
         
-        return intersection / union if union > 0 else 0.0
+        if self.embedder is not None:
+            embedding = await self.embedder.embed(processed_question)
+        else:
+            embedding = (await asyncio.to_thread(encode_questions, self.sentence_model, [processed_question]))[0]
+        self._embedding_cache.set(processed_question, embedding, version=self.embedding_model_id)
+        return embedding
     
-    def _find_similar_question(self, user_question: str, threshold: float = 0.75) -> Optional[Dict]:
+    async def _find_similar_question(self, user_question: str, threshold: float = 0.75,
+                                     trace: Optional[RequestTrace] = None) -> Optional[Dict]:
         """Find most similar question from dataset using improved semantic search"""
-        if not self.sentence_model or not self.qa_embeddings or not self.qa_dataset:
+        if trace is None:
+            trace = RequestTrace()
+        snapshot = self._snapshot
+        if not self.sentence_model or snapshot.index is None or not snapshot.dataset:
             logger.warning("⚠️ Missing required components for semantic search")
             return None
         
         # Additional safety check for embeddings
-        if len(self.qa_embeddings) == 0 or len(self.qa_dataset) == 0:
+        if len(snapshot.index) == 0 or len(snapshot.dataset) == 0:
             logger.warning("⚠️ Empty embeddings or dataset")
             return None
         
@@ -254,245 +710,385 @@ class HybridQAEngine:
             processed_question = self._preprocess_text(user_question)
             logger.info(f"🔍 Processing question: '{user_question}' -> '{processed_question}'")
             
-            # Encode user question
-            user_embedding = self.sentence_model.encode([processed_question])
-            
-            # Calculate semantic similarities
-            similarities = np.dot(self.qa_embeddings, user_embedding.T).flatten()
-            
-            # Find top matches (keep as numpy array for argsort)
-            top_indices = np.argsort(similarities)[::-1][:10]  # Top 10 matches for better selection
-            
-            # Convert to list after finding indices
-            similarities = similarities.tolist()
-            
-            best_match = None
-            best_score = 0.0
+            # Repeated questions reuse the previous result (including "no match")
+            cache_key = (processed_question, threshold)
+            with trace.stage("match_cache"):
+                cached = self._match_cache.get(cache_key, _NOT_CACHED, version=snapshot.version)
+            if cached is not _NOT_CACHED:
+                return cached
             
-            for idx in top_indices:
-                idx = int(idx)
-                dataset_question = self.qa_dataset[idx]['question']
-                
-                # Semantic similarity
-                semantic_sim = float(similarities[idx])
-                
-                # Keyword similarity
-                keyword_sim = self._keyword_similarity(processed_question, dataset_question)
-                
-                # Combined score (weighted average) - increased weight for keywords
-                combined_score = (semantic_sim * 0.5) + (keyword_sim * 0.5)
-                
-                logger.info(f"🔍 Match {idx}: '{dataset_question}' - Semantic: {semantic_sim:.3f}, Keywords: {keyword_sim:.3f}, Combined: {combined_score:.3f}")
-                
-                # Additional validation: check for exact keyword matches
-                user_keywords = self._extract_keywords(processed_question)
-                dataset_keywords = self._extract_keywords(dataset_question)
-                
-                # If user is asking about a specific policy, ensure the dataset question is about the same policy
-                policy_keywords = ['policy', 'policies', 'attendance', 'leave', 'wfh', 'dress', 'conduct', 'handbook', 'onboarding', 'performance', 'reimbursement', 'it', 'device', 'password', 'software', 'helpdesk']
-                user_policy_keywords = user_keywords.intersection(set(policy_keywords))
-                dataset_policy_keywords = dataset_keywords.intersection(set(policy_keywords))
-                
-                # If user is asking about a specific policy, dataset must contain similar policy keywords
-                if user_policy_keywords and not dataset_policy_keywords.intersection(user_policy_keywords):
-                    logger.info(f"⚠️ Policy keyword mismatch - User: {user_policy_keywords}, Dataset: {dataset_policy_keywords}")
-                    continue
-                
-                # For short questions, require higher keyword similarity
-                if len(processed_question.split()) <= 3 and keyword_sim < 0.4:
-                    logger.info(f"⚠️ Short question requires higher keyword similarity: {keyword_sim:.3f}")
-                    continue
-                
-                if combined_score > best_score:
-                    best_score = combined_score
-                    best_match = {
-                        'qa_pair': self.qa_dataset[idx],
-                        'similarity': combined_score,
-                        'semantic_similarity': semantic_sim,
-                        'keyword_similarity': keyword_sim,
-                        'index': idx
-                    }
-            
-            logger.info(f"🔍 Best combined score: {best_score:.3f} (threshold: {threshold})")
-            
-            # Adaptive threshold based on question length and complexity
-            adaptive_threshold = threshold
-            if len(processed_question.split()) <= 3:  # Short questions
-                adaptive_threshold = threshold - 0.05  # Reduced reduction
-            elif len(processed_question.split()) >= 10:  # Long questions
-                adaptive_threshold = threshold + 0.1
-            
-            # Additional validation for policy questions
-            if 'policy' in processed_question.lower():
-                # For policy questions, require higher threshold
-                adaptive_threshold = max(adaptive_threshold, 0.7)
-                
-                # Ensure the matched question is actually about a policy
-                if best_match:
-                    matched_question = best_match['qa_pair']['question'].lower()
-                    if 'policy' not in matched_question and not any(policy in matched_question for policy in ['attendance', 'leave', 'wfh', 'dress', 'conduct', 'handbook', 'onboarding', 'performance', 'reimbursement', 'it', 'device', 'password', 'software', 'helpdesk']):
-                        logger.info(f"⚠️ Policy question matched with non-policy answer: {matched_question}")
-                        return None
-            
-            if best_score >= adaptive_threshold:
+            async def score() -> Optional[Dict]:
+                best_match = await self._score_candidates(processed_question, threshold, snapshot, trace)
+                self._match_cache.set(cache_key, best_match, version=snapshot.version)
                 return best_match
             
-            return None
-                
+            return await self._coalesced(("search", snapshot.version) + cache_key, score, trace)
         except Exception as e:
             logger.error(f"❌ Error in semantic search: {str(e)}")
             import traceback
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
             return None
     
-    async def _gemini_answer(self, question: str) -> str:
-        """Generate answer using Gemini API"""
-        if not self.gemini_model:
-            return "I apologize, but I'm currently unable to process your request. Please try again later."
+    async def _score_candidates(self, processed_question: str, threshold: float, snapshot: QASnapshot,
+                                trace: RequestTrace) -> Optional[Dict]:
+        """Semantic top-k from the question's policy partitions, re-ranked with keyword similarity"""
+        # Encode user question
+        with trace.stage("encode"):
+            user_embedding = await self._embed_query(processed_question)
         
-        try:
-            # Enhanced prompt for better responses
-            prompt = f"""
-            You are an AI assistant for Reliance Jio Infotech Solutions. 
-            Answer the following question about company policies, procedures, or general HR matters.
-            Be helpful, professional, and accurate. If you're not sure about something, say so.
-            
-            **Available Policy Topics:**
-            - Attendance Policy (work hours, tardiness)
-            - Leave Policy (20 days annual leave, submission requirements)
-            - Work From Home Policy (3 days/week, manager approval)
-            - Dress Code Policy (business casual)
-            - Performance Review Policy (bi-annual reviews)
-            - Reimbursement Policy (30-day submission, receipts required)
-            - Code of Conduct (respect, zero tolerance for harassment)
-            - Employee Handbook (mission, values, policies)
-            - Onboarding (2-week program, mandatory training)
-            - IT Policies (device, password, software, helpdesk)
+        # If user is asking about a specific policy, only questions sharing one of its policy keywords are scored
+        with trace.stage("route"):
+            matrix = snapshot.keyword_matrix
+            user_columns = matrix.columns_for(self._extract_keywords(processed_question))
+            candidate_rows = snapshot.partitions.rows_for(user_columns) if snapshot.partitions is not None else None
+        
+        # Top 10 semantic matches from the vector index for better selection
+        with trace.stage("search"):
+            top_indices, top_scores = snapshot.index.search(user_embedding, k=10, rows=candidate_rows)
+        
+        with trace.stage("rerank"):
+            semantic_sims = top_scores.astype(np.float64)
             
-            **Important Guidelines:**
-            - For general policy questions, provide an overview of the policy
-            - For specific scenarios, provide practical guidance
-            - Always include contact information when relevant
-            - Be friendly and professional in tone
-            - If the question is unclear, ask for clarification
-            - For greetings and emotion-based questions, respond warmly and professionally
-            - For "how are you" type questions, respond positively about being ready to help
+            # Keyword similarity for all candidates in one pass
+            keyword_sims = matrix.jaccard(user_columns, rows=top_indices)
             
-            **Question:** {question}
+            # Combined score (weighted average) - increased weight for keywords
+            combined_scores = (semantic_sims * 0.5) + (keyword_sims * 0.5)
             
-            Please provide a clear, helpful response based on the available policy information:
-            """
+            eligible = combined_scores > 0.0
+            # For short questions, require higher keyword similarity
+            if len(processed_question.split()) <= 3:
+                eligible &= keyword_sims >= 0.4
+        
+        for idx, semantic_sim, keyword_sim, combined_score, ok in zip(
+                top_indices.tolist(), semantic_sims, keyword_sims, combined_scores, eligible):
+            logger.info(f"🔍 Match {idx}: '{snapshot.dataset[idx]['question']}' - Semantic: {semantic_sim:.3f}, Keywords: {keyword_sim:.3f}, Combined: {combined_score:.3f}{'' if ok else ' (filtered)'}")
+        
+        best_match = None
+        best_score = 0.0
+        if eligible.any():
+            best = int(np.argmax(np.where(eligible, combined_scores, -np.inf)))
+            idx = int(top_indices[best])
+            best_score = float(combined_scores[best])
+            best_match = {
+                'qa_pair': snapshot.dataset[idx],
+                'similarity': best_score,
+                'semantic_similarity': float(semantic_sims[best]),
+                'keyword_similarity': float(keyword_sims[best]),
+                'index': idx
+            }
+        
+        logger.info(f"🔍 Best combined score: {best_score:.3f} (threshold: {threshold})")
+        
+        # Adaptive threshold based on question length and complexity
+        adaptive_threshold = threshold
+        if len(processed_question.split()) <= 3:  # Short questions
+            adaptive_threshold = threshold - 0.05  # Reduced reduction
+        elif len(processed_question.split()) >= 10:  # Long questions
+            adaptive_threshold = threshold + 0.1
+        
+        # Additional validation for policy questions
+        if 'policy' in processed_question.lower():
+            # For policy questions, require higher threshold
+            adaptive_threshold = max(adaptive_threshold, 0.7)
             
-            response = await asyncio.to_thread(
-                self.gemini_model.generate_content,
-                prompt
-            )
+            # Ensure the matched question is actually about a policy
+            if best_match and not matrix.policy_mask[best_match['index']]:
+                logger.info(f"⚠️ Policy question matched with non-policy answer: {best_match['qa_pair']['question']}")
+                return None
+        
+        if best_score >= adaptive_threshold:
+            return best_match
+        
+        return None
+    
+    async def _coalesced(self, key: Hashable, compute: Callable[[], Awaitable[Any]], trace: RequestTrace,
+                         path: Optional[str] = None) -> Any:
+        """Await compute(), or the identical computation another request already has in flight"""
+        if self.single_flight is None:
+            return await compute()
+        start = time.perf_counter()
+        result, shared = await self.single_flight.run(key, compute)
+        if shared:
+            trace.add_stage("coalesced_wait", (time.perf_counter() - start) * 1000)
+            if path is not None:
+                trace.resolve(path)
+        return result
+    
+    async def _coalesced_stream(self, key: Hashable, produce: Callable[[], AsyncIterator[str]],
+                                trace: RequestTrace) -> AsyncIterator[str]:
+        """Stream produce(), or follow the identical stream another request already has in flight"""
+        if self.single_flight is None:
+            async for chunk in produce():
+                yield chunk
+            return
+        start = time.perf_counter()
+        chunks, shared = self.single_flight.stream(key, produce)
+        if not shared:
+            async for chunk in chunks:
+                yield chunk
+            return
+        trace.resolve("coalesced")
+        first = True
+        async for chunk in chunks:
+            if first:
+                trace.add_stage("coalesced_wait", (time.perf_counter() - start) * 1000)
+                first = False
+            yield chunk
+    
+    async def _policy_passages(self, question: str, embedding: Optional[np.ndarray] = None) -> List[PolicyPassage]:
+        """Top-k policy passages relevant to the question (empty without a policy index)"""
+        if self.policy_retriever is None:
+            return []
+        try:
+            if embedding is None:
+                embedding = await self._embed_query(self._preprocess_text(question))
+            passages = self.policy_retriever.search(embedding, k=get_policy_top_k(), min_score=get_policy_min_score())
+            if passages:
+                logger.info(f"📄 Retrieved {len(passages)} policy passages (best: {passages[0].title}, {passages[0].score:.3f})")
+            return passages
+        except Exception as e:
+            logger.error(f"❌ Policy retrieval failed: {str(e)}")
+            return []
+    
+    def _extractive_answer(self, passages: List[PolicyPassage]) -> Optional[str]:
+        """Answer straight from a policy passage that matches the question very closely"""
+        if passages and passages[0].score >= get_policy_extractive_score():
+            best = passages[0]
+            logger.info(f"✅ Answering from policy passage in {best.source} (score: {best.score:.3f})")
+            return f"{best.text}\n\n📄 *Source: {best.title}*"
+        return None
+    
+    def _gemini_prompt(self, question: str, passages: Optional[List[PolicyPassage]] = None) -> str:
+        """Per-question part of the Gemini prompt; the static instructions live in the Gemini context"""
+        # Ground the answer in the retrieved policy passages when there are any
+        if passages:
+            excerpts = "\n\n".join(f"[{i}] {p.title}: {p.text}" for i, p in enumerate(passages, 1))
+            return f"""**Policy excerpts:**
+{excerpts}
+
+**Question:** {question}
+"""
+        
+        return f"""**Question:** {question}
+
+Please provide a clear, helpful response based on the available policy information:
+"""
+
+    async def _cached_gemini_answer(self, question: str) -> Tuple[Optional[np.ndarray], Optional[str]]:
+        """Query embedding for the semantic answer cache and the cached answer for a near-identical question"""
+        if self.answer_cache is None:
+            return None, None
+        try:
+            embedding = await self._embed_query(self._preprocess_text(question))
+            cached = self.answer_cache.lookup(embedding)
+            if cached:
+                logger.info(f"✅ Semantic cache hit (distance {cached['distance']:.4f}) for: {cached['question']}")
+                return embedding, cached['answer']
+            return embedding, None
+        except Exception as e:
+            logger.error(f"❌ Semantic cache lookup failed: {str(e)}")
+            return None, None
+    
+    async def _gemini_answer(self, question: str, trace: Optional[RequestTrace] = None) -> str:
+        """Generate answer using Gemini API"""
+        if trace is None:
+            trace = RequestTrace()
+        
+        # Serve a near-identical question answered earlier from the semantic cache
+        with trace.stage("semantic_cache"):
+            embedding, cached = await self._cached_gemini_answer(question)
+        if cached is not None:
+            return trace.resolve("semantic_cache", cached)
+        
+        # Policy passages for the prompt; a near-exact passage match is answered without Gemini
+        with trace.stage("policy_retrieval"):
+            passages = await self._policy_passages(question, embedding)
+        extractive = self._extractive_answer(passages)
+        if extractive is not None:
+            return trace.resolve("policy_extractive", extractive)
+        
+        if not self.gemini_model:
+            return trace.resolve("gemini_unavailable", GEMINI_UNAVAILABLE_MESSAGE)
+        
+        try:
+            with trace.stage("gemini"):
+                response = await asyncio.to_thread(
+                    self.gemini_context.generate,
+                    self._gemini_prompt(question, passages)
+                )
             
             if response and response.text:
-                return response.text.strip()
+                answer = response.text.strip()
+                if embedding is not None:
+                    self.answer_cache.store(embedding, question, answer)
+                return trace.resolve("gemini", answer)
             else:
-                return "I apologize, but I couldn't generate a response. Please try rephrasing your question."
+                return trace.resolve("gemini_empty", GEMINI_EMPTY_MESSAGE)
             
         except Exception as e:
             logger.error(f"❌ Gemini API error: {str(e)}")
-            return "I apologize, but I'm experiencing technical difficulties. Please try again later."
+            return trace.resolve("gemini_error", GEMINI_ERROR_MESSAGE)
     
-    async def answer(self, question: str) -> str:
-        """Main method to answer questions using hybrid approach"""
-        if not question or not question.strip():
-            return "Please provide a question so I can help you."
+    async def _stream_gemini(self, prompt: str) -> AsyncIterator[str]:
+        """Yield Gemini response text chunks as they arrive; the blocking stream is consumed in a worker thread"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+        # Set when the consumer goes away (client disconnect), so the worker stops pulling the stream
+        stop = threading.Event()
         
-        question = question.strip()
-        
-        # Step 0: Handle common greetings and basic questions first
-        processed_question = self._preprocess_text(question)
-        
-        # Check for greetings and emotion-based questions
-        greeting_keywords = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'how are you']
-        emotion_keywords = ['how are you', 'how do you feel', 'are you ok', 'are you well', 'how is it going', 'how is everything']
-        
-        if any(greeting in processed_question for greeting in greeting_keywords):
-            # Try to find exact greeting match first
-            for qa in self.qa_dataset:
-                if isinstance(qa, dict) and 'question' in qa:
-                    qa_lower = qa['question'].lower()
-                    if qa_lower in processed_question or processed_question in qa_lower:
-                        return qa['answer']
-        
-        # Check for emotion-based questions specifically
-        if any(emotion in processed_question for emotion in emotion_keywords):
-            # Look for the "how are you" response specifically
-            for qa in self.qa_dataset:
-                if isinstance(qa, dict) and 'question' in qa:
-                    if 'how are you' in qa['question'].lower():
-                        return qa['answer']
-        
-        # Check for "what can you do" type questions
-        capability_keywords = ['what can you do', 'help', 'capabilities', 'features']
-        if any(keyword in processed_question for keyword in capability_keywords):
-            for qa in self.qa_dataset:
-                if isinstance(qa, dict) and 'question' in qa:
-                    if 'what can you do' in qa['question'].lower() or 'help' in qa['question'].lower():
-                        return qa['answer']
-        
-        # Step 1: Check for document request keywords and numeric selections
-        document_keywords = [
-            'document', 'need document', 'request document', 'get document', 'want document',
-            'experience letter', 'employment letter', 'salary slip', 'form 16', 'bonafide',
-            'certificate', 'noc', 'relieving letter', 'offer letter', 'appointment letter',
-            'promotion letter', 'pf statement', 'uan details', 'medical insurance',
-            'id card', 'visa support', 'travel authorization'
-        ]
-        
-        # Check if it's a numeric document selection (1-16)
-        if self.doc_handler and question.strip().isdigit() and 1 <= int(question.strip()) <= 16:
+        def produce() -> None:
+            chunk = None
             try:
-                doc_number = question.strip()
-                doc_name = self.doc_handler.supported_documents.get(doc_number)
-                if doc_name:
-                    logger.info(f"📄 User selected document: {doc_number} - {doc_name}")
-                    return self.doc_handler.get_document_details_prompt(doc_name)
+                for chunk in self.gemini_context.generate(prompt, stream=True):
+                    if stop.is_set():
+                        break
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Chunks without text parts (e.g. safety-blocked) raise on .text
+                        continue
+                    if text:
+                        loop.call_soon_threadsafe(queue.put_nowait, text)
+                # The last chunk carries the usage of the whole stream
+                if chunk is not None:
+                    self.gemini_context.record(chunk)
             except Exception as e:
-                logger.error(f"❌ Document selection error: {str(e)}")
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
         
-        # Check if user is providing document details (contains common document-related keywords)
-        if self.doc_handler and any(keyword in question.lower() for keyword in ['name:', 'employee id:', 'id:', 'department:', 'designation:', 'joining date:', 'purpose:']):
-            try:
-                # This looks like document details being provided
-                return """📝 **Document Request Details Received**
-
-Thank you for providing the details! I've received your document request information.
-
-**Next Steps:**
-1. Your request has been logged in our system
-2. HR will review and process your request
-3. You'll receive a confirmation email with tracking details
-4. The document will be generated and sent to you within 2-3 business days
-
-**Contact HR:**
-• Email: hr@reliancejio.com
-• Phone: Available through internal directory
-
-If you need immediate assistance, please contact HR directly."""
-            except Exception as e:
-                logger.error(f"❌ Document details processing error: {str(e)}")
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            await producer
+        finally:
+            stop.set()
+    
+    async def _gemini_answer_stream(self, question: str, trace: RequestTrace) -> AsyncIterator[str]:
+        """Streaming counterpart of _gemini_answer"""
+        with trace.stage("semantic_cache"):
+            embedding, cached = await self._cached_gemini_answer(question)
+        if cached is not None:
+            yield trace.resolve("semantic_cache", cached)
+            return
         
-        # Check for document request keywords
-        if self.doc_handler and any(keyword in question.lower() for keyword in document_keywords):
+        with trace.stage("policy_retrieval"):
+            passages = await self._policy_passages(question, embedding)
+        extractive = self._extractive_answer(passages)
+        if extractive is not None:
+            yield trace.resolve("policy_extractive", extractive)
+            return
+        
+        if not self.gemini_model:
+            yield trace.resolve("gemini_unavailable", GEMINI_UNAVAILABLE_MESSAGE)
+            return
+        
+        # The gemini stage is the time to the first chunk; the rest is paced by the client
+        parts = []
+        try:
+            stream = self._stream_gemini(self._gemini_prompt(question, passages))
+            with trace.stage("gemini"):
+                first = await anext(stream, None)
+            if first is not None:
+                parts.append(first)
+                yield first
+                async for text in stream:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            logger.error(f"❌ Gemini streaming error: {str(e)}")
+            trace.resolve("gemini_error")
+            if not parts:
+                yield GEMINI_ERROR_MESSAGE
+            return
+        
+        answer = "".join(parts).strip()
+        if not answer:
+            yield trace.resolve("gemini_empty", GEMINI_EMPTY_MESSAGE)
+            return
+        trace.resolve("gemini")
+        if embedding is not None:
+            self.answer_cache.store(embedding, question, answer)
+    
+    async def answer(self, question: str, trace: Optional[RequestTrace] = None) -> str:
+        """Main method to answer questions using hybrid approach; stage timings are recorded into trace"""
+        if trace is None:
+            trace = RequestTrace()
+        try:
+            local_answer = await self._local_answer(question, trace)
+            if local_answer is not None:
+                return local_answer
+            
+            # Step 3: Use Gemini API for complex questions
+            question = question.strip()
             try:
-                # Check if it's a specific document request
-                if any(specific_doc in question.lower() for specific_doc in ['experience letter', 'employment letter', 'salary slip', 'form 16', 'bonafide', 'certificate']):
-                    # Use the specific document handler
-                    return self._handle_specific_document_request(question)
-                
-                # If no specific match found, use document handler
-                return self.doc_handler.get_document_list()
+                logger.info("🔄 Using Gemini API for complex question")
+                return await self._coalesced(("gemini", self._preprocess_text(question)),
+                                             lambda: self._gemini_answer(question, trace), trace, path="coalesced")
             except Exception as e:
-                logger.error(f"❌ Document request error: {str(e)}")
+                logger.error(f"❌ Error in Gemini API: {str(e)}")
+                # Fallback to simple response
+                return trace.resolve("fallback", self._fallback_answer(question))
+        finally:
+            latency_metrics.record(trace)
+    
+    async def answer_stream(self, question: str, trace: Optional[RequestTrace] = None) -> AsyncIterator[str]:
+        """Like answer, but yields the response in chunks: local answers at once, Gemini answers as they stream"""
+        if trace is None:
+            trace = RequestTrace()
+        try:
+            local_answer = await self._local_answer(question, trace)
+            if local_answer is not None:
+                yield local_answer
+                return
+            
+            question = question.strip()
+            logger.info("🔄 Streaming Gemini API answer for complex question")
+            key = ("gemini_stream", self._preprocess_text(question))
+            async for chunk in self._coalesced_stream(key, lambda: self._gemini_answer_stream(question, trace), trace):
+                yield chunk
+        finally:
+            latency_metrics.record(trace)
+    
+    def _fallback_answer(self, question: str) -> str:
+        return f"Hello! I'm your Reliance Jio Infotech Solutions AI Assistant. I can help you with HR questions, document requests, and PDF processing. You asked: '{question}'. How can I assist you today?"
+    
+    async def _local_answer(self, question: str, trace: Optional[RequestTrace] = None) -> Optional[str]:
+        """Steps 0-2.5 of answer: fast paths, document requests, semantic and keyword search; None means ask Gemini"""
+        if trace is None:
+            trace = RequestTrace()
+        if not question or not question.strip():
+            return trace.resolve("empty", "Please provide a question so I can help you.")
+        
+        question = question.strip()
+        
+        # Step 0: Handle common greetings and basic questions first
+        with trace.stage("preprocess"):
+            processed_question = self._preprocess_text(question)
+        
+        # Greetings, emotion and capability questions, classified in one pass
+        with trace.stage("intent"):
+            fast_answer = self._fast_path_answer(processed_question)
+        if fast_answer is not None:
+            return trace.resolve("fast_path", fast_answer)
+        
+        # Step 1: Document requests and numeric document selections
+        with trace.stage("document"):
+            document_answer = self._document_answer(question)
+        if document_answer is not None:
+            return trace.resolve("document", document_answer)
         
         # Step 2: Try semantic search in local dataset
         try:
-            similar_qa = self._find_similar_question(question)
+            similar_qa = await self._find_similar_question(question, trace=trace)
             
             if similar_qa:
                 similarity_score = float(similar_qa['similarity'])
@@ -533,7 +1129,7 @@ If you need immediate assistance, please contact HR directly."""
                         threshold = 0.65  # Lower threshold for high-quality matches
                 
                 if similarity_score >= threshold:
-                    return similar_qa['qa_pair']['answer']
+                    return trace.resolve("semantic", similar_qa['qa_pair']['answer'])
                 else:
                     logger.info(f"⚠️ Similarity score {similarity_score:.3f} below threshold {threshold}")
         except Exception as e:
@@ -541,53 +1137,96 @@ If you need immediate assistance, please contact HR directly."""
             # Continue to keyword fallback
         
         # Step 2.5: Try keyword-based fallback
+        with trace.stage("keyword_fallback"):
+            keyword_answer = self._keyword_fallback_answer(question, processed_question)
+        if keyword_answer is not None:
+            return trace.resolve("keyword", keyword_answer)
+        
+        return None
+    
+    def _document_answer(self, question: str) -> Optional[str]:
+        """Step 1 of answer: document selection, document details and document request replies"""
+        document_intents = DOCUMENT_ROUTER.classify(question.lower())
+        
+        # Check if it's a numeric document selection (1-16)
+        if self.doc_handler and question.strip().isdigit() and 1 <= int(question.strip()) <= 16:
+            try:
+                doc_number = question.strip()
+                doc_name = self.doc_handler.supported_documents.get(doc_number)
+                if doc_name:
+                    logger.info(f"📄 User selected document: {doc_number} - {doc_name}")
+                    return self.doc_handler.get_document_details_prompt(doc_name)
+            except Exception as e:
+                logger.error(f"❌ Document selection error: {str(e)}")
+        
+        # Check if user is providing document details (contains common document-related keywords)
+        if self.doc_handler and 'document_details' in document_intents:
+            try:
+                # This looks like document details being provided
+                return """📝 **Document Request Details Received**
+
+Thank you for providing the details! I've received your document request information.
+
+**Next Steps:**
+1. Your request has been logged in our system
+2. HR will review and process your request
+3. You'll receive a confirmation email with tracking details
+4. The document will be generated and sent to you within 2-3 business days
+
+**Contact HR:**
+• Email: hr@reliancejio.com
+• Phone: Available through internal directory
+
+If you need immediate assistance, please contact HR directly."""
+            except Exception as e:
+                logger.error(f"❌ Document details processing error: {str(e)}")
+        
+        # Check for document request keywords
+        if self.doc_handler and document_intents & {'document_request', 'specific_document'}:
+            try:
+                # Check if it's a specific document request
+                if 'specific_document' in document_intents:
+                    # Use the specific document handler
+                    return self._handle_specific_document_request(question)
+                
+                # If no specific match found, use document handler
+                return self.doc_handler.get_document_list()
+            except Exception as e:
+                logger.error(f"❌ Document request error: {str(e)}")
+        
+        return None
+    
+    def _keyword_fallback_answer(self, question: str, processed_question: str) -> Optional[str]:
+        """Step 2.5 of answer: Jaccard keyword match against every dataset question in one pass"""
         try:
             logger.info("🔍 Trying keyword-based fallback search...")
             user_keywords = self._extract_keywords(question)
             logger.info(f"🔍 Extracted keywords: {user_keywords}")
             
-            if user_keywords:
-                best_keyword_match = None
-                best_keyword_score = 0.0
+            snapshot = self._snapshot
+            if user_keywords and snapshot.keyword_matrix is not None and len(snapshot.keyword_matrix) > 0:
+                matrix = snapshot.keyword_matrix
+                keyword_sims = matrix.jaccard(matrix.columns_for(user_keywords))
                 
-                for i, qa in enumerate(self.qa_dataset):
-                    dataset_keywords = self._extract_keywords(qa['question'])
-                    if dataset_keywords:
-                        keyword_sim = self._keyword_similarity(question, qa['question'])
-                        
-                        # Higher threshold for keyword matching
-                        if keyword_sim > best_keyword_score and keyword_sim > 0.5:  # Increased minimum threshold
-                            # Additional validation for policy questions
-                            if 'policy' in processed_question.lower():
-                                qa_question = qa['question'].lower()
-                                policy_indicators = ['policy', 'attendance', 'leave', 'wfh', 'dress', 'conduct', 'handbook', 'onboarding', 'performance', 'reimbursement', 'it', 'device', 'password', 'software', 'helpdesk']
-                                if not any(indicator in qa_question for indicator in policy_indicators):
-                                    logger.info(f"⚠️ Policy question keyword match with non-policy answer: {qa_question}")
-                                    continue
-                            
-                            best_keyword_score = keyword_sim
-                            best_keyword_match = {
-                                'qa_pair': qa,
-                                'similarity': keyword_sim,
-                                'index': i
-                            }
+                # Higher threshold for keyword matching
+                eligible = keyword_sims > 0.5
                 
-                if best_keyword_match and best_keyword_match['similarity'] > 0.6:  # Higher final threshold
-                    logger.info(f"✅ Found keyword-based match (score: {best_keyword_match['similarity']:.3f})")
-                    return best_keyword_match['qa_pair']['answer']
-                else:
-                    logger.info(f"⚠️ Keyword match score {best_keyword_match['similarity']:.3f if best_keyword_match else 0:.3f} below threshold 0.6")
+                # Additional validation for policy questions
+                if 'policy' in processed_question.lower():
+                    eligible &= matrix.policy_mask
+                
+                best_keyword_score = 0.0
+                if eligible.any():
+                    best = int(np.argmax(np.where(eligible, keyword_sims, -np.inf)))
+                    best_keyword_score = float(keyword_sims[best])
+                    if best_keyword_score > 0.6:  # Higher final threshold
+                        logger.info(f"✅ Found keyword-based match (score: {best_keyword_score:.3f})")
+                        return snapshot.dataset[best]['answer']
+                logger.info(f"⚠️ Keyword match score {best_keyword_score:.3f} below threshold 0.6")
         except Exception as e:
             logger.error(f"❌ Error in keyword fallback: {str(e)}")
         
-        # Step 3: Use Gemini API for complex questions
-        try:
-            logger.info("🔄 Using Gemini API for complex question")
-            return await self._gemini_answer(question)
-        except Exception as e:
-            logger.error(f"❌ Error in Gemini API: {str(e)}")
-            # Fallback to simple response
-            return f"Hello! I'm your Reliance Jio Infotech Solutions AI Assistant. I can help you with HR questions, document requests, and PDF processing. You asked: '{question}'. How can I assist you today?"
+        return None
     
     def _handle_specific_document_request(self, question: str) -> str:
         """Handle specific document requests with better responses"""
@@ -678,13 +1317,36 @@ You can also use our Document Request System by typing "I need a document" and s
         else:
             return self.doc_handler.get_document_list()
 
+    def close(self) -> None:
+        """Stop background workers owned by the engine"""
+        if self.embedder is not None:
+            self.embedder.close()
+        if self.answer_cache is not None:
+            self.answer_cache.save()
+        if self.gemini_context is not None:
+            self.gemini_context.close()
+    
     def get_health_status(self) -> Dict:
         """Get health status of QA engine components"""
         return {
             "gemini_model": self.gemini_model is not None,
             "sentence_model": self.sentence_model is not None,
+            "embedding_model_id": self.embedding_model_id,
             "qa_dataset_loaded": len(self.qa_dataset) > 0,
             "qa_embeddings_ready": len(self.qa_embeddings) > 0,
+            "qa_index_backend": self.qa_index.name if self.qa_index is not None else None,
+            "qa_embedding_storage": self.qa_index.storage if self.qa_index is not None else None,
+            "qa_dataset_version": self.qa_version,
+            "qa_artifact": artifact_summary(self.qa_artifact),
+            "embedding_batches": self.embedder.stats() if self.embedder is not None else None,
+            "query_cache": {
+                "embeddings": self._embedding_cache.stats(),
+                "matches": self._match_cache.stats(),
+            },
+            "answer_cache": self.answer_cache.stats() if self.answer_cache is not None else None,
+            "single_flight": self.single_flight.stats() if self.single_flight is not None else None,
+            "gemini_context": self.gemini_context.stats() if self.gemini_context is not None else None,
+            "policy_index": self.policy_retriever.summary() if self.policy_retriever is not None else None,
             "document_handler": self.doc_handler is not None,
             "total_qa_pairs": len(self.qa_dataset)
         }
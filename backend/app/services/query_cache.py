@@ -0,0 +1,88 @@
+"""
+Bounded LRU cache with per-entry TTL and version-based invalidation.
+
+Entries belong to a version (e.g. the QA dataset version). A lookup or store
+with a different version clears the cache first, so results computed against
+an old dataset are never served after a reload.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with TTL expiry and hit/miss/eviction counters"""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600.0, name: str = "cache") -> None:
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[Hashable] = None
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Optional[Hashable]) -> None:
+        if version is not None and version != self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: Hashable, default: Any = None, version: Optional[Hashable] = None) -> Any:
+        """Cached value for key, or default on a miss, expiry or version change"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if self.ttl_seconds > 0 and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[Hashable] = None) -> None:
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,206 @@
+"""
+Semantic response cache for Gemini fallback answers.
+
+Answers are stored together with the normalized embedding of the question that
+produced them. A new question whose embedding lies within ``max_distance``
+(cosine distance) of a stored one is served the stored answer instead of
+calling Gemini again. Lookups score every live entry with one matrix-vector
+product.
+
+Entries expire after ``ttl_seconds`` and the least recently used entry is
+replaced once ``max_entries`` is reached. The cache can be saved to and loaded
+from a single ``.npz`` file; entries written under a different namespace (the
+embedding model and Gemini model) are discarded on load.
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Embedding-keyed answer cache with cosine-distance lookup, TTL, LRU eviction and persistence"""
+
+    def __init__(
+        self,
+        max_distance: float = 0.05,
+        max_entries: int = 5000,
+        ttl_seconds: float = 86400.0,
+        path: Optional[Path] = None,
+        namespace: str = "",
+    ) -> None:
+        self.max_distance = max_distance
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self.namespace = namespace
+
+        self._embeddings: Optional[np.ndarray] = None  # (max_entries, dim), allocated on first store
+        self._questions = [""] * self.max_entries
+        self._answers = [""] * self.max_entries
+        self._created = np.zeros(self.max_entries, dtype=np.float64)
+        self._last_used = np.zeros(self.max_entries, dtype=np.float64)
+        self._live = np.zeros(self.max_entries, dtype=bool)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # one save at a time, so an older snapshot never replaces a newer one
+        self._changes = 0  # bumped by every change to the entries
+        self._saved_changes = 0  # value of _changes in the last snapshot written to path
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.path is not None:
+            self.load()
+
+    def _expire(self, now: float) -> None:
+        if self.ttl_seconds > 0:
+            expired = self._live & (self._created + self.ttl_seconds < now)
+            if expired.any():
+                self._live &= ~expired
+                self.expirations += int(expired.sum())
+                self._changes += 1
+
+    def lookup(self, embedding: np.ndarray) -> Optional[Dict]:
+        """Closest cached answer within max_distance of the (normalized) query embedding, if any"""
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            if self._embeddings is None or not self._live.any() or embedding.shape[-1] != self._embeddings.shape[1]:
+                self.misses += 1
+                return None
+
+            similarities = np.where(self._live, self._embeddings @ embedding, -np.inf)
+            slot = int(np.argmax(similarities))
+            distance = 1.0 - float(similarities[slot])
+            if distance > self.max_distance:
+                self.misses += 1
+                return None
+
+            self._last_used[slot] = now
+            self.hits += 1
+            return {"answer": self._answers[slot], "question": self._questions[slot], "distance": distance}
+
+    def store(self, embedding: np.ndarray, question: str, answer: str) -> None:
+        with self._lock:
+            now = time.time()
+            embedding = np.asarray(embedding, dtype=np.float32)
+            if self._embeddings is None or self._embeddings.shape[1] != embedding.shape[-1]:
+                self._embeddings = np.zeros((self.max_entries, embedding.shape[-1]), dtype=np.float32)
+                self._live[:] = False
+
+            self._expire(now)
+            free = np.flatnonzero(~self._live)
+            if free.size:
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+            self._embeddings[slot] = embedding
+            self._questions[slot] = question
+            self._answers[slot] = answer
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._live[slot] = True
+            self.stores += 1
+            self._changes += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._live[:] = False
+            self._changes += 1
+
+    def __len__(self) -> int:
+        return int(self._live.sum())
+
+    def save(self) -> None:
+        """Write the live entries to ``path`` atomically (no-op when unchanged or not persistent)"""
+        if self.path is None or self._changes == self._saved_changes:
+            return
+        with self._save_lock:
+            self._save()
+
+    def _save(self) -> None:
+        with self._lock:
+            changes = self._changes
+            if changes == self._saved_changes:
+                return
+            slots = np.flatnonzero(self._live)
+            dim = self._embeddings.shape[1] if self._embeddings is not None else 0
+            arrays = {
+                "namespace": np.array(self.namespace),
+                "embeddings": self._embeddings[slots] if dim else np.zeros((0, 0), dtype=np.float32),
+                "questions": np.array([self._questions[i] for i in slots], dtype=str),
+                "answers": np.array([self._answers[i] for i in slots], dtype=str),
+                "created": self._created[slots],
+                "last_used": self._last_used[slots],
+            }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}-", dir=self.path.parent)
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_name, self.path)
+            # Changes made while writing are not in this file and stay unsaved
+            self._saved_changes = changes
+            logger.info(f"✅ Saved {slots.size} semantic cache entries to {self.path}")
+        except Exception as e:
+            logger.error(f"❌ Failed to save semantic cache: {str(e)}")
+
+    def load(self) -> None:
+        """Restore entries saved under the same namespace, dropping expired ones"""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data["namespace"]) != self.namespace:
+                    logger.info("🔄 Semantic cache namespace changed; starting empty")
+                    return
+                embeddings = data["embeddings"]
+                questions, answers = data["questions"], data["answers"]
+                created, last_used = data["created"], data["last_used"]
+
+            # Keep the most recently used entries when the saved cache is larger than max_entries
+            order = np.argsort(-last_used)[:self.max_entries]
+            count = order.size
+            with self._lock:
+                if count:
+                    self._embeddings = np.zeros((self.max_entries, embeddings.shape[1]), dtype=np.float32)
+                    self._embeddings[:count] = embeddings[order]
+                for slot, i in enumerate(order):
+                    self._questions[slot] = str(questions[i])
+                    self._answers[slot] = str(answers[i])
+                self._created[:count] = created[order]
+                self._last_used[:count] = last_used[order]
+                self._live[:count] = True
+                self._expire(time.time())
+            logger.info(f"✅ Loaded {len(self)} semantic cache entries from {self.path}")
+        except Exception as e:
+            logger.error(f"❌ Failed to load semantic cache: {str(e)}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "max_distance": self.max_distance,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "persistent": self.path is not None,
+        }
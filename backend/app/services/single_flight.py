@@ -0,0 +1,177 @@
+"""
+Single-flight coalescing of identical concurrent work.
+
+When many employees ask the same question at once (e.g. right after an
+all-hands announcement) every request would otherwise encode it and, on a
+miss, call Gemini separately. ``SingleFlight`` keys in-flight computations
+(the QA engine uses the normalized question): the first caller (the leader)
+starts the computation as a task and later callers with the same key
+(followers) await that task instead of starting their own. Streams are shared
+the same way: followers replay the chunks produced so far and then follow the
+live stream.
+
+The shared task is shielded, so a leader whose client disconnects does not
+cancel the answer its followers are waiting for. A shared stream counts its
+subscribers instead: when the last one disconnects before the stream has
+finished, the stream is cancelled and its source closed, so nothing keeps
+pulling (and paying for) a Gemini stream nobody reads. All callers must run
+on the same event loop (one per uvicorn worker).
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class SharedStream:
+    """Drains one async iterator into a buffer that any number of subscribers can replay and follow;
+    cancelled when its last subscriber leaves before the end"""
+
+    def __init__(self, source: AsyncIterator[Any]) -> None:
+        self.chunks: List[Any] = []
+        self.done = False
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[Any]) -> None:
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            # Every subscriber has gone: close the source so it stops reading from its upstream
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(self) -> AsyncIterator[Any]:
+        """Replay of the chunks so far followed by the live stream; counted from this call on"""
+        self.subscribers += 1
+        return self._follow()
+
+    async def _follow(self) -> AsyncIterator[Any]:
+        position = 0
+        try:
+            while True:
+                while position < len(self.chunks):
+                    yield self.chunks[position]
+                    position += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.done:
+                self.close()
+
+    def close(self) -> None:
+        """Stop the stream before it finishes (no subscriber is left to read it)"""
+        if not self.closed:
+            self.closed = True
+            self.task.cancel()
+
+
+class _FlightStats:
+    __slots__ = ("leaders", "followers", "max_fanout")
+
+    def __init__(self) -> None:
+        self.leaders = 0
+        self.followers = 0
+        self.max_fanout = 1
+
+    def as_dict(self) -> Dict:
+        calls = self.leaders + self.followers
+        return {
+            "calls": calls,
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalescing_ratio": round(self.followers / calls, 4) if calls else 0.0,
+            "max_fanout": self.max_fanout if calls else 0,
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one in-flight task or stream"""
+
+    def __init__(self, name: str = "single_flight") -> None:
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._streams: Dict[Hashable, SharedStream] = {}
+        self._fanout: Dict[Hashable, int] = {}
+        self._stats: Dict[str, _FlightStats] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls or key in self._streams
+
+    def _join(self, key: Hashable, leader: bool) -> None:
+        """Count a caller; keys are tuples whose first item names the kind of work"""
+        stats = self._stats.setdefault(str(key[0]) if isinstance(key, tuple) else self.name, _FlightStats())
+        if leader:
+            stats.leaders += 1
+            self._fanout[key] = 1
+        else:
+            stats.followers += 1
+            self._fanout[key] += 1
+            stats.max_fanout = max(stats.max_fanout, self._fanout[key])
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of compute() for this key and whether it was shared with an earlier caller"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(self._calls, key, done))
+        self._join(key, leader=not shared)
+        return await asyncio.shield(task), shared
+
+    def stream(self, key: Hashable, produce: Callable[[], AsyncIterator[Any]]) -> Tuple[AsyncIterator[Any], bool]:
+        """Subscription to the stream for this key (started if needed) and whether it was already running"""
+        shared_stream = self._streams.get(key)
+        if shared_stream is not None and shared_stream.closed:
+            shared_stream = None  # abandoned by its subscribers and being cancelled: start over
+        shared = shared_stream is not None
+        if shared_stream is None:
+            shared_stream = SharedStream(produce())
+            self._streams[key] = shared_stream
+            shared_stream.task.add_done_callback(lambda done: self._finish(self._streams, key, shared_stream))
+        self._join(key, leader=not shared)
+        return shared_stream.subscribe(), shared
+
+    def _finish(self, registry: Dict[Hashable, Any], key: Hashable, flight: Any) -> None:
+        if registry.get(key) is flight:
+            del registry[key]
+            self._fanout.pop(key, None)
+        # Mark a failed computation's exception as retrieved when every caller has gone away
+        if isinstance(flight, asyncio.Future) and not flight.cancelled():
+            flight.exception()
+
+    def stats(self) -> Dict:
+        """Leader/follower counts and coalescing ratio (followers / calls), overall and per kind of work"""
+        total = _FlightStats()
+        for stats in self._stats.values():
+            total.leaders += stats.leaders
+            total.followers += stats.followers
+            total.max_fanout = max(total.max_fanout, stats.max_fanout)
+        return {
+            **total.as_dict(),
+            "in_flight": len(self._calls) + len(self._streams),
+            "by_kind": {kind: stats.as_dict() for kind, stats in sorted(self._stats.items())},
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
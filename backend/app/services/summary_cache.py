@@ -0,0 +1,177 @@
+"""
+Content-addressed cache of PDF summaries.
+
+The same handbook and policy PDFs are uploaded again and again; a summary is a
+pure function of the file bytes, the Gemini model and the summarization prompts.
+``SummaryCache`` keys the full ``SummaryResult`` by SHA-256 over those and keeps it
+
+- in memory: a small LRU of recent results (``LRUCache``), and
+- on disk: one JSON file per document under ``SUMMARY_CACHE_DIR``, shared by all
+  workers on the host; the least recently used files are removed once the
+  directory grows past ``SUMMARY_CACHE_MAX_DISK_MB``.
+
+Concurrent uploads of the same document are de-duplicated with ``SingleFlight``:
+one summarization runs and every request gets its result.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .query_cache import LRUCache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def summary_to_dict(result) -> Dict:
+    """JSON-friendly form of a SummaryResult; table DataFrames become columns + rows"""
+    data = asdict(result)
+    for table, original in zip(data["tables"], result.tables):
+        frame = original.data
+        table["data"] = {"columns": [str(c) for c in frame.columns], "rows": frame.astype(object).values.tolist()}
+    return data
+
+
+def summary_from_dict(data: Dict):
+    """Inverse of summary_to_dict"""
+    from .gemini_summarizer import SummaryResult, TableInfo
+
+    tables: List[TableInfo] = []
+    if data.get("tables"):
+        import pandas as pd
+        for table in data["tables"]:
+            frame = pd.DataFrame(table["data"]["rows"], columns=table["data"]["columns"])
+            tables.append(TableInfo(**{**table, "data": frame}))
+    return SummaryResult(**{**data, "tables": tables})
+
+
+class SummaryCache:
+    """SummaryResult cache keyed by document hash: memory LRU over a size-bounded directory of JSON files"""
+
+    def __init__(self, directory: Optional[Path] = None, max_entries: int = 32,
+                 max_disk_bytes: int = 256 * 2**20, namespace: str = "") -> None:
+        self.directory = Path(directory) if directory else None
+        self.max_disk_bytes = max_disk_bytes
+        self.namespace = namespace
+        self._memory = LRUCache(max_entries, ttl_seconds=0, name="summaries")
+        self._disk_lock = threading.Lock()
+        self.single_flight = SingleFlight("summaries")
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Summary cache directory unavailable, keeping summaries in memory: {str(e)}")
+                self.directory = None
+
+    def key(self, content: bytes, suffix: str = "") -> str:
+        """SHA-256 of the document bytes, salted with the model / prompt namespace and file type"""
+        digest = hashlib.sha256(f"{self.namespace}\0{suffix.lower()}\0".encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str):
+        """Cached SummaryResult for the key, from memory or disk, or None"""
+        result = self._memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    result = summary_from_dict(json.load(f))
+                os.utime(path)  # mtime is the disk tier's LRU clock
+                self._memory.set(key, result)
+                self.disk_hits += 1
+                return result
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️ Dropping unreadable cached summary {key[:12]}: {str(e)}")
+                path.unlink(missing_ok=True)
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result) -> None:
+        self._memory.set(key, result)
+        if self.directory is None:
+            return
+        tmp_name = None
+        try:
+            fd, tmp_name = tempfile.mkstemp(prefix=f".{key[:12]}-", dir=self.directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(summary_to_dict(result), f, default=str)
+            os.replace(tmp_name, self._path(key))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write cached summary {key[:12]}: {str(e)}")
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used files until the directory fits in max_disk_bytes"""
+        with self._disk_lock:
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_disk_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                self.disk_evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable]) -> Tuple[object, bool]:
+        """(SummaryResult, served_from_cache); concurrent misses for one key share a single compute()"""
+        start = time.time()
+        cached = await asyncio.to_thread(self.get, key)
+        if cached is not None:
+            logger.info(f"✅ Summary cache hit for document {key[:12]}")
+            return replace(cached, processing_time=time.time() - start, cached=True), True
+
+        async def compute_and_store():
+            result = await compute()
+            await asyncio.to_thread(self.put, key, result)
+            return result
+
+        result, shared = await self.single_flight.run(("summary", key), compute_and_store)
+        if shared:
+            return replace(result, cached=True), True
+        return result, False
+
+    def stats(self) -> Dict:
+        disk_files = len(list(self.directory.glob("*.json"))) if self.directory is not None else 0
+        return {
+            "memory": self._memory.stats(),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "disk_files": disk_files,
+            "disk_evictions": self.disk_evictions,
+            "directory": str(self.directory) if self.directory is not None else None,
+            "single_flight": self.single_flight.stats(),
+        }
@@ -0,0 +1,72 @@
+"""
+Local token counting for the summarizer's per-call token budget.
+
+Chunks are sized in tokens rather than words, so ``SUMMARY_CHUNK_TOKEN_BUDGET``
+means the same thing for prose, tables and figures, and counting a chunk never
+costs an API call. Counts come from a fast ``tokenizers`` tokenizer:
+
+- ``SUMMARY_TOKENIZER``: path to a tokenizer.json to count with, or
+- the tokenizer.json of the exported ONNX sentence model, when present.
+
+Without either (or without the tokenizers package) a regex estimate is used:
+one token per punctuation mark and one per four characters of each word, which
+errs high for English text, so budgets are not overrun.
+"""
+
+import re
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from ..config import get_onnx_model_dir, get_summary_tokenizer_path
+
+logger = logging.getLogger(__name__)
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    """Counts tokens with a local tokenizer.json, or with the regex estimate when none is available"""
+
+    def __init__(self, tokenizer_file: Optional[Path] = None) -> None:
+        self.tokenizer = None
+        self.name = "regex-estimate"
+        if tokenizer_file is not None and Path(tokenizer_file).exists():
+            try:
+                from tokenizers import Tokenizer
+
+                self.tokenizer = Tokenizer.from_file(str(tokenizer_file))
+                self.tokenizer.no_truncation()
+                self.tokenizer.no_padding()
+                self.name = str(tokenizer_file)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load tokenizer {tokenizer_file}, estimating tokens instead: {str(e)}")
+                self.tokenizer = None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        return sum(-(-len(piece) // 4) for piece in _PIECE.findall(text))
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        if self.tokenizer is not None and texts:
+            return [len(e.ids) for e in self.tokenizer.encode_batch(list(texts), add_special_tokens=False)]
+        return [self.count(text) for text in texts]
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """Shared TokenCounter, loaded on first use"""
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            tokenizer_file = get_summary_tokenizer_path() or get_onnx_model_dir() / "tokenizer.json"
+            _counter = TokenCounter(tokenizer_file)
+            logger.info(f"✅ Summary chunks are sized with {_counter.name}")
+        return _counter
@@ -0,0 +1,272 @@
+"""
+Vector index backends for semantic search over the QA dataset.
+
+All backends score with the inner product, which equals cosine similarity
+for the normalized embeddings produced by the sentence model. Backends:
+
+- ``exact``: full dot product followed by a full sort (reference results)
+- ``topk``:  full dot product followed by ``argpartition`` (same results, no full sort)
+- ``ivf``:   inverted-file index; k-means coarse quantizer, only ``nprobe``
+             clusters are scored per query (approximate, sub-linear)
+
+Every backend can keep its vectors in float32, float16 or int8 storage
+(see ``compact_embeddings``); scores are computed on the compact form.
+
+``search`` optionally takes ``rows``, a sorted subset of row ids (e.g. one
+policy category partition); only those rows are scored.
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .compact_embeddings import CompactEmbeddings
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """Base class for top-k inner-product search over a fixed embedding matrix"""
+
+    name = "base"
+
+    def __init__(self, embeddings, storage: str = "float32") -> None:
+        if not isinstance(embeddings, CompactEmbeddings) and np.ndim(embeddings) != 2:
+            raise ValueError("Embeddings must be a 2-D matrix")
+        self.vectors = CompactEmbeddings.from_float32(embeddings, storage)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.dim
+
+    @property
+    def storage(self) -> str:
+        return self.vectors.storage
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """The indexed vectors as float32 (decoded from compact storage)"""
+        return self.vectors.to_float32()
+
+    def _as_query(self, query) -> np.ndarray:
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dim}")
+        return query
+
+    def search(self, query, k: int = 10, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, scores) of the top-k rows (or of the given rows), best first"""
+        raise NotImplementedError
+
+    def _search_rows(self, query: np.ndarray, k: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k restricted to a subset of rows"""
+        if rows.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        local, top_scores = _top_k(self.vectors.score(query, rows=rows), k)
+        return rows[local], top_scores
+
+    def get_state(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Parameters and arrays (besides the embeddings) needed to restore the index without rebuilding it"""
+        return {}, {}
+
+    @classmethod
+    def from_state(cls, embeddings, params: Dict, arrays: Dict[str, np.ndarray],
+                   storage: str = "float32") -> "VectorIndex":
+        return cls(embeddings, storage=storage)
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force scoring with a full sort; the reference every other backend is measured against"""
+
+    name = "exact"
+
+    def search(self, query, k: int = 10, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.vectors.score(self._as_query(query), rows=rows)
+        top = np.argsort(scores)[::-1][:k]
+        return (top if rows is None else rows[top]), scores[top]
+
+
+class PartialTopKIndex(VectorIndex):
+    """Brute-force scoring with ``argpartition``: O(N) selection instead of an O(N log N) sort"""
+
+    name = "topk"
+
+    def search(self, query, k: int = 10, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if rows is not None:
+            return self._search_rows(self._as_query(query), k, rows)
+        scores = self.vectors.score(self._as_query(query))
+        return _top_k(scores, k)
+
+
+class IVFIndex(VectorIndex):
+    """Inverted-file index: rows are bucketed by their nearest k-means centroid and
+    a query only scores the rows in its ``nprobe`` closest buckets"""
+
+    name = "ivf"
+
+    def __init__(self, embeddings, nlist: Optional[int] = None, nprobe: Optional[int] = None,
+                 iterations: int = 10, seed: int = 0, storage: str = "float32") -> None:
+        super().__init__(embeddings, storage=storage)
+        n = len(self)
+        self.nlist = max(1, min(n, nlist or int(np.sqrt(n))))
+        self.nprobe = max(1, min(self.nlist, nprobe or max(1, self.nlist // 8)))
+        # Cluster the full-precision vectors; only the stored copy is compact
+        data = embeddings.to_float32() if isinstance(embeddings, CompactEmbeddings) else np.asarray(embeddings, dtype=np.float32)
+        self.centroids, assignments = _spherical_kmeans(data, self.nlist, iterations, seed)
+
+        # Store the lists as one permutation plus offsets so a probe is a slice, not a Python loop
+        self.order = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=self.nlist)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def get_state(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        params = {"nlist": self.nlist, "nprobe": self.nprobe}
+        return params, {"centroids": self.centroids, "order": self.order, "offsets": self.offsets}
+
+    @classmethod
+    def from_state(cls, embeddings, params: Dict, arrays: Dict[str, np.ndarray],
+                   storage: str = "float32") -> "IVFIndex":
+        index = cls.__new__(cls)
+        VectorIndex.__init__(index, embeddings, storage=storage)
+        index.nlist = int(params["nlist"])
+        index.nprobe = int(params["nprobe"])
+        index.centroids = arrays["centroids"]
+        index.order = arrays["order"]
+        index.offsets = arrays["offsets"]
+        return index
+
+    def search(self, query, k: int = 10, rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        query = self._as_query(query)
+        # A subset no larger than the probed lists is cheaper (and exact) to score directly
+        if rows is not None and rows.size <= self.nprobe * len(self) / self.nlist:
+            return self._search_rows(query, k, rows)
+
+        centroid_scores = self.centroids @ query
+        probes = _top_k(centroid_scores, self.nprobe)[0]
+
+        candidates = np.concatenate([
+            self.order[self.offsets[c]:self.offsets[c + 1]] for c in probes
+        ])
+        if rows is not None:
+            candidates = candidates[np.isin(candidates, rows, assume_unique=True)]
+        if candidates.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.vectors.score(query, rows=candidates)
+        local, top_scores = _top_k(scores, k)
+        return candidates[local], top_scores
+
+
+INDEX_BACKENDS = {
+    ExactIndex.name: ExactIndex,
+    PartialTopKIndex.name: PartialTopKIndex,
+    IVFIndex.name: IVFIndex,
+}
+
+
+def build_index(embeddings, backend: str = "topk", storage: str = "float32", **kwargs) -> VectorIndex:
+    """Build a vector index for the given backend name and embedding storage"""
+    backend = (backend or "topk").strip().lower()
+    if backend == "auto":
+        # Brute force stays fastest until the matrix no longer fits comfortably in cache
+        backend = "ivf" if len(embeddings) >= 50000 else "topk"
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index backend: {backend} (choose from {', '.join(INDEX_BACKENDS)}, auto)")
+
+    start = time.perf_counter()
+    index = INDEX_BACKENDS[backend](embeddings, storage=storage, **kwargs)
+    logger.info(f"✅ Built '{index.name}' vector index over {len(index)} {index.storage} vectors "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return index
+
+
+def restore_index(backend: str, embeddings, params: Dict, arrays: Dict[str, np.ndarray],
+                  storage: str = "float32") -> VectorIndex:
+    """Rebuild an index object from state saved with ``VectorIndex.get_state``"""
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index backend: {backend}")
+    return INDEX_BACKENDS[backend].from_state(embeddings, params, arrays, storage=storage)
+
+
+def evaluate_index(index: VectorIndex, queries, k: int = 10, reference: Optional[VectorIndex] = None) -> Dict:
+    """Measure recall@k against the exact index and per-query latency"""
+    reference = reference or ExactIndex(index.embeddings)
+    queries = np.asarray(queries, dtype=np.float32)
+    if queries.ndim == 1:
+        queries = queries.reshape(1, -1)
+
+    recalls: List[float] = []
+    latencies: List[float] = []
+    for query in queries:
+        expected = set(reference.search(query, k)[0].tolist())
+
+        start = time.perf_counter()
+        found = index.search(query, k)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if expected:
+            recalls.append(len(expected.intersection(found.tolist())) / len(expected))
+
+    latency = np.asarray(latencies) if latencies else np.zeros(1)
+    return {
+        "backend": index.name,
+        "storage": index.storage,
+        "vectors": len(index),
+        "memory_mb": index.vectors.nbytes / 2**20,
+        "queries": len(queries),
+        "k": k,
+        "recall_at_k": float(np.mean(recalls)) if recalls else 0.0,
+        "latency_ms": {
+            "mean": float(latency.mean()),
+            "p50": float(np.percentile(latency, 50)),
+            "p95": float(np.percentile(latency, 95)),
+            "p99": float(np.percentile(latency, 99)),
+        },
+    }
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and values of the k largest scores, best first"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    if k < scores.shape[0]:
+        part = np.argpartition(scores, -k)[-k:]
+    else:
+        part = np.arange(scores.shape[0])
+    order = part[np.argsort(scores[part])[::-1]]
+    return order, scores[order]
+
+
+def _spherical_kmeans(data: np.ndarray, nlist: int, iterations: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """K-means on the unit sphere (assignment by inner product)"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(data.shape[0], size=nlist, replace=False)].copy()
+    assignments = np.zeros(data.shape[0], dtype=np.int64)
+
+    for _ in range(iterations):
+        assignments = _assign(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty clusters from random rows so every list stays usable
+        if empty.any():
+            sums[empty] = data[rng.choice(data.shape[0], size=int(empty.sum()), replace=False)]
+            norms[empty] = np.linalg.norm(sums[empty], axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+
+    return centroids.astype(np.float32), _assign(data, centroids)
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, block: int = 8192) -> np.ndarray:
+    """Nearest centroid per row, computed in blocks to bound the score matrix size"""
+    out = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], block):
+        out[start:start + block] = np.argmax(data[start:start + block] @ centroids.T, axis=1)
+    return out
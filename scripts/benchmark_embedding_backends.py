@@ -0,0 +1,126 @@
+"""Compare the QA embedding backends (PyTorch vs int8 ONNX): parity, load time, RSS and per-query latency.
+
+Each backend runs in its own subprocess so load time and peak RSS are measured
+in isolation. Parity is reported as the cosine drift between the two backends'
+embeddings of every qa_dataset.json question, plus how often both agree on each
+question's nearest neighbour.
+
+Usage:
+  python scripts/benchmark_embedding_backends.py
+  python scripts/benchmark_embedding_backends.py --queries 500 --backends torch onnx-int8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+
+def load_questions() -> list:
+    qa_file = ROOT / "backend" / "app" / "data" / "qa_dataset.json"
+    with qa_file.open("r", encoding="utf-8") as f:
+        return [qa["question"] for qa in json.load(f) if isinstance(qa, dict) and "question" in qa]
+
+
+def run_worker(backend: str, queries: int, out_file: Path) -> None:
+    """Load one backend, embed the dataset and time single-question encodes (runs in a subprocess)"""
+    start = time.perf_counter()
+    from app.services.qa_engine import encode_questions, load_embedding_model
+
+    model, model_id = load_embedding_model(backend)
+    load_s = time.perf_counter() - start
+
+    questions = load_questions()
+    embeddings = encode_questions(model, questions)
+    np.save(out_file, embeddings)
+
+    # Warm up, then time one question per call as the chat endpoint does
+    encode_questions(model, questions[:1])
+    latencies = []
+    for i in range(queries):
+        t0 = time.perf_counter()
+        encode_questions(model, [questions[i % len(questions)]])
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "backend": backend,
+        "model_id": model_id,
+        "load_s": load_s,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latency_ms": {p: float(np.percentile(latencies, q)) for p, q in (("p50", 50), ("p95", 95), ("p99", 99))},
+    }))
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    """Cosine drift of candidate vs reference embeddings and nearest-neighbour agreement"""
+    cosines = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1))
+
+    def nearest(emb: np.ndarray) -> np.ndarray:
+        sims = emb @ emb.T
+        np.fill_diagonal(sims, -np.inf)
+        return sims.argmax(axis=1)
+
+    return {
+        "cosine_mean": float(cosines.mean()),
+        "cosine_min": float(cosines.min()),
+        "cosine_p1": float(np.percentile(cosines, 1)),
+        "nn_agreement": float(np.mean(nearest(reference) == nearest(candidate))),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-int8"])
+    parser.add_argument("--queries", type=int, default=200, help="single-question encodes timed per backend")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.queries, args.out)
+        return
+
+    results, embeddings = [], {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            out_file = Path(tmp) / f"{backend}.npy"
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", backend, "--queries", str(args.queries), "--out", str(out_file)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr[-2000:]}")
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            embeddings[backend] = np.load(out_file)
+
+    print(f"{'backend':<12} {'model id':<50} {'load s':>7} {'RSS MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['backend']:<12} {r['model_id']:<50} {r['load_s']:>7.2f} {r['peak_rss_mb']:>8.0f} "
+              f"{lat['p50']:>8.2f} {lat['p95']:>8.2f} {lat['p99']:>8.2f}")
+
+    reference = args.backends[0]
+    if reference in embeddings:
+        for backend, emb in embeddings.items():
+            if backend == reference:
+                continue
+            report = parity(embeddings[reference], emb)
+            print(f"\nParity {backend} vs {reference} ({emb.shape[0]} questions): "
+                  f"cosine mean {report['cosine_mean']:.5f}, min {report['cosine_min']:.5f}, "
+                  f"p1 {report['cosine_p1']:.5f}; nearest-neighbour agreement {report['nn_agreement']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark parallel PDF page extraction (doc_parser, PDF_PARSE_WORKERS): scaling with the pool size.
+
+The org_data PDFs are a few pages each, so by default they are also concatenated
+(with PyMuPDF) into one synthetic manual of at least ``--min-pages`` pages, the size
+of the HR manuals that motivated the parallel mode. Every document is extracted with
+each pool size; the pool is started before timing, and the pages must match the
+serial extraction exactly.
+
+Usage:
+  python scripts/benchmark_pdf_parsing.py
+  python scripts/benchmark_pdf_parsing.py --workers 1 2 4 8 --min-pages 600
+  python scripts/benchmark_pdf_parsing.py --min-pages 0          # only the org_data PDFs as they are
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.services import doc_parser  # noqa: E402
+
+
+def synthetic_manual(pdfs: List[Path], min_pages: int) -> Tuple[str, bytes]:
+    """The given PDFs repeated until the result has at least min_pages pages"""
+    import fitz  # PyMuPDF
+
+    manual = fitz.open()
+    while manual.page_count < min_pages:
+        for path in pdfs:
+            with fitz.open(path) as src:
+                manual.insert_pdf(src)
+    content = manual.tobytes()
+    pages = manual.page_count
+    manual.close()
+    return f"org_data x{pages} pages", content
+
+
+def time_extraction(content: bytes, workers: int, repeat: int) -> Tuple[float, List[str]]:
+    """Median seconds of iter_pdf_pages with the given pool size (after one untimed run) and the pages"""
+    os.environ["PDF_PARSE_WORKERS"] = str(workers)
+    pages = list(doc_parser.iter_pdf_pages(content))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(doc_parser.iter_pdf_pages(content))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, default=ROOT / "org_data", help="directory searched for *.pdf")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help="pool sizes to compare")
+    parser.add_argument("--min-pages", type=int, default=300,
+                        help="pages of the synthetic concatenated manual (0 skips it)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per pool size (median is reported)")
+    args = parser.parse_args()
+
+    pdfs = sorted(args.data.rglob("*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"No PDFs found under {args.data}")
+    documents = [(str(path.relative_to(args.data)), path.read_bytes()) for path in pdfs]
+    if args.min_pages > 0:
+        documents.append(synthetic_manual(pdfs, args.min_pages))
+
+    # Parallelize every document regardless of size, so the small ones show the pool overhead
+    os.environ["PDF_PARALLEL_MIN_PAGES"] = "2"
+    print(f"{'document':<40} {'pages':>6} {'workers':>8} {'median s':>10} {'pages/s':>9} {'speedup':>8} {'parity':>7}")
+    try:
+        for name, content in documents:
+            serial_s, serial_pages = None, None
+            for workers in args.workers:
+                seconds, pages = time_extraction(content, workers, args.repeat)
+                if serial_s is None:
+                    serial_s, serial_pages = seconds, pages
+                parity = "ok" if pages == serial_pages else "DIFF"
+                print(f"{name:<40} {len(pages):>6} {workers:>8} {seconds:>10.3f} "
+                      f"{len(pages) / max(seconds, 1e-9):>9.1f} {serial_s / max(seconds, 1e-9):>7.2f}x {parity:>7}")
+    finally:
+        doc_parser.shutdown_page_pool()
+
+
+if __name__ == "__main__":
+    main()
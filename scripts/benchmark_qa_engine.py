@@ -0,0 +1,267 @@
+"""Benchmark and accuracy suite for the QA engine hot path (HybridQAEngine.answer).
+
+Replays deterministic paraphrases of the qa_dataset.json questions through
+HybridQAEngine.answer, with Gemini replaced by the offline stub (app/services/gemini_stub.py), against datasets
+padded with synthetic distractor pairs (100 to 100k pairs by default). Each
+dataset size runs in its own subprocess and reports:
+
+- throughput and end-to-end latency percentiles
+- per-stage latency percentiles (from the engine's request traces)
+- which path answered (fast path, semantic, keyword, Gemini stub, ...)
+- top-1 hit rate: the paraphrase got the answer of the question it was made from
+- engine build time, embedding matrix size and peak RSS
+
+Hit rates are measured at the engine's current thresholds; a paraphrase that
+falls through to the Gemini stub counts as a miss.
+
+Usage:
+  python scripts/benchmark_qa_engine.py
+  python scripts/benchmark_qa_engine.py --sizes 100 1000 --queries 200 --concurrency 8
+  python scripts/benchmark_qa_engine.py --sizes 10000 --gemini-latency-ms 800 --semantic-cache
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+QA_FILE = ROOT / "backend" / "app" / "data" / "qa_dataset.json"
+
+SYNONYMS = [
+    (r"\bwork from home\b|\bwfh\b", "remote work"),
+    (r"\bpolicy\b", "rules"),
+    (r"\bleave\b", "time off"),
+    (r"\breimbursement\b", "expense claim"),
+    (r"\bmanager\b", "supervisor"),
+    (r"\bdevice\b", "laptop"),
+    (r"\bwhat happens if\b", "what if"),
+    (r"\bhow do i\b", "how can i"),
+    (r"\bwhat is\b", "what's"),
+    (r"\bwhere can i read\b", "where do i find"),
+    (r"\bwhat does\b", "what do"),
+]
+
+SYNTHETIC_TOPICS = [
+    "travel policy", "relocation policy", "overtime policy", "shift allowance policy", "parking policy",
+    "canteen policy", "gym membership policy", "internet allowance policy", "mobile phone policy",
+    "training budget policy", "certification policy", "referral bonus policy", "sabbatical policy",
+    "volunteering policy", "conference policy", "visa support policy", "insurance top-up policy",
+    "night shift policy", "holiday swap policy", "badge access policy", "visitor policy",
+    "data retention policy", "printing policy", "moonlighting policy", "gift acceptance policy",
+]
+SYNTHETIC_ASPECTS = [
+    "eligibility criteria", "approval process", "maximum limit", "submission deadline", "required documents",
+    "escalation contact", "exception process", "renewal period", "notice period", "payout schedule",
+    "tax treatment", "audit requirements", "carry-over rules", "probation rules", "appeal process",
+    "reporting format", "cost centre", "review frequency", "penalty", "grace period",
+]
+SYNTHETIC_AUDIENCES = [
+    "interns", "new joiners", "contractors", "team leads", "senior managers", "part-time staff",
+    "remote employees", "field engineers", "sales staff", "support engineers", "developers", "testers",
+    "designers", "analysts", "finance staff", "HR staff", "trainees", "consultants", "directors", "apprentices",
+]
+SYNTHETIC_LOCATIONS = [
+    "Mumbai", "Navi Mumbai", "Pune", "Bengaluru", "Hyderabad", "Chennai", "Delhi", "Noida", "Kolkata", "Ahmedabad",
+]
+SYNTHETIC_TEMPLATES = [
+    "What is the {aspect} in the {topic} for {audience} in {location}?",
+    "How does the {topic} handle the {aspect} for {audience} based in {location}?",
+    "Where can {audience} in {location} find the {aspect} of the {topic}?",
+]
+
+
+def paraphrase(question: str, variant: int) -> str:
+    """Deterministic rewording of a dataset question; variant 0 only normalizes case and punctuation"""
+    text = re.sub(r"[?!.]+$", "", question.strip()).lower()
+    if variant % 4 == 1:
+        return f"Can you tell me {text}?"
+    if variant % 4 == 2:
+        for pattern, replacement in SYNONYMS:
+            text = re.sub(pattern, replacement, text)
+        return text + "?"
+    if variant % 4 == 3:
+        return f"Quick question: {text}, please"
+    return re.sub(r"[^\w\s]", "", text)
+
+
+def synthetic_pairs(count: int, seed: int = 0) -> list:
+    """Unique template questions about made-up policies, used as distractors"""
+    if count <= 0:
+        return []
+    combos = list(itertools.product(SYNTHETIC_TEMPLATES, SYNTHETIC_TOPICS, SYNTHETIC_ASPECTS,
+                                    SYNTHETIC_AUDIENCES, SYNTHETIC_LOCATIONS))
+    if count > len(combos):
+        raise ValueError(f"At most {len(combos)} synthetic pairs are available")
+    order = np.random.default_rng(seed).permutation(len(combos))[:count]
+    pairs = []
+    for i in order.tolist():
+        template, topic, aspect, audience, location = combos[i]
+        pairs.append({
+            "question": template.format(topic=topic, aspect=aspect, audience=audience, location=location),
+            "answer": f"Synthetic answer {i}: the {aspect} of the {topic} for {audience} in {location}.",
+        })
+    return pairs
+
+
+def build_dataset(size: int) -> list:
+    """qa_dataset.json padded with synthetic pairs to ``size`` (or truncated when smaller)"""
+    with QA_FILE.open("r", encoding="utf-8") as f:
+        real = [qa for qa in json.load(f) if isinstance(qa, dict) and "question" in qa and "answer" in qa]
+    return real[:size] + synthetic_pairs(size - len(real))
+
+
+def make_queries(dataset: list, variants: int, limit: int, seed: int = 1) -> list:
+    """(paraphrase, expected answer) pairs for the real qa_dataset.json questions in the dataset"""
+    with QA_FILE.open("r", encoding="utf-8") as f:
+        real_questions = {qa["question"] for qa in json.load(f) if isinstance(qa, dict) and "question" in qa}
+    queries = [
+        (paraphrase(qa["question"], v), qa["answer"])
+        for qa in dataset if qa["question"] in real_questions
+        for v in range(variants)
+    ]
+    rng = np.random.default_rng(seed)
+    return [queries[i] for i in rng.permutation(len(queries))[:limit]]
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+
+async def replay(engine, queries: list, concurrency: int) -> tuple:
+    from app.services.latency_metrics import RequestTrace
+
+    semaphore = asyncio.Semaphore(concurrency)
+    traces = []
+    hits = 0
+
+    async def one(question: str, expected: str) -> None:
+        nonlocal hits
+        async with semaphore:
+            trace = RequestTrace()
+            answer = await engine.answer(question, trace=trace)
+            traces.append(trace)
+            hits += answer == expected
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(q, expected) for q, expected in queries))
+    return time.perf_counter() - start, traces, hits
+
+
+def run_worker(size: int, args: argparse.Namespace) -> None:
+    """Build the engine over a dataset of ``size`` pairs and replay the paraphrases (runs in a subprocess)"""
+    tmp = Path(tempfile.mkdtemp(prefix="qa-bench-"))
+    # Keep synthetic artifacts and cached answers away from the real ones
+    os.environ["QA_ARTIFACT_DIR"] = str(tmp / "artifacts")
+    os.environ["QA_SEMANTIC_CACHE_PATH"] = ""
+    os.environ["QA_SEMANTIC_CACHE_ENABLED"] = "true" if args.semantic_cache else "false"
+    os.environ["GEMINI_API_STUB"] = "true"
+    os.environ["GEMINI_STUB_LATENCY_MS"] = str(args.gemini_latency_ms)
+
+    from app.services import gemini_stub
+    from app.services.latency_metrics import latency_metrics
+    from app.services.qa_engine import HybridQAEngine
+
+    dataset = build_dataset(size)
+    dataset_file = tmp / "qa_dataset.json"
+    dataset_file.write_text(json.dumps(dataset), encoding="utf-8")
+
+    start = time.perf_counter()
+    engine = HybridQAEngine(dataset_path=dataset_file)
+    build_s = time.perf_counter() - start
+
+    queries = make_queries(dataset, args.variants, args.queries)
+
+    async def run() -> tuple:
+        await engine.answer(queries[0][0])  # warm up
+        # Every measured query starts cold: no cached embeddings or matches
+        engine._embedding_cache.clear()
+        engine._match_cache.clear()
+        latency_metrics.reset()
+        return await replay(engine, queries, args.concurrency)
+
+    elapsed, traces, hits = asyncio.run(run())
+    engine.close()
+
+    paths: dict = {}
+    for trace in traces:
+        paths[trace.resolved_by or "unresolved"] = paths.get(trace.resolved_by or "unresolved", 0) + 1
+    stages = latency_metrics.snapshot()["stages"]
+
+    print(json.dumps({
+        "size": len(dataset),
+        "queries": len(traces),
+        "build_s": build_s,
+        "qps": len(traces) / elapsed if elapsed else 0.0,
+        "latency_ms": percentiles([t.total_ms for t in traces]),
+        "stages": {name: {p: s.get(f"{p}_ms", 0.0) for p in ("p50", "p95", "p99")} for name, s in stages.items()},
+        "paths": paths,
+        "hit_rate": hits / len(traces) if traces else 0.0,
+        "gemini_calls": gemini_stub.calls,
+        "embeddings_mb": engine.qa_embeddings.nbytes / 2**20 if engine.qa_embeddings is not None else 0.0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000, 100000], help="dataset sizes (pairs)")
+    parser.add_argument("--queries", type=int, default=500, help="paraphrased questions replayed per size")
+    parser.add_argument("--variants", type=int, default=4, help="paraphrases per dataset question")
+    parser.add_argument("--concurrency", type=int, default=1, help="questions in flight at once")
+    parser.add_argument("--gemini-latency-ms", type=float, default=0.0, help="simulated latency of the Gemini stub")
+    parser.add_argument("--semantic-cache", action="store_true", help="enable the semantic answer cache")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args)
+        return
+
+    results = []
+    for size in args.sizes:
+        forwarded = ["--queries", str(args.queries), "--variants", str(args.variants),
+                     "--concurrency", str(args.concurrency), "--gemini-latency-ms", str(args.gemini_latency_ms)]
+        if args.semantic_cache:
+            forwarded.append("--semantic-cache")
+        proc = subprocess.run([sys.executable, __file__, "--worker", str(size), *forwarded],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{size} pairs: failed\n{proc.stderr[-2000:]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'pairs':>8} {'build s':>8} {'q/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'top-1':>7} {'gemini':>7} {'emb MB':>8} {'RSS MB':>8}")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['size']:>8} {r['build_s']:>8.1f} {r['qps']:>8.1f} {lat['p50']:>8.2f} {lat['p95']:>8.2f} "
+              f"{lat['p99']:>8.2f} {r['hit_rate']:>7.1%} {r['gemini_calls']:>7} {r['embeddings_mb']:>8.1f} "
+              f"{r['peak_rss_mb']:>8.0f}")
+
+    for r in results:
+        print(f"\n{r['size']} pairs - answered by: "
+              + ", ".join(f"{path} {count}" for path, count in sorted(r["paths"].items(), key=lambda p: -p[1])))
+        print(f"  {'stage':<18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, stage in r["stages"].items():
+            print(f"  {name:<18} {stage['p50']:>8.3f} {stage['p95']:>8.3f} {stage['p99']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Compare vector index backends and embedding storage for the QA engine: recall@k vs the exact
+float32 index, index memory and per-query latency.
+
+Usage:
+  python scripts/benchmark_qa_index.py                      # real qa_dataset.json embeddings
+  python scripts/benchmark_qa_index.py --synthetic 100000   # clustered random vectors
+  python scripts/benchmark_qa_index.py --synthetic 100000 --backends topk ivf --nprobe 16
+  python scripts/benchmark_qa_index.py --synthetic 100000 --backends topk --storages float32 float16 int8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.services.compact_embeddings import EMBEDDING_STORAGES  # noqa: E402
+from app.services.vector_index import ExactIndex, build_index, evaluate_index  # noqa: E402
+
+
+def synthetic_embeddings(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered unit vectors; paraphrases of one question sit close together like real embeddings"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((max(1, size // 50), dim)).astype(np.float32)
+    data = topics[rng.integers(0, topics.shape[0], size)] + 0.6 * rng.standard_normal((size, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def dataset_embeddings() -> np.ndarray:
+    from sentence_transformers import SentenceTransformer
+
+    qa_file = ROOT / "backend" / "app" / "data" / "qa_dataset.json"
+    with qa_file.open("r", encoding="utf-8") as f:
+        questions = [qa["question"] for qa in json.load(f) if isinstance(qa, dict) and "question" in qa]
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    return np.asarray(model.encode(questions, normalize_embeddings=True), dtype=np.float32)
+
+
+def make_queries(embeddings: np.ndarray, count: int, noise: float, seed: int = 1) -> np.ndarray:
+    """Perturbed copies of dataset rows, standing in for paraphrased user questions"""
+    rng = np.random.default_rng(seed)
+    rows = embeddings[rng.integers(0, embeddings.shape[0], count)]
+    queries = rows + noise * rng.standard_normal(rows.shape).astype(np.float32) / np.sqrt(rows.shape[1])
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0, help="number of synthetic vectors (0 = encode qa_dataset.json)")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--backends", nargs="+", default=["exact", "topk", "ivf"])
+    parser.add_argument("--storages", nargs="+", default=["float32"], choices=EMBEDDING_STORAGES)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, default=None)
+    args = parser.parse_args()
+
+    embeddings = synthetic_embeddings(args.synthetic, args.dim) if args.synthetic else dataset_embeddings()
+    queries = make_queries(embeddings, args.queries, args.noise)
+    reference = ExactIndex(embeddings)
+
+    print(f"{len(embeddings)} vectors x {embeddings.shape[1]} dims, {len(queries)} queries, k={args.k}\n")
+    print(f"{'backend':<8} {'storage':<8} {'build ms':>10} {'MB':>8} {'recall@k':>9} "
+          f"{'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for backend in args.backends:
+        kwargs = {}
+        if backend == "ivf":
+            kwargs = {"nlist": args.nlist, "nprobe": args.nprobe}
+        for storage in args.storages:
+            start = time.perf_counter()
+            index = build_index(embeddings, backend, storage=storage, **kwargs)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            report = evaluate_index(index, queries, k=args.k, reference=reference)
+            lat = report["latency_ms"]
+            print(f"{report['backend']:<8} {report['storage']:<8} {build_ms:>10.1f} {report['memory_mb']:>8.1f} "
+                  f"{report['recall_at_k']:>9.3f} {lat['mean']:>9.3f} {lat['p50']:>8.3f} {lat['p95']:>8.3f} {lat['p99']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
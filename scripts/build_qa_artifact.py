@@ -0,0 +1,38 @@
+"""Compile backend/app/data/qa_dataset.json into the precompiled QA artifact.
+
+The artifact holds normalized question embeddings, keyword sets and the vector
+index, keyed by a content hash of the dataset and the model id. The backend
+memory-maps it at startup and skips encoding when the hash matches.
+
+Usage:
+  python scripts/build_qa_artifact.py
+  python scripts/build_qa_artifact.py --force
+  QA_INDEX_BACKEND=ivf python scripts/build_qa_artifact.py
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.services.qa_engine import QA_DATASET_PATH, build_qa_artifact  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, default=QA_DATASET_PATH)
+    parser.add_argument("--force", action="store_true", help="rebuild even if a matching artifact exists")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    artifact = build_qa_artifact(args.dataset, force=args.force)
+    print(f"Artifact {artifact.key}: {artifact.embeddings.shape[0]} questions, "
+          f"'{artifact.index.name}' index, written to {artifact.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Export the QA sentence model (all-MiniLM-L6-v2) to ONNX and quantize it to int8.
+
+Writes model.onnx (fp32), model_int8.onnx (dynamic int8 quantization) and
+tokenizer.json to the output directory. The backend loads it with
+QA_EMBEDDING_BACKEND=onnx-int8; check parity and speed with
+scripts/benchmark_embedding_backends.py before switching.
+
+Requires torch, transformers and onnxruntime (export time only).
+
+Usage:
+  python scripts/export_onnx_embedder.py
+  python scripts/export_onnx_embedder.py --output models/onnx/all-MiniLM-L6-v2-int8 --opset 17
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.config import get_onnx_model_dir  # noqa: E402
+from app.services.embedding_backends import ONNX_MODEL_FILE  # noqa: E402
+from app.services.qa_engine import SENTENCE_MODEL_ID  # noqa: E402
+
+
+def export(model_name: str, output: Path, opset: int) -> Path:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    sample = tokenizer(["What is the leave policy?", "hello"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    fp32_path = output / "model.onnx"
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    tokenizer.save_pretrained(str(output))
+    return fp32_path
+
+
+def quantize(fp32_path: Path, int8_path: Path) -> None:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    # Dynamic quantization: int8 weights, activations quantized per batch at runtime
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=SENTENCE_MODEL_ID)
+    parser.add_argument("--output", type=Path, default=get_onnx_model_dir())
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    fp32_path = export(args.model, args.output, args.opset)
+    int8_path = args.output / ONNX_MODEL_FILE
+    quantize(fp32_path, int8_path)
+
+    size_mb = lambda p: p.stat().st_size / 1e6  # noqa: E731
+    print(f"Exported {args.model} in {time.perf_counter() - start:.1f}s")
+    print(f"  fp32: {fp32_path} ({size_mb(fp32_path):.1f} MB)")
+    print(f"  int8: {int8_path} ({size_mb(int8_path):.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Build the policy passage index used for retrieval-augmented QA answers.
+
+Parses the org_data policy PDFs with doc_parser, splits them into overlapping
+passages, embeds them with the QA engine's sentence model (the configured
+QA_EMBEDDING_BACKEND) and writes backend/app/data/policy_index/. The index is
+rebuilt only when a PDF, the model or the chunking parameters changed.
+
+Usage:
+  python scripts/ingest_policies.py
+  python scripts/ingest_policies.py --sources org_data/policies org_data/it_policies --force
+  python scripts/ingest_policies.py --chunk-words 150 --overlap-words 40
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from app.config import get_policy_index_dir  # noqa: E402
+from app.services.doc_parser import parse_document  # noqa: E402
+from app.services.policy_retriever import build_policy_index  # noqa: E402
+from app.services.qa_engine import encode_questions, load_embedding_model  # noqa: E402
+
+DEFAULT_SOURCES = [ROOT / "org_data" / "policies", ROOT / "org_data" / "it_policies"]
+
+
+def find_documents(sources: list[Path]) -> list[Path]:
+    documents: list[Path] = []
+    for source in sources:
+        if source.is_dir():
+            documents.extend(sorted(p for p in source.iterdir() if p.suffix.lower() in {".pdf", ".docx", ".txt"}))
+        elif source.exists():
+            documents.append(source)
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", nargs="+", type=Path, default=DEFAULT_SOURCES, help="policy files or directories")
+    parser.add_argument("--output", type=Path, default=get_policy_index_dir())
+    parser.add_argument("--chunk-words", type=int, default=120)
+    parser.add_argument("--overlap-words", type=int, default=30)
+    parser.add_argument("--force", action="store_true", help="rebuild even if nothing changed")
+    args = parser.parse_args()
+
+    documents = find_documents(args.sources)
+    if not documents:
+        sys.exit("No policy documents found")
+
+    model, model_id = load_embedding_model()
+
+    manifest_file = args.output / "manifest.json"
+    if manifest_file.exists() and not args.force:
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        indexed = {name: info.get("sha256") for name, info in manifest.get("sources", {}).items()}
+        unchanged = (
+            manifest.get("model_id") == model_id
+            and manifest.get("max_words") == args.chunk_words
+            and manifest.get("overlap_words") == args.overlap_words
+            and indexed == {p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in documents}
+        )
+        if unchanged:
+            print(f"Policy index at {args.output} is up to date ({manifest['passages']} passages); use --force to rebuild")
+            return
+
+    start = time.perf_counter()
+    manifest = build_policy_index(
+        args.output,
+        documents,
+        parse=parse_document,
+        encode=lambda texts: encode_questions(model, texts),
+        model_id=model_id,
+        max_words=args.chunk_words,
+        overlap_words=args.overlap_words,
+    )
+    print(f"Indexed {manifest['passages']} passages from {len(manifest['sources'])} documents "
+          f"with {model_id} in {time.perf_counter() - start:.1f}s -> {args.output}")
+    for name, info in manifest["sources"].items():
+        print(f"  {name}: {info['passages']} passages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Profile backend start-up: which imports dominate ``import app.main`` and how long until
+``/health`` (and ``/health/ready``) answer.
+
+The import report comes from ``python -X importtime``: cumulative time per top-level
+package (e.g. torch, sentence_transformers, google, pandas) and the slowest modules.
+With ``--serve`` the app is started under uvicorn and both health endpoints are polled.
+
+Usage:
+  python scripts/profile_startup.py                  # import-time report for app.main
+  python scripts/profile_startup.py --top 40         # show more modules
+  python scripts/profile_startup.py --serve          # also time /health and /health/ready
+  python scripts/profile_startup.py --serve --warmup eager
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND = ROOT / "backend"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> Tuple[List[Tuple[str, int, int, int]], float]:
+    """Run ``-X importtime`` in a fresh interpreter: (module, self us, cumulative us, depth) rows and wall ms"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        raise SystemExit(f"import {module} failed: {tail[0]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows, wall_ms
+
+
+def by_package(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """Self time summed per top-level package (sums to the total import time)"""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def wait_for(url: str, deadline: float, expect_ok: bool = True) -> Optional[float]:
+    """Seconds until the URL answers (with 200 if ``expect_ok``), or None at the deadline"""
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200 or not expect_ok:
+                    return time.perf_counter() - start
+        except urllib.error.HTTPError:
+            if not expect_ok:
+                return time.perf_counter() - start
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.05)
+    return None
+
+
+def serve_profile(port: int, warmup: str, timeout: float) -> None:
+    env = dict(os.environ, SERVICE_WARMUP=warmup)
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=env,
+    )
+    try:
+        deadline = start + timeout
+        base = f"http://127.0.0.1:{port}"
+        health = wait_for(f"{base}/health", deadline)
+        health_at = time.perf_counter() - start if health is not None else None
+        ready = wait_for(f"{base}/health/ready", deadline)
+        ready_at = time.perf_counter() - start if ready is not None else None
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    def fmt(seconds: Optional[float]) -> str:
+        return f"{seconds:.2f} s" if seconds is not None else f"no answer within {timeout:.0f} s"
+
+    print(f"\nuvicorn (SERVICE_WARMUP={warmup})")
+    print(f"  /health answered        {fmt(health_at)} after process start")
+    print(f"  /health/ready answered  {fmt(ready_at)} after process start")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="module to import (run from backend/)")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--serve", action="store_true", help="also start uvicorn and time the health endpoints")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--warmup", choices=["background", "eager", "lazy"], default="background")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds to wait for each endpoint")
+    args = parser.parse_args()
+
+    rows, wall_ms = import_profile(args.module)
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    print(f"import {args.module}: {total_us / 1000:.1f} ms in {len(rows)} modules "
+          f"({wall_ms:.0f} ms wall including interpreter start)\n")
+
+    print(f"{'package':<32} {'self ms':>10} {'share':>7}")
+    for package, self_us in sorted(by_package(rows).items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{package:<32} {self_us / 1000:>10.1f} {self_us / max(total_us, 1):>7.1%}")
+
+    print(f"\n{'module':<48} {'cumulative ms':>14} {'self ms':>9}")
+    for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<48} {cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}")
+
+    if args.serve:
+        serve_profile(args.port, args.warmup, args.timeout)
+
+
+if __name__ == "__main__":
+    main()